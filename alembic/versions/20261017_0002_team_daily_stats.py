@@ -0,0 +1,38 @@
+"""Add per-team daily check-in rollups."""
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0002"
+down_revision = "20240407_0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "team_daily_stats",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("team_id", sa.Integer(), sa.ForeignKey("teams.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("checkin_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("sum_mood", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("sum_stress", sa.Integer(), nullable=False, server_default="0"),
+        sa.UniqueConstraint("team_id", "day", name="uq_team_daily_stats_team_day"),
+    )
+
+    op.execute(
+        """
+        INSERT INTO team_daily_stats (team_id, day, checkin_count, sum_mood, sum_stress)
+        SELECT team_id, checkin_date, COUNT(id), SUM(mood), SUM(stress)
+        FROM checkins
+        GROUP BY team_id, checkin_date
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("team_daily_stats")
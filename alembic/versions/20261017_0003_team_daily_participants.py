@@ -0,0 +1,33 @@
+"""Track distinct participants in the daily team rollup."""
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0003"
+down_revision = "20261017_0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "team_daily_stats",
+        sa.Column("participants", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    op.execute("DELETE FROM team_daily_stats")
+    op.execute(
+        """
+        INSERT INTO team_daily_stats (team_id, day, checkin_count, sum_mood, sum_stress, participants)
+        SELECT team_id, checkin_date, COUNT(id), SUM(mood), SUM(stress), COUNT(DISTINCT user_id)
+        FROM checkins
+        GROUP BY team_id, checkin_date
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("team_daily_stats", "participants")
@@ -0,0 +1,30 @@
+"""Enforce one row per key on risk snapshots, integrations and subscriptions."""
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0004"
+down_revision = "20261017_0003"
+branch_labels = None
+depends_on = None
+
+# (table, key columns, constraint name)
+KEYS = (
+    ("risk_snapshots", ("team_id", "day"), "uq_risk_snapshots_team_day"),
+    ("integrations", ("org_id", "kind"), "uq_integrations_org_kind"),
+    ("subscriptions", ("org_id",), "uq_subscriptions_org"),
+)
+
+
+def upgrade() -> None:
+    for table, columns, name in KEYS:
+        key = ", ".join(columns)
+        # Keep the most recently written row for each key.
+        op.execute(f"DELETE FROM {table} WHERE id NOT IN (SELECT MAX(id) FROM {table} GROUP BY {key})")
+        op.create_unique_constraint(name, table, list(columns))
+
+
+def downgrade() -> None:
+    for table, _, name in reversed(KEYS):
+        op.drop_constraint(name, table, type_="unique")
@@ -0,0 +1,37 @@
+"""Composite and functional indexes for the hot check-in, snapshot and login filters."""
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0005"
+down_revision = "20261017_0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_checkins_team_date", "checkins", ["team_id", "checkin_date"])
+    op.create_index("ix_checkins_team_submitted", "checkins", ["team_id", sa.text("submitted_at DESC")])
+    op.create_index("ix_checkins_user_date", "checkins", ["user_id", "checkin_date"])
+    op.create_index("ix_users_email_lower", "users", [sa.text("lower(email)")])
+    op.create_index("ix_teams_org_name_lower", "teams", ["org_id", sa.text("lower(name)")])
+
+    # Superseded by the composites above and uq_risk_snapshots_team_day.
+    op.drop_index("ix_checkins_team_id", table_name="checkins")
+    op.drop_index("ix_checkins_user_id", table_name="checkins")
+    op.drop_index("ix_risk_snapshots_team_id", table_name="risk_snapshots")
+
+
+def downgrade() -> None:
+    op.create_index("ix_risk_snapshots_team_id", "risk_snapshots", ["team_id"])
+    op.create_index("ix_checkins_user_id", "checkins", ["user_id"])
+    op.create_index("ix_checkins_team_id", "checkins", ["team_id"])
+
+    op.drop_index("ix_teams_org_name_lower", table_name="teams")
+    op.drop_index("ix_users_email_lower", table_name="users")
+    op.drop_index("ix_checkins_user_date", table_name="checkins")
+    op.drop_index("ix_checkins_team_submitted", table_name="checkins")
+    op.drop_index("ix_checkins_team_date", table_name="checkins")
@@ -0,0 +1,33 @@
+"""Add the outbox for Slack posts and emails delivered by the outbox worker."""
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0006"
+down_revision = "20261017_0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "outbox_messages",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("kind", sa.String(length=32), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False, server_default="pending"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_outbox_messages_status_next_attempt", "outbox_messages", ["status", "next_attempt_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_outbox_messages_status_next_attempt", table_name="outbox_messages")
+    op.drop_table("outbox_messages")
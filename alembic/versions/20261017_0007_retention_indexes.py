@@ -0,0 +1,20 @@
+"""Index the timestamps the retention purge filters audit logs and login nonces on."""
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0007"
+down_revision = "20261017_0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_audit_logs_ts", "audit_logs", ["ts"])
+    op.create_index("ix_email_login_nonces_expires_at", "email_login_nonces", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_email_login_nonces_expires_at", table_name="email_login_nonces")
+    op.drop_index("ix_audit_logs_ts", table_name="audit_logs")
@@ -0,0 +1,34 @@
+"""Add the cold tier that the archive job moves old check-ins into."""
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0008"
+down_revision = "20261017_0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "checkins_archive",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("team_id", sa.Integer(), sa.ForeignKey("teams.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("submitted_at", sa.DateTime(), nullable=False),
+        sa.Column("checkin_date", sa.Date(), nullable=False),
+        sa.Column("mood", sa.Integer(), nullable=False),
+        sa.Column("stress", sa.Integer(), nullable=False),
+        sa.Column("comment", sa.Text(), nullable=True),
+    )
+    op.create_index("ix_checkins_archive_team_date", "checkins_archive", ["team_id", "checkin_date"])
+    op.create_index("ix_checkins_archive_user_date", "checkins_archive", ["user_id", "checkin_date"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_checkins_archive_user_date", table_name="checkins_archive")
+    op.drop_index("ix_checkins_archive_team_date", table_name="checkins_archive")
+    op.drop_table("checkins_archive")
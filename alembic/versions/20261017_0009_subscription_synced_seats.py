@@ -0,0 +1,20 @@
+"""Remember the seat quantity last pushed to Stripe so unchanged orgs are skipped."""
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0009"
+down_revision = "20261017_0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("subscriptions", sa.Column("synced_seats", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("subscriptions", "synced_seats")
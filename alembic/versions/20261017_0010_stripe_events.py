@@ -0,0 +1,38 @@
+"""Store Stripe webhook events for asynchronous, idempotent processing."""
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0010"
+down_revision = "20261017_0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stripe_events",
+        sa.Column("id", sa.String(length=255), primary_key=True),
+        sa.Column("type", sa.String(length=100), nullable=False),
+        sa.Column("org_id", sa.Integer(), nullable=True),
+        sa.Column("object_id", sa.String(length=255), nullable=True),
+        sa.Column("created", sa.DateTime(), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False, server_default="pending"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("received_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("processed_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_stripe_events_status_org_created", "stripe_events", ["status", "org_id", "created"])
+    op.create_index("ix_stripe_events_received_at", "stripe_events", ["received_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stripe_events_received_at", table_name="stripe_events")
+    op.drop_index("ix_stripe_events_status_org_created", table_name="stripe_events")
+    op.drop_table("stripe_events")
@@ -0,0 +1,43 @@
+"""Add job leases and run history for the in-process scheduler."""
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0011"
+down_revision = "20261017_0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_leases",
+        sa.Column("job", sa.String(length=64), primary_key=True),
+        sa.Column("holder", sa.String(length=128), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("last_slot", sa.DateTime(), nullable=False),
+    )
+    op.create_table(
+        "job_runs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("job", sa.String(length=64), nullable=False),
+        sa.Column("trigger", sa.String(length=16), nullable=False),
+        sa.Column("holder", sa.String(length=128), nullable=True),
+        sa.Column("slot_at", sa.DateTime(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("duration_seconds", sa.Float(), nullable=True),
+        sa.Column("status", sa.String(length=16), nullable=False, server_default="running"),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+    )
+    op.create_index("ix_job_runs_job_started", "job_runs", ["job", "started_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_job_runs_job_started", table_name="job_runs")
+    op.drop_table("job_runs")
+    op.drop_table("job_leases")
@@ -0,0 +1,24 @@
+"""Remember the plan last pushed to Stripe so a plan change with the same seat count is synced."""
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0012"
+down_revision = "20261017_0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The ``plan`` enum type already exists; add_column does not recreate it.
+    op.add_column(
+        "subscriptions",
+        sa.Column("synced_plan", sa.Enum("starter", "pro", "enterprise", name="plan"), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("subscriptions", "synced_plan")
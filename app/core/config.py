@@ -13,19 +13,61 @@ class Settings(BaseSettings):
 
     app_env: Literal["dev", "prod", "test"] = Field("dev", alias="APP_ENV")
     database_url: str = Field(..., alias="DATABASE_URL")
+    async_database_url: Optional[str] = Field(None, alias="ASYNC_DATABASE_URL")
+    read_database_url: Optional[str] = Field(None, alias="READ_DATABASE_URL")
+    replica_pin_seconds: float = Field(5.0, alias="REPLICA_PIN_SECONDS")
+    async_routes: bool = Field(False, alias="ASYNC_ROUTES")
     secret_key: str = Field("dev-secret-key-change-in-production", alias="SECRET_KEY")
     admin_token: str = Field("changeme", alias="RMHT_ADMIN_TOKEN")
     sendgrid_api_key: Optional[str] = Field(None, alias="SENDGRID_API_KEY")
+    sendgrid_api_base: str = Field("https://api.sendgrid.com/v3", alias="SENDGRID_API_BASE")
     slack_client_id: Optional[str] = Field(None, alias="SLACK_CLIENT_ID")
     slack_client_secret: Optional[str] = Field(None, alias="SLACK_CLIENT_SECRET")
+    slack_api_base: str = Field("https://slack.com/api", alias="SLACK_API_BASE")
     stripe_secret_key: Optional[str] = Field(None, alias="STRIPE_SECRET_KEY")
     stripe_webhook_secret: Optional[str] = Field(None, alias="STRIPE_WEBHOOK_SECRET")
     stripe_price_starter: Optional[str] = Field(None, alias="STRIPE_PRICE_STARTER")
     stripe_price_pro: Optional[str] = Field(None, alias="STRIPE_PRICE_PRO")
     stripe_price_enterprise: Optional[str] = Field(None, alias="STRIPE_PRICE_ENTERPRISE")
+    stripe_api_base: str = Field("https://api.stripe.com", alias="STRIPE_API_BASE")
+    stripe_sync_concurrency: int = Field(8, alias="STRIPE_SYNC_CONCURRENCY", ge=1)
+    stripe_event_batch_orgs: int = Field(50, alias="STRIPE_EVENT_BATCH_ORGS")
+    stripe_event_poll_seconds: float = Field(1.0, alias="STRIPE_EVENT_POLL_SECONDS")
     app_base_url: Optional[AnyHttpUrl] = Field(None, alias="APP_BASE_URL")
     cron_secret: Optional[str] = Field(None, alias="CRON_SECRET")
+    db_pool_size: int = Field(5, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(10, alias="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(30.0, alias="DB_POOL_TIMEOUT")
+    db_pool_recycle: int = Field(1800, alias="DB_POOL_RECYCLE")
+    query_budget: int = Field(25, alias="QUERY_BUDGET")
+    retention_chunk_size: int = Field(5000, alias="RETENTION_CHUNK_SIZE")
+    # Must cover the longest analytics window (30 days), which only reads the hot table.
+    hot_window_days: int = Field(60, alias="HOT_WINDOW_DAYS", ge=31)
+    archive_chunk_size: int = Field(5000, alias="ARCHIVE_CHUNK_SIZE")
+    audit_log_retention_days: int = Field(365, alias="AUDIT_LOG_RETENTION_DAYS")
+    outbox_batch_size: int = Field(100, alias="OUTBOX_BATCH_SIZE")
+    outbox_concurrency: int = Field(20, alias="OUTBOX_CONCURRENCY")
+    outbox_poll_seconds: float = Field(1.0, alias="OUTBOX_POLL_SECONDS")
+    outbox_max_attempts: int = Field(8, alias="OUTBOX_MAX_ATTEMPTS")
+    scheduler_enabled: bool = Field(False, alias="SCHEDULER_ENABLED")
+    scheduler_poll_seconds: float = Field(30.0, alias="SCHEDULER_POLL_SECONDS")
+    metrics_scrape_token: Optional[str] = Field(None, alias="METRICS_SCRAPE_TOKEN")
     allowed_cors_origins: List[str] = Field(default_factory=list, alias="ALLOWED_CORS_ORIGINS")
+    metrics_cache_ttl: float = Field(60.0, alias="METRICS_CACHE_TTL")
+    metrics_cache_size: int = Field(2048, alias="METRICS_CACHE_SIZE")
+    metrics_cache_url: Optional[str] = Field(None, alias="METRICS_CACHE_URL")
+    token_cache_ttl: float = Field(60.0, alias="TOKEN_CACHE_TTL")
+    token_cache_size: int = Field(10_000, alias="TOKEN_CACHE_SIZE")
+    token_filter_refresh_seconds: float = Field(10.0, alias="TOKEN_FILTER_REFRESH_SECONDS")
+    token_filter_rebuild_seconds: float = Field(900.0, alias="TOKEN_FILTER_REBUILD_SECONDS")
+    ingest_secret: Optional[str] = Field(None, alias="INGEST_SECRET")
+    ingest_max_batch: int = Field(5000, alias="INGEST_MAX_BATCH")
+    checkin_buffer_enabled: bool = Field(False, alias="CHECKIN_BUFFER_ENABLED")
+    checkin_buffer_flush_ms: int = Field(50, alias="CHECKIN_BUFFER_FLUSH_MS")
+    checkin_buffer_max_rows: int = Field(500, alias="CHECKIN_BUFFER_MAX_ROWS")
+    checkin_buffer_max_queue: int = Field(10_000, alias="CHECKIN_BUFFER_MAX_QUEUE")
+    checkin_buffer_ack: Literal["flushed", "queued"] = Field("flushed", alias="CHECKIN_BUFFER_ACK")
+    checkin_buffer_ack_timeout: float = Field(10.0, alias="CHECKIN_BUFFER_ACK_TIMEOUT")
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", case_sensitive=False)
 
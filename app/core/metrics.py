@@ -0,0 +1,282 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+Counters and histograms keep one shard per thread: the hot path only touches
+the calling thread's own dict, so recording never takes a lock. Shards are
+summed when ``/metrics`` is scraped. Values are per worker process; with
+several workers each one reports its own totals.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from typing import TypeVar
+
+LabelValues = tuple[str, ...]
+MetricT = TypeVar("MetricT", bound="_Metric")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+JOB_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> list[str]:
+        raise NotImplementedError
+
+
+class _Sharded(_Metric):
+    """Base for metrics whose state is split into lock-free per-thread shards."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._local = threading.local()
+        self._shards: list[dict] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard: dict = {}
+            # Only taken once per thread; shards of finished threads are kept so totals never go back.
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def _snapshots(self) -> list[dict]:
+        with self._shards_lock:
+            shards = list(self._shards)
+        # dict.copy() is atomic under the GIL, so a writer never sees a torn shard.
+        return [shard.copy() for shard in shards]
+
+    def reset(self) -> None:
+        with self._shards_lock:
+            for shard in self._shards:
+                shard.clear()
+
+
+class Counter(_Sharded):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def values(self) -> dict[LabelValues, float]:
+        totals: dict[LabelValues, float] = {}
+        for shard in self._snapshots():
+            for labels, value in shard.items():
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def render(self) -> list[str]:
+        return [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+            for labels, value in sorted(self.values().items())
+        ]
+
+
+class Histogram(_Sharded):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        shard = self._shard()
+        # Per-bucket (non-cumulative) counts, then the +Inf bucket, then the sum.
+        state = shard.get(labels)
+        if state is None:
+            state = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def values(self) -> dict[LabelValues, list[float]]:
+        totals: dict[LabelValues, list[float]] = {}
+        for shard in self._snapshots():
+            for labels, state in shard.items():
+                state = list(state)
+                current = totals.get(labels)
+                totals[labels] = state if current is None else [a + b for a, b in zip(current, state)]
+        return totals
+
+    def render(self) -> list[str]:
+        lines = []
+        for labels, state in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(state[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class GaugeCallback(_Metric):
+    """Gauge whose values are read from ``collect()`` at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._sources: dict[str, Callable[[], Mapping[LabelValues, float]]] = {}
+
+    def set_source(self, key: str, collect: Callable[[], Mapping[LabelValues, float]]) -> None:
+        """Add a value source; a later call with the same ``key`` replaces it."""
+
+        self._sources[key] = collect
+
+    def render(self) -> list[str]:
+        lines = []
+        for collect in list(self._sources.values()):
+            for labels, value in sorted(collect().items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: MetricT) -> MetricT:
+        if metric.name in self._metrics:
+            raise RuntimeError(f"Metric {metric.name!r} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+http_requests = REGISTRY.register(
+    Counter("http_requests_total", "HTTP responses by route template and status code.", ("method", "route", "status"))
+)
+http_request_duration = REGISTRY.register(
+    Histogram("http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route"))
+)
+db_pool_checked_out = REGISTRY.register(
+    GaugeCallback("db_pool_checked_out", "Connections currently checked out of the pool.", ("engine",))
+)
+db_pool_overflow = REGISTRY.register(
+    GaugeCallback("db_pool_overflow", "Connections open beyond the pool size (negative while below it).", ("engine",))
+)
+db_pool_size = REGISTRY.register(GaugeCallback("db_pool_size", "Configured pool size.", ("engine",)))
+db_pool_checkout_wait = REGISTRY.register(
+    Histogram(
+        "db_pool_checkout_wait_seconds",
+        "Time spent waiting for a pooled connection.",
+        ("engine",),
+        buckets=POOL_WAIT_BUCKETS,
+    )
+)
+checkins_ingested = REGISTRY.register(
+    Counter("checkins_ingested_total", "Committed check-ins by write path.", ("source",))
+)
+risk_compute_duration = REGISTRY.register(
+    Histogram("risk_compute_seconds", "Time to score and store risk snapshots.", ("mode",))
+)
+job_duration = REGISTRY.register(
+    Histogram("job_duration_seconds", "Background job run time.", ("job",), buckets=JOB_BUCKETS)
+)
+job_runs = REGISTRY.register(Counter("job_runs_total", "Background job runs by outcome.", ("job", "outcome")))
+
+
+def observe_request(method: str, route: str, status_code: int, elapsed_seconds: float) -> None:
+    http_requests.inc(method, route, str(status_code))
+    http_request_duration.observe(elapsed_seconds, method, route)
+
+
+def watch_pool(name: str, engine) -> None:
+    """Export checked-out/overflow/size gauges for ``engine``'s pool.
+
+    The pool is looked up at scrape time because ``engine.dispose()`` swaps it
+    out; pools without these counters (e.g. in-memory SQLite) report nothing.
+    """
+
+    def read(attr: str) -> Callable[[], dict[LabelValues, float]]:
+        def collect() -> dict[LabelValues, float]:
+            method = getattr(engine.pool, attr, None)
+            return {(name,): method()} if method is not None else {}
+
+        return collect
+
+    db_pool_checked_out.set_source(name, read("checkedout"))
+    db_pool_overflow.set_source(name, read("overflow"))
+    db_pool_size.set_source(name, read("size"))
+
+
+@contextmanager
+def track_job(job: str) -> Iterator[None]:
+    """Record the duration and outcome (``success``/``error``) of a job run."""
+
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        job_duration.observe(time.perf_counter() - started, job)
+        job_runs.inc(job, outcome)
+
+
+def render() -> str:
+    return REGISTRY.render()
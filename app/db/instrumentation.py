@@ -0,0 +1,80 @@
+"""Per-request SQL statistics collected from engine events.
+
+:func:`instrument` hooks an engine so every statement executed while a
+:class:`QueryStats` is active (see :func:`track`) adds to its count, total
+database time and slowest statement. The active stats live in a context
+variable, so they follow a request into Starlette's threadpool and into
+``AsyncSession.run_sync``; statements from background threads are ignored.
+"""
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SLOWEST_STATEMENT_CHARS = 200
+
+
+@dataclass
+class QueryStats:
+    request_id: str | None = None
+    count: int = 0
+    total_ms: float = 0.0
+    slowest_ms: float = 0.0
+    slowest_statement: str = ""
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            # Single-line and quote-free so it can be embedded in the JSON log line.
+            self.slowest_statement = " ".join(statement.replace('"', "'").split())[:SLOWEST_STATEMENT_CHARS]
+
+    def server_timing(self) -> str:
+        """Render as a ``Server-Timing`` header value."""
+
+        return f'db;dur={self.total_ms:.2f};desc="{self.count} queries", db-slowest;dur={self.slowest_ms:.2f}'
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def current() -> QueryStats | None:
+    return _current.get()
+
+
+@contextmanager
+def track(request_id: str | None = None) -> Iterator[QueryStats]:
+    """Collect statistics for every statement executed inside the block."""
+
+    stats = QueryStats(request_id=request_id)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info["query_started_at"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, (time.perf_counter() - started) * 1000)
+
+
+def instrument(engine: Engine) -> None:
+    """Attach the timing hooks to ``engine`` (idempotent)."""
+
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -1,28 +1,39 @@
 """Expose ORM models."""
 from .audit_log import AuditLog
 from .calendar_stat import CalendarStat
-from .checkin import Checkin
+from .checkin import Checkin, CheckinArchive
 from .email_login_nonce import EmailLoginNonce
 from .integration import Integration, IntegrationKind
+from .job_lease import JobLease
+from .job_run import JobRun
 from .org import Org
+from .outbox_message import OutboxMessage
 from .risk_snapshot import RiskLevel, RiskSnapshot
+from .stripe_event import StripeEvent
 from .subscription import Plan, Subscription, SubscriptionStatus
 from .team import Team
+from .team_daily_stat import TeamDailyStat
 from .user import User
 
 __all__ = [
     "AuditLog",
     "CalendarStat",
     "Checkin",
+    "CheckinArchive",
     "EmailLoginNonce",
     "Integration",
     "IntegrationKind",
+    "JobLease",
+    "JobRun",
     "Org",
+    "OutboxMessage",
     "RiskLevel",
     "RiskSnapshot",
     "Plan",
+    "StripeEvent",
     "Subscription",
     "SubscriptionStatus",
     "Team",
+    "TeamDailyStat",
     "User",
 ]
@@ -18,7 +18,7 @@ class AuditLog(Base):
     actor: Mapped[str] = mapped_column(String(255), nullable=False)
     action: Mapped[str] = mapped_column(String(255), nullable=False)
     target: Mapped[str | None] = mapped_column(String(255), nullable=True)
-    ts: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    ts: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     meta_json: Mapped[dict[str, Any]] = mapped_column(JSON, default=dict, nullable=False)
 
     org = relationship("Org", back_populates="audit_logs")
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from datetime import date, datetime
 
-from sqlalchemy import Date, DateTime, ForeignKey, Integer, Text
+from sqlalchemy import Date, DateTime, ForeignKey, Index, Integer, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -13,9 +13,9 @@ class Checkin(Base):
     __tablename__ = "checkins"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
-    team_id: Mapped[int] = mapped_column(ForeignKey("teams.id", ondelete="CASCADE"), nullable=False, index=True)
-    submitted_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    team_id: Mapped[int] = mapped_column(ForeignKey("teams.id", ondelete="CASCADE"), nullable=False)
+    submitted_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     checkin_date: Mapped[date] = mapped_column(Date, default=date.today, nullable=False)
     mood: Mapped[int] = mapped_column(Integer, nullable=False)
     stress: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -23,3 +23,33 @@ class Checkin(Base):
 
     user = relationship("User", back_populates="checkins")
     team = relationship("Team", back_populates="checkins")
+
+
+# Composite indexes lead with the equality column so they also serve plain
+# team_id / user_id lookups.
+Index("ix_checkins_team_date", Checkin.team_id, Checkin.checkin_date)
+Index("ix_checkins_team_submitted", Checkin.team_id, Checkin.submitted_at.desc())
+Index("ix_checkins_user_date", Checkin.user_id, Checkin.checkin_date)
+
+
+class CheckinArchive(Base):
+    """Cold tier: check-ins older than ``HOT_WINDOW_DAYS``, moved here by the archive job.
+
+    Rows keep their original ids so the move is a plain copy. Only the indexes
+    needed by rollup rebuilds, participant checks and retention are kept.
+    """
+
+    __tablename__ = "checkins_archive"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    team_id: Mapped[int] = mapped_column(ForeignKey("teams.id", ondelete="CASCADE"), nullable=False)
+    submitted_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    checkin_date: Mapped[date] = mapped_column(Date, nullable=False)
+    mood: Mapped[int] = mapped_column(Integer, nullable=False)
+    stress: Mapped[int] = mapped_column(Integer, nullable=False)
+    comment: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+
+Index("ix_checkins_archive_team_date", CheckinArchive.team_id, CheckinArchive.checkin_date)
+Index("ix_checkins_archive_user_date", CheckinArchive.user_id, CheckinArchive.checkin_date)
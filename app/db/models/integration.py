@@ -4,7 +4,7 @@ from __future__ import annotations
 from enum import Enum
 from typing import Any
 
-from sqlalchemy import Enum as PgEnum, ForeignKey, Integer, JSON, String
+from sqlalchemy import Enum as PgEnum, ForeignKey, Integer, JSON, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -18,6 +18,7 @@ class IntegrationKind(str, Enum):
 
 class Integration(Base):
     __tablename__ = "integrations"
+    __table_args__ = (UniqueConstraint("org_id", "kind", name="uq_integrations_org_kind"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     org_id: Mapped[int] = mapped_column(ForeignKey("orgs.id", ondelete="CASCADE"), nullable=False, index=True)
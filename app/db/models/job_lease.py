@@ -0,0 +1,20 @@
+"""Scheduled job lease model."""
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class JobLease(Base):
+    """Which process may run a job, until when, and the latest schedule slot it was claimed for."""
+
+    __tablename__ = "job_leases"
+
+    job: Mapped[str] = mapped_column(String(64), primary_key=True)
+    holder: Mapped[str] = mapped_column(String(128), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    last_slot: Mapped[datetime] = mapped_column(DateTime, nullable=False)
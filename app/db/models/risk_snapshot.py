@@ -4,7 +4,7 @@ from __future__ import annotations
 from datetime import date
 from enum import Enum
 
-from sqlalchemy import Date, Enum as PgEnum, Float, ForeignKey, Integer
+from sqlalchemy import Date, Enum as PgEnum, Float, ForeignKey, Integer, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -18,9 +18,11 @@ class RiskLevel(str, Enum):
 
 class RiskSnapshot(Base):
     __tablename__ = "risk_snapshots"
+    __table_args__ = (UniqueConstraint("team_id", "day", name="uq_risk_snapshots_team_day"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    team_id: Mapped[int] = mapped_column(ForeignKey("teams.id", ondelete="CASCADE"), nullable=False, index=True)
+    # uq_risk_snapshots_team_day doubles as the (team_id, day) lookup index.
+    team_id: Mapped[int] = mapped_column(ForeignKey("teams.id", ondelete="CASCADE"), nullable=False)
     day: Mapped[date] = mapped_column(Date, nullable=False)
     risk_level: Mapped[RiskLevel] = mapped_column(PgEnum(RiskLevel, name="risk_level"), nullable=False)
     avg_mood: Mapped[float] = mapped_column(Float, nullable=False)
@@ -0,0 +1,37 @@
+"""Received Stripe webhook event model."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import JSON, DateTime, Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class StripeEvent(Base):
+    """A verified Stripe webhook event, stored once per Stripe event id and applied by the event worker.
+
+    ``org_id`` is copied from the object's metadata without a foreign key so an
+    event for an unknown org is still acknowledged. ``object_id`` is the
+    subscription the event describes; newer events for it supersede older ones.
+    """
+
+    __tablename__ = "stripe_events"
+
+    id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    type: Mapped[str] = mapped_column(String(100), nullable=False)
+    org_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    object_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    created: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    status: Mapped[str] = mapped_column(String(16), default="pending", nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    received_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    processed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+Index("ix_stripe_events_status_org_created", StripeEvent.status, StripeEvent.org_id, StripeEvent.created)
@@ -4,7 +4,7 @@ from __future__ import annotations
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import DateTime, Enum as PgEnum, ForeignKey, Integer, String
+from sqlalchemy import DateTime, Enum as PgEnum, ForeignKey, Integer, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -25,6 +25,7 @@ class SubscriptionStatus(str, Enum):
 
 class Subscription(Base):
     __tablename__ = "subscriptions"
+    __table_args__ = (UniqueConstraint("org_id", name="uq_subscriptions_org"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     org_id: Mapped[int] = mapped_column(ForeignKey("orgs.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -32,6 +33,9 @@ class Subscription(Base):
     stripe_subscription: Mapped[str | None] = mapped_column(String(120), nullable=True)
     plan: Mapped[Plan | None] = mapped_column(PgEnum(Plan, name="plan"), nullable=True)
     seats: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Quantity and plan last pushed to Stripe by the seat sync job; NULL until the first sync.
+    synced_seats: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    synced_plan: Mapped[Plan | None] = mapped_column(PgEnum(Plan, name="plan"), nullable=True)
     status: Mapped[SubscriptionStatus | None] = mapped_column(
         PgEnum(SubscriptionStatus, name="subscription_status"), nullable=True
     )
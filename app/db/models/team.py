@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -22,3 +22,7 @@ class Team(Base):
     checkins = relationship("Checkin", back_populates="team", cascade="all, delete-orphan")
     calendar_stats = relationship("CalendarStat", back_populates="team", cascade="all, delete-orphan")
     risk_snapshots = relationship("RiskSnapshot", back_populates="team", cascade="all, delete-orphan")
+    daily_stats = relationship("TeamDailyStat", back_populates="team", cascade="all, delete-orphan")
+
+
+Index("ix_teams_org_name_lower", Team.org_id, func.lower(Team.name))
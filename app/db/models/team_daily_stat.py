@@ -0,0 +1,26 @@
+"""Per-team daily check-in rollup model."""
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy import Date, ForeignKey, Integer, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.db.base import Base
+
+
+class TeamDailyStat(Base):
+    """Running check-in sums for one team on one day."""
+
+    __tablename__ = "team_daily_stats"
+    __table_args__ = (UniqueConstraint("team_id", "day", name="uq_team_daily_stats_team_day"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    team_id: Mapped[int] = mapped_column(ForeignKey("teams.id", ondelete="CASCADE"), nullable=False)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    checkin_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    sum_mood: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    sum_stress: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    participants: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    team = relationship("Team", back_populates="daily_stats")
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -22,3 +22,6 @@ class User(Base):
 
     team = relationship("Team", back_populates="users")
     checkins = relationship("Checkin", back_populates="user", cascade="all, delete-orphan")
+
+
+Index("ix_users_email_lower", func.lower(User.email))
@@ -0,0 +1,73 @@
+"""Connection pool configuration shared by the sync and async engines."""
+from __future__ import annotations
+
+import time
+from functools import cache
+from typing import Any
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core import metrics
+from app.core.config import Settings
+
+
+class _TimedCheckout:
+    """Report how long each checkout waited for a connection."""
+
+    metrics_label = ""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.db_pool_checkout_wait.observe(time.perf_counter() - started, self.metrics_label)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    metrics_label = "sync"
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    metrics_label = "async"
+
+
+TIMED_POOLS = {QueuePool: TimedQueuePool, AsyncAdaptedQueuePool: TimedAsyncAdaptedQueuePool}
+
+
+@cache
+def labelled_pool(poolclass: type, name: str) -> type:
+    """``poolclass`` reporting checkout waits under ``engine=name``.
+
+    A subclass rather than an instance attribute, so the label survives
+    ``engine.dispose()`` recreating the pool.
+    """
+
+    if name == poolclass.metrics_label:
+        return poolclass
+    return type(poolclass.__name__, (poolclass,), {"metrics_label": name})
+
+
+def pool_options(url: str, settings: Settings, name: str | None = None) -> dict[str, Any]:
+    """Engine keyword arguments for ``url``.
+
+    Sizing only applies where the dialect would use a queue pool; in-memory
+    SQLite keeps its single-connection pool. ``name`` labels the pool's
+    checkout waits, matching the engine name given to ``metrics.watch_pool``.
+    """
+
+    parsed = make_url(url)
+    options: dict[str, Any] = {"pool_pre_ping": True}
+    poolclass = TIMED_POOLS.get(parsed.get_dialect().get_pool_class(parsed))
+    if poolclass is not None and name is not None:
+        poolclass = labelled_pool(poolclass, name)
+    if poolclass is not None:
+        options.update(
+            poolclass=poolclass,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+        )
+    return options
@@ -1,18 +1,38 @@
 """Database session and engine configuration."""
 from __future__ import annotations
 
+import os
 from contextlib import contextmanager
 from typing import Iterator
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
+from app.core import metrics
 from app.core.config import get_settings
+from app.db.instrumentation import instrument
+from app.db.pool import pool_options
 
 settings = get_settings()
-engine = create_engine(settings.database_url, pool_pre_ping=True, future=True)
+engine = create_engine(settings.database_url, future=True, **pool_options(settings.database_url, settings, "sync"))
+instrument(engine)
+metrics.watch_pool("sync", engine)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)
 
+# Read-only traffic goes to the replica when one is configured; otherwise the
+# replica names simply alias the primary.
+if settings.read_database_url:
+    read_engine = create_engine(
+        settings.read_database_url, future=True, **pool_options(settings.read_database_url, settings, "replica")
+    )
+    instrument(read_engine)
+    metrics.watch_pool("replica", read_engine)
+else:
+    read_engine = engine
+ReadSessionLocal = sessionmaker(bind=read_engine, autocommit=False, autoflush=False, future=True)
+
 
 @contextmanager
 def session_scope() -> Iterator[sessionmaker]:
@@ -27,3 +47,68 @@ def session_scope() -> Iterator[sessionmaker]:
         raise
     finally:
         session.close()
+
+
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+# Lazily created async engines keyed by role ("primary" / "replica").
+_async_engines: dict[str, tuple[AsyncEngine, async_sessionmaker]] = {}
+
+
+def async_database_url(url: str) -> str:
+    """Swap a sync driver for its asyncio counterpart (``postgresql`` -> ``postgresql+asyncpg``)."""
+
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"No async driver configured for {backend!r} databases")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def get_async_sessionmaker(replica: bool = False) -> async_sessionmaker:
+    """Create the async engine on first use so sync-only deployments never import its driver.
+
+    ``replica=True`` returns the read-replica sessionmaker, or the primary one
+    when no replica is configured.
+    """
+
+    role = "replica" if replica and settings.read_database_url else "primary"
+    if role not in _async_engines:
+        if role == "replica":
+            url = async_database_url(settings.read_database_url)
+        else:
+            url = settings.async_database_url or async_database_url(settings.database_url)
+        name = "async" if role == "primary" else "async_replica"
+        async_engine = create_async_engine(url, **pool_options(url, settings, name))
+        instrument(async_engine.sync_engine)
+        metrics.watch_pool(name, async_engine)
+        _async_engines[role] = (
+            async_engine,
+            async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False),
+        )
+    return _async_engines[role][1]
+
+
+async def dispose_async_engine() -> None:
+    for async_engine, _ in list(_async_engines.values()):
+        await async_engine.dispose()
+    _async_engines.clear()
+
+
+def _reset_after_fork() -> None:
+    """Drop connections inherited from the parent (e.g. a preloading gunicorn master).
+
+    ``close=False`` leaves the parent's sockets alone; the child opens its own on
+    first use. The async engines are bound to the parent's event loop, so they
+    are simply forgotten and recreated lazily.
+    """
+
+    engine.dispose(close=False)
+    if read_engine is not engine:
+        read_engine.dispose(close=False)
+    for async_engine, _ in _async_engines.values():
+        async_engine.sync_engine.dispose(close=False)
+    _async_engines.clear()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,61 @@
+"""Dialect-aware ``INSERT ... ON CONFLICT DO UPDATE`` for one-row-per-key tables."""
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping, Sequence
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+# Keep multi-row VALUES lists well under SQLite's bound-parameter limit.
+CHUNK_ROWS = 500
+
+SetClause = Sequence[str] | Callable[[Any], Mapping[str, Any]]
+
+
+def _insert_for(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise RuntimeError(f"Native upsert is not supported on {dialect!r}")
+    return insert
+
+
+def upsert(
+    db: Session,
+    model: Any,
+    rows: Sequence[Mapping[str, Any]],
+    index_elements: Sequence[str],
+    set_: SetClause | None = None,
+    where: Any | None = None,
+) -> int:
+    """Insert ``rows`` or update the row already holding their key, in one statement per chunk.
+
+    ``index_elements`` must match a unique constraint. ``set_`` lists the columns
+    to overwrite from the incoming row (default: every non-key column in
+    ``rows``), or is a callable receiving ``excluded`` and returning a SET
+    mapping for updates that combine old and new values. ``where`` restricts
+    the update to existing rows matching it; rows it rejects are left alone
+    and not counted.
+    """
+
+    if not rows:
+        return 0
+
+    insert = _insert_for(db)
+    written = 0
+    for start in range(0, len(rows), CHUNK_ROWS):
+        stmt = insert(model).values(list(rows[start : start + CHUNK_ROWS]))
+        if callable(set_):
+            assignments = dict(set_(stmt.excluded))
+        else:
+            columns = set_ if set_ is not None else [key for key in rows[0] if key not in index_elements]
+            assignments = {column: stmt.excluded[column] for column in columns}
+        if assignments:
+            stmt = stmt.on_conflict_do_update(index_elements=list(index_elements), set_=assignments, where=where)
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=list(index_elements))
+        written += db.execute(stmt).rowcount or 0
+    return written
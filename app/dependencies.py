@@ -1,22 +1,62 @@
 """Shared FastAPI dependencies."""
 from __future__ import annotations
 
-from typing import Iterator
+import time
+from typing import AsyncIterator, Iterator
 
 from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.session import SessionLocal
+from app.core.config import get_settings
+from app.db.session import ReadSessionLocal, SessionLocal, get_async_sessionmaker
 
+PRIMARY_PIN_KEY = "read_primary_until"
 
-def get_db() -> Iterator[Session]:
+
+def _pin_to_primary(request: Request) -> None:
+    """Send this signed-in user's reads to the primary until the replica has caught up."""
+
+    session = request.scope.get("session")
+    if session is not None and "user_id" in session:
+        session[PRIMARY_PIN_KEY] = time.time() + get_settings().replica_pin_seconds
+
+
+def _pinned_to_primary(request: Request) -> bool:
+    session = request.scope.get("session") or {}
+    return session.get(PRIMARY_PIN_KEY, 0) > time.time()
+
+
+def get_db(request: Request) -> Iterator[Session]:
     db = SessionLocal()
+    event.listen(db, "after_commit", lambda _: _pin_to_primary(request))
     try:
         yield db
     finally:
         db.close()
 
 
+def get_read_db(request: Request) -> Iterator[Session]:
+    """Session for read-only pages; uses the replica unless the user has just written."""
+
+    db = SessionLocal() if _pinned_to_primary(request) else ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+async def get_async_read_db(request: Request) -> AsyncIterator[AsyncSession]:
+    async with get_async_sessionmaker(replica=not _pinned_to_primary(request))() as db:
+        yield db
+
+
 def require_session(request: Request) -> dict:
     session = request.session or {}
     if "user_id" not in session:
@@ -10,19 +10,21 @@ from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 
 from app.core.config import get_settings
-from app.middleware import RequestIDMiddleware
+from app.middleware import JSONLogFormatter, RequestIDLogFilter, RequestIDMiddleware
 from app.db import models
 from app.db.base import Base
-from app.db.session import SessionLocal, engine
-from app.routes import admin, auth, billing_stripe, health, integrations_slack, jobs, public
+from app.db.session import SessionLocal, dispose_async_engine, engine
+from app.routes import admin, auth, billing_stripe, health, ingest, integrations_slack, jobs, public, public_async
+from app.services import ingest_buffer, scheduler
 from app.services import risk as risk_service
+from app.services import rollup as rollup_service
 
 settings = get_settings()
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="{\"timestamp\":\"%(asctime)s\",\"level\":\"%(levelname)s\",\"message\":\"%(message)s\",\"logger\":\"%(name)s\"}",
-)
+logging.basicConfig(level=logging.INFO)
+for handler in logging.getLogger().handlers:
+    handler.setFormatter(JSONLogFormatter())
+    handler.addFilter(RequestIDLogFilter())
 
 app = FastAPI(title="Remote-Team Mental Health Tracker", version="1.0.0")
 
@@ -43,6 +45,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.async_routes:
+    # Registered first so these handlers shadow the sync ones on the same paths.
+    app.include_router(public_async.router)
 app.include_router(public.router)
 app.include_router(health.router)
 app.include_router(auth.router)
@@ -50,6 +55,7 @@ app.include_router(admin.router)
 app.include_router(integrations_slack.router)
 app.include_router(billing_stripe.router)
 app.include_router(jobs.router)
+app.include_router(ingest.router)
 
 
 @app.on_event("startup")
@@ -87,17 +93,37 @@ def ensure_seed_data() -> None:
                 (3, 4, "Meetings late in the day again."),
             ]
             for idx, (mood, stress, comment) in enumerate(samples):
-                session.add(
-                    models.Checkin(
-                        user_id=user.id,
-                        team_id=team.id,
-                        mood=mood,
-                        stress=stress,
-                        comment=comment,
-                        submitted_at=now - timedelta(days=idx),
-                        checkin_date=(now - timedelta(days=idx)).date(),
-                    )
+                checkin = models.Checkin(
+                    user_id=user.id,
+                    team_id=team.id,
+                    mood=mood,
+                    stress=stress,
+                    comment=comment,
+                    submitted_at=now - timedelta(days=idx),
+                    checkin_date=(now - timedelta(days=idx)).date(),
                 )
+                session.add(checkin)
+                rollup_service.record_checkin(session, checkin)
 
             risk_service.upsert_risk_snapshot(session, team)
             session.commit()
+
+
+@app.on_event("startup")
+def start_scheduler() -> None:
+    scheduler.start()
+
+
+@app.on_event("shutdown")
+def stop_scheduler() -> None:
+    scheduler.stop(timeout=30)
+
+
+@app.on_event("shutdown")
+async def close_async_engine() -> None:
+    await dispose_async_engine()
+
+
+@app.on_event("shutdown")
+def drain_checkin_buffer() -> None:
+    ingest_buffer.drain(timeout=30)
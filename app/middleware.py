@@ -1,17 +1,128 @@
 """Custom ASGI middleware."""
 from __future__ import annotations
 
+import json
+import logging
+import time
 import uuid
-from typing import Callable
-
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    """Attach a request ID to each inbound request for logging correlation."""
-
-    async def dispatch(self, request: Request, call_next: Callable):
-        request_id = request.headers.get("x-request-id", str(uuid.uuid4()))
-        request.state.request_id = request_id
-        response = await call_next(request)
-        response.headers["x-request-id"] = request_id
-        return response
+from contextvars import ContextVar
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+from app.core.config import get_settings
+from app.db import instrumentation
+
+logger = logging.getLogger("app.requests")
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+
+class RequestIDLogFilter(logging.Filter):
+    """Stamp every log record with the id of the request being served."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JSONLogFormatter(logging.Formatter):
+    """One JSON object per record; ``extra={"log_fields": {...}}`` adds structured fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": self.formatTime(record),
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        entry.update(getattr(record, "log_fields", {}))
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RequestIDMiddleware:
+    """Assign a request id, time the request and report its SQL cost.
+
+    Written against raw ASGI rather than ``BaseHTTPMiddleware`` so requests
+    run in the caller's task and streamed bodies pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = next(
+            (value.decode("latin-1") for key, value in scope["headers"] if key == b"x-request-id"),
+            None,
+        ) or str(uuid.uuid4())
+        scope.setdefault("state", {})["request_id"] = request_id
+        token = request_id_var.set(request_id)
+        started = time.perf_counter()
+        status_code = 500
+
+        with instrumentation.track(request_id) as stats:
+
+            async def send_wrapper(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    headers = MutableHeaders(scope=message)
+                    headers["x-request-id"] = request_id
+                    headers["server-timing"] = f"{stats.server_timing()}, app;dur={elapsed_ms:.2f}"
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                self._report(scope, status_code, (time.perf_counter() - started) * 1000, stats)
+                request_id_var.reset(token)
+
+    @staticmethod
+    def _report(scope: Scope, status_code: int, elapsed_ms: float, stats: instrumentation.QueryStats) -> None:
+        # The router stores the matched route in the scope; label by its template so
+        # paths carrying tokens or ids don't each become their own series.
+        route = scope.get("route")
+        metrics.observe_request(
+            scope["method"], getattr(route, "path", None) or "unmatched", status_code, elapsed_ms / 1000
+        )
+        fields = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status_code,
+            "duration_ms": round(elapsed_ms, 2),
+            "db_queries": stats.count,
+            "db_ms": round(stats.total_ms, 2),
+            "db_slowest_ms": round(stats.slowest_ms, 2),
+        }
+        logger.info(
+            "%s %s %s duration_ms=%.2f db_queries=%d db_ms=%.2f db_slowest_ms=%.2f",
+            scope["method"],
+            scope["path"],
+            status_code,
+            elapsed_ms,
+            stats.count,
+            stats.total_ms,
+            stats.slowest_ms,
+            extra={"log_fields": fields},
+        )
+        budget = get_settings().query_budget
+        if stats.count > budget:
+            logger.warning(
+                "Query budget exceeded: %s %s ran %d statements (budget %d) slowest=%.2fms %s",
+                scope["method"],
+                scope["path"],
+                stats.count,
+                budget,
+                stats.slowest_ms,
+                stats.slowest_statement,
+                extra={"log_fields": {**fields, "query_budget": budget, "slowest_statement": stats.slowest_statement}},
+            )
@@ -11,8 +11,8 @@ from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.db import models
-from app.dependencies import get_db, require_csrf, require_role
-from app.services import analytics
+from app.dependencies import get_db, get_read_db, require_csrf, require_role
+from app.services import analytics, tokens
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 templates = Jinja2Templates(directory="app/templates")
@@ -48,7 +48,7 @@ class CreateUserRequest(BaseModel):
 def admin_home(
     request: Request,
     session: dict = Depends(require_role("org_admin", "team_lead")),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> HTMLResponse:
     org = db.query(models.Org).filter(models.Org.id == session["org_id"]).one()
 
@@ -57,18 +57,19 @@ def admin_home(
         teams_query = teams_query.filter(models.Team.id == session.get("team_id"))
     teams = teams_query.order_by(models.Team.name).all()
 
+    metrics = analytics.team_metrics_batch(db, [team.id for team in teams])
     team_data = [
         {
             "team": team,
-            "metrics": analytics.team_metrics(db, team),
+            "metrics": metrics[team.id],
         }
         for team in teams
     ]
 
     return templates.TemplateResponse(
+        request,
         "admin.html",
         {
-            "request": request,
             "org": org,
             "teams": team_data,
             "session": session,
@@ -151,5 +152,6 @@ def create_user(
     )
     db.add(audit)
     db.commit()
+    tokens.register(hashed)
 
     return {"id": user.id, "team_id": user.team_id, "email": user.email, "role": user.role}
@@ -12,7 +12,8 @@ from sqlalchemy.orm import Session
 from app.core.security import create_token, decode_token, generate_csrf_token
 from app.db import models
 from app.dependencies import get_db
-from app.services.email import send_magic_link
+from app.services import outbox
+from app.services.email import magic_link_message
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -43,11 +44,12 @@ def request_magic_link(
 
     nonce = models.EmailLoginNonce(org_id=org.id, email=email, token=nonce_value, expires_at=expires_at)
     db.add(nonce)
-    db.commit()
 
     callback_url = str(request.url_for("auth_callback"))
     link = f"{callback_url}?token={nonce_value}"
-    send_magic_link(email, link)
+    # Committed together, so a link is only ever mailed for a nonce that exists.
+    outbox.enqueue_email(db, magic_link_message(email, link))
+    db.commit()
 
     return {"detail": "Magic link sent"}
 
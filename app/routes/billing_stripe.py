@@ -1,18 +1,20 @@
 """Stripe billing routes."""
 from __future__ import annotations
 
-
 import stripe
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import get_settings
 from app.db import models
 from app.db.models import Plan
+from app.db.upsert import upsert
 from app.dependencies import get_db, require_csrf, require_role
 from app.services import billing as billing_service
+from app.services import stripe_events
 
 router = APIRouter(prefix="/billing", tags=["billing"])
 
@@ -50,16 +52,12 @@ def create_checkout(
     except Exception as exc:
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc)) from exc
 
-    subscription = (
-        db.query(models.Subscription)
-        .filter(models.Subscription.org_id == session["org_id"])
-        .one_or_none()
+    upsert(
+        db,
+        models.Subscription,
+        [{"org_id": session["org_id"], "plan": payload.plan, "status": models.SubscriptionStatus.trialing}],
+        index_elements=["org_id"],
     )
-    if not subscription:
-        subscription = models.Subscription(org_id=session["org_id"], plan=payload.plan)
-    subscription.plan = payload.plan
-    subscription.status = models.SubscriptionStatus.trialing
-    db.add(subscription)
     db.commit()
 
     return {"checkout_url": checkout_url}
@@ -108,5 +106,6 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)) -> dic
     except Exception as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid signature") from exc
 
-    billing_service.update_subscription_from_event(db, event)
-    return {"status": "processed"}
+    # Applied later by the Stripe event worker; acknowledging fast keeps Stripe from retrying.
+    stored = await run_in_threadpool(stripe_events.record_event, db, event.to_dict())
+    return {"status": "queued" if stored else "duplicate"}
@@ -1,7 +1,14 @@
-"""Health check endpoint."""
+"""Health check and metrics endpoints."""
 from __future__ import annotations
 
-from fastapi import APIRouter
+import hmac
+
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import Response
+
+from app.core import metrics
+from app.core.config import get_settings
+from app.services import analytics, ingest_buffer
 
 router = APIRouter()
 
@@ -9,3 +16,21 @@ router = APIRouter()
 @router.get("/healthz", tags=["health"])
 def healthcheck() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@router.get("/healthz/cache", tags=["health"])
+def cache_stats() -> dict[str, int]:
+    return analytics.get_cache().stats()
+
+
+@router.get("/healthz/checkin-buffer", tags=["health"])
+def checkin_buffer_stats() -> dict[str, float | int]:
+    return ingest_buffer.stats()
+
+
+@router.get("/metrics", tags=["health"], include_in_schema=False)
+def prometheus_metrics(authorization: str | None = Header(None)) -> Response:
+    token = get_settings().metrics_scrape_token
+    if token and not hmac.compare_digest(authorization or "", f"Bearer {token}"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,75 @@
+"""Bulk ingestion endpoints for Slack and HRIS-side collectors."""
+from __future__ import annotations
+
+from dataclasses import asdict
+from datetime import date
+from typing import Any
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import get_settings
+from app.dependencies import get_db
+from app.services import analytics
+from app.services import ingest as ingest_service
+
+router = APIRouter(prefix="/ingest", tags=["ingest"])
+
+
+class CheckinRecordPayload(BaseModel):
+    token: str = Field(..., min_length=1)
+    mood: int
+    stress: int
+    comment: str | None = ""
+    checkin_date: date | None = Field(None, alias="date")
+
+
+class CheckinBatchRequest(BaseModel):
+    records: list[CheckinRecordPayload]
+
+
+def _verify_secret(secret: str | None) -> None:
+    settings = get_settings()
+    if not settings.ingest_secret:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Ingest secret not configured")
+    if secret != settings.ingest_secret:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid ingest secret")
+
+
+@router.post("/checkins")
+def ingest_checkins(
+    payload: CheckinBatchRequest,
+    db: Session = Depends(get_db),
+    x_ingest_secret: str | None = Header(None),
+) -> dict[str, Any]:
+    _verify_secret(x_ingest_secret)
+    settings = get_settings()
+    if len(payload.records) > settings.ingest_max_batch:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.ingest_max_batch} records per batch",
+        )
+
+    records = [
+        ingest_service.CheckinRecord(
+            token=record.token,
+            mood=record.mood,
+            stress=record.stress,
+            comment=record.comment,
+            checkin_date=record.checkin_date,
+        )
+        for record in payload.records
+    ]
+    outcome = ingest_service.ingest_checkins(db, records)
+    db.commit()
+    metrics.checkins_ingested.inc("bulk", amount=outcome.created)
+    for team_id in outcome.team_ids:
+        analytics.invalidate_team(team_id)
+
+    return {
+        "created": outcome.created,
+        "rejected": outcome.rejected,
+        "results": [asdict(result) for result in outcome.results],
+    }
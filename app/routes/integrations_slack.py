@@ -12,7 +12,9 @@ from sqlalchemy.orm import Session
 from app.core.config import get_settings
 from app.core.security import create_token, decode_token
 from app.db import models
+from app.db.upsert import upsert
 from app.dependencies import get_db, require_csrf, require_role
+from app.services import outbox
 from app.services import slack as slack_service
 
 router = APIRouter(prefix="/integrations/slack", tags=["slack"])
@@ -64,23 +66,25 @@ def slack_callback(
     redirect_uri = str(request.url_for("slack_callback"))
     data = slack_service.oauth_access(code, redirect_uri)
 
-    integration = (
-        db.query(models.Integration)
-        .filter(models.Integration.org_id == org_id, models.Integration.kind == models.IntegrationKind.slack)
-        .one_or_none()
-    )
-    if not integration:
-        integration = models.Integration(org_id=org_id, kind=models.IntegrationKind.slack)
-
     incoming = data.get("incoming_webhook", {})
-    integration.status = "connected"
-    integration.config_json = {
-        "team_id": data.get("team", {}).get("id"),
-        "team_name": data.get("team", {}).get("name"),
-        "bot_token": data.get("access_token"),
-        "channel": incoming.get("channel_id"),
-    }
-    db.add(integration)
+    upsert(
+        db,
+        models.Integration,
+        [
+            {
+                "org_id": org_id,
+                "kind": models.IntegrationKind.slack,
+                "status": "connected",
+                "config_json": {
+                    "team_id": data.get("team", {}).get("id"),
+                    "team_name": data.get("team", {}).get("name"),
+                    "bot_token": data.get("access_token"),
+                    "channel": incoming.get("channel_id"),
+                },
+            }
+        ],
+        index_elements=["org_id", "kind"],
+    )
     db.commit()
 
     return RedirectResponse(url="/admin", status_code=status.HTTP_302_FOUND)
@@ -127,8 +131,7 @@ def send_test_message(
     if not token or not channel:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Slack channel not configured")
 
-    ok = slack_service.post_message(token, channel, "Test message from RMHT")
-    if not ok:
-        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Failed to post to Slack")
+    outbox.enqueue_slack(db, integration.id, "Test message from RMHT")
+    db.commit()
 
-    return {"detail": "Test message sent"}
+    return {"detail": "Test message queued"}
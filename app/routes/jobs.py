@@ -1,16 +1,22 @@
-"""Background job endpoints triggered by Railway cron."""
+"""Background job endpoints for external cron and manual runs.
+
+The same jobs run on their own when ``SCHEDULER_ENABLED`` is set (see
+``app.services.scheduler``); both paths share the job's lease, so a manual run
+never overlaps a scheduled one.
+"""
 from __future__ import annotations
 
-from datetime import date, timedelta
+from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
 from app.db import models
 from app.dependencies import get_db
-from app.services import billing as billing_service
-from app.services import slack as slack_service
+from app.services import jobs as jobs_service
+from app.services import scheduler
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
@@ -23,6 +29,13 @@ def _verify_secret(secret: str | None) -> None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid cron secret")
 
 
+def _run(db: Session, job: str, **kwargs: Any) -> dict[str, Any]:
+    result = scheduler.run_exclusive(db, job, "http", **kwargs)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job {job} is already running")
+    return result
+
+
 @router.post("/weekly-checkin")
 def weekly_checkin(
     request: Request,
@@ -30,60 +43,89 @@ def weekly_checkin(
     db: Session = Depends(get_db),
 ) -> dict[str, int]:
     _verify_secret(secret)
-    settings = get_settings()
-    base_url = settings.app_base_url or str(request.base_url).rstrip("/")
-    integrations = (
-        db.query(models.Integration)
-        .filter(models.Integration.kind == models.IntegrationKind.slack, models.Integration.status == "connected")
-        .all()
-    )
-
-    posted = 0
-    for integration in integrations:
-        token = integration.config_json.get("bot_token")
-        channel = integration.config_json.get("channel")
-        if not token or not channel:
-            continue
-        message = (
-            "\u2705 It's time for your weekly RMHT check-in! Use your personal token at "
-            f"{base_url}/checkin/<token> to share mood & stress in under 60 seconds."
-        )
-        if slack_service.post_message(token, channel, message):
-            posted += 1
-
-    return {"orgs_notified": posted, "total_integrations": len(integrations)}
+    base_url = get_settings().app_base_url or str(request.base_url).rstrip("/")
+    return _run(db, "weekly_checkin", base_url=str(base_url))
 
 
 @router.post("/daily-retention")
 def daily_retention(
     secret: str,
+    dry_run: bool = False,
     db: Session = Depends(get_db),
-) -> dict[str, int]:
+) -> dict[str, Any]:
     _verify_secret(secret)
-    removed = 0
-    today = date.today()
-    teams = db.query(models.Team).all()
-    for team in teams:
-        retention_days = team.org.retention_days if team.org else 180
-        cutoff = today - timedelta(days=retention_days)
-        deleted = (
-            db.query(models.Checkin)
-            .filter(models.Checkin.team_id == team.id, models.Checkin.checkin_date < cutoff)
-            .delete(synchronize_session=False)
-        )
-        removed += deleted
-    db.commit()
-    return {"checkins_removed": removed}
+    return _run(db, "daily_retention", dry_run=dry_run)
+
+
+@router.post("/archive-checkins")
+def archive_checkins(
+    secret: str,
+    db: Session = Depends(get_db),
+) -> dict[str, Any]:
+    _verify_secret(secret)
+    return _run(db, "archive_checkins")
 
 
 @router.post("/sync-seats")
 def sync_seats(
     secret: str,
     db: Session = Depends(get_db),
-) -> dict[str, str]:
+) -> dict[str, int]:
     _verify_secret(secret)
     try:
-        billing_service.sync_subscription_seats(db)
+        return _run(db, "sync_seats")
+    except HTTPException:
+        raise
     except Exception as exc:
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc)) from exc
-    return {"status": "synced"}
+
+
+@router.post("/recompute-risk")
+def recompute_risk(
+    secret: str,
+    db: Session = Depends(get_db),
+) -> dict[str, int]:
+    _verify_secret(secret)
+    return _run(db, "recompute_risk")
+
+
+@router.post("/rebuild-rollups")
+def rebuild_rollups(
+    secret: str,
+    db: Session = Depends(get_db),
+) -> dict[str, int]:
+    _verify_secret(secret)
+    return _run(db, "rebuild_rollups")
+
+
+@router.get("/runs")
+def job_runs(
+    secret: str,
+    job: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+) -> list[dict[str, Any]]:
+    """Most recent runs, newest first, for watching durations and failures over time."""
+
+    _verify_secret(secret)
+    if job is not None and job not in jobs_service.JOBS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown job")
+    stmt = select(models.JobRun).order_by(models.JobRun.started_at.desc(), models.JobRun.id.desc()).limit(limit)
+    if job is not None:
+        stmt = stmt.where(models.JobRun.job == job)
+    return [
+        {
+            "id": run.id,
+            "job": run.job,
+            "trigger": run.trigger,
+            "holder": run.holder,
+            "slot_at": run.slot_at.isoformat() if run.slot_at else None,
+            "started_at": run.started_at.isoformat(),
+            "finished_at": run.finished_at.isoformat() if run.finished_at else None,
+            "duration_seconds": run.duration_seconds,
+            "status": run.status,
+            "result": run.result,
+            "error": run.error,
+        }
+        for run in db.execute(stmt).scalars()
+    ]
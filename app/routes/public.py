@@ -1,29 +1,27 @@
 """Public marketing and participant routes."""
 from __future__ import annotations
 
-import hashlib
-from datetime import date, datetime, timedelta
-from typing import Annotated
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import date, datetime
+from typing import Annotated, Any
 
 from fastapi import APIRouter, Depends, Form, HTTPException, Request, status
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app.core import metrics
+from app.core.config import get_settings
 from app.db import models
-from app.dependencies import get_db
-from app.services import analytics, risk
+from app.dependencies import get_db, get_read_db
+from app.services import analytics, ingest_buffer, risk, rollup, tokens
+from app.services import dashboard as dashboard_service
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
 templates.env.globals["app_name"] = "Remote-Team Mental Health Tracker"
 
 
-def hash_token(token: str) -> str:
-    return hashlib.sha256(token.strip().encode("utf-8")).hexdigest()
-
-
 def mask_token(token: str) -> str:
     token = token.strip()
     if len(token) <= 4:
@@ -33,7 +31,73 @@ def mask_token(token: str) -> str:
 
 @router.get("/", response_class=HTMLResponse)
 def home(request: Request) -> HTMLResponse:
-    return templates.TemplateResponse("home.html", {"request": request})
+    return templates.TemplateResponse(request, "home.html")
+
+
+def checkin_response(request: Request, token: str, user: tokens.TokenInfo, success: bool = False) -> HTMLResponse:
+    context = {"team_name": user.team_name, "token_masked": mask_token(token)}
+    if success:
+        context["success"] = True
+    return templates.TemplateResponse(request, "checkin_form.html", context)
+
+
+def checkin_row(user: tokens.TokenInfo, mood: int, stress: int, comment: str | None) -> dict[str, Any]:
+    """Validate a form submission into a ``checkins`` row."""
+
+    if not (1 <= mood <= 5 and 1 <= stress <= 5):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Scores must be 1-5")
+
+    return {
+        "user_id": user.user_id,
+        "team_id": user.team_id,
+        "mood": mood,
+        "stress": stress,
+        "comment": comment or "",
+        "checkin_date": date.today(),
+        "submitted_at": datetime.utcnow(),
+    }
+
+
+def save_checkin(db: Session, row: dict[str, Any]) -> None:
+    """Store one check-in with its rollup and risk updates; the caller commits."""
+
+    checkin = models.Checkin(**row)
+    db.add(checkin)
+    db.flush()
+
+    rollup.record_checkin(db, checkin)
+    risk.upsert_team_risk(db, checkin.team_id)
+
+
+def dashboard_response(request: Request, data: dashboard_service.DashboardData | None) -> HTMLResponse:
+    if data is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
+    if not data.available:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough data to show dashboard")
+
+    chart_config = {
+        "labels": [point.day.strftime("%b %d") for point in data.trend],
+        "mood": [round(point.avg_mood, 2) for point in data.trend],
+        "stress": [round(point.avg_stress, 2) for point in data.trend],
+    }
+
+    signals = []
+    if data.avg_stress >= 3.5:
+        signals.append({"status": "critical", "message": "Stress trending high vs. target"})
+    if data.participation_rate < 70:
+        signals.append({"status": "watch", "message": "Participation below 70% of active seats"})
+
+    return templates.TemplateResponse(
+        request,
+        "dashboard.html",
+        {
+            "dashboard": data,
+            "chart_config": chart_config,
+            "signals": signals,
+            "risk_level": str(data.risk_level or "low").capitalize(),
+            "base_url": str(request.base_url).rstrip("/"),
+        },
+    )
 
 
 @router.get("/checkin/{token}", response_class=HTMLResponse)
@@ -42,19 +106,11 @@ def get_checkin(
     request: Request,
     db: Annotated[Session, Depends(get_db)],
 ) -> HTMLResponse:
-    hashed = hash_token(token)
-    user = db.query(models.User).filter(models.User.anon_token_hash == hashed, models.User.active.is_(True)).first()
+    user = tokens.resolve(db, tokens.hash_token(token))
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invalid token")
 
-    return templates.TemplateResponse(
-        "checkin_form.html",
-        {
-            "request": request,
-            "team": user.team,
-            "token_masked": mask_token(token),
-        },
-    )
+    return checkin_response(request, token, user)
 
 
 @router.post("/checkin/{token}")
@@ -66,119 +122,34 @@ def submit_checkin(
     db: Annotated[Session, Depends(get_db)],
     comment: Annotated[str | None, Form()] = "",
 ) -> HTMLResponse:
-    hashed = hash_token(token)
-    user = db.query(models.User).filter(models.User.anon_token_hash == hashed, models.User.active.is_(True)).first()
+    user = tokens.resolve(db, tokens.hash_token(token))
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invalid token")
 
-    if not (1 <= mood <= 5 and 1 <= stress <= 5):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Scores must be 1-5")
-
-    checkin = models.Checkin(
-        user_id=user.id,
-        team_id=user.team_id,
-        mood=mood,
-        stress=stress,
-        comment=comment or "",
-        checkin_date=date.today(),
-        submitted_at=datetime.utcnow(),
-    )
-    db.add(checkin)
-    db.flush()
-
-    risk.upsert_risk_snapshot(db, user.team)
-    db.commit()
-
-    return templates.TemplateResponse(
-        "checkin_form.html",
-        {
-            "request": request,
-            "team": user.team,
-            "token_masked": mask_token(token),
-            "success": True,
-        },
-    )
+    row = checkin_row(user, mood, stress, comment)
+    pending = ingest_buffer.submit(row)
+    if pending is not None:
+        # Give the connection back first: the flusher draws from the same pool.
+        db.close()
+        try:
+            pending.result(timeout=get_settings().checkin_buffer_ack_timeout)
+        except FutureTimeoutError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=ingest_buffer.UNCONFIRMED
+            ) from exc
+    else:
+        save_checkin(db, row)
+        db.commit()
+        metrics.checkins_ingested.inc("form")
+        analytics.invalidate_team(user.team_id)
+
+    return checkin_response(request, token, user, success=True)
 
 
 @router.get("/dashboard/{team_id}", response_class=HTMLResponse)
 def dashboard(
     team_id: int,
     request: Request,
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[Session, Depends(get_read_db)],
 ) -> HTMLResponse:
-    team = db.query(models.Team).filter(models.Team.id == team_id).first()
-    if not team:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
-
-    metrics = analytics.team_metrics(db, team)
-    if not metrics.get("available"):
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough data to show dashboard")
-
-    recent_days = date.today() - timedelta(days=14)
-    trends = (
-        db.query(
-            models.Checkin.checkin_date,
-            func.avg(models.Checkin.mood),
-            func.avg(models.Checkin.stress),
-        )
-        .filter(models.Checkin.team_id == team.id, models.Checkin.checkin_date >= recent_days)
-        .group_by(models.Checkin.checkin_date)
-        .order_by(models.Checkin.checkin_date)
-        .all()
-    )
-
-    chart_config = {
-        "labels": [row[0].strftime("%b %d") for row in trends],
-        "mood": [round(float(row[1]), 2) for row in trends],
-        "stress": [round(float(row[2]), 2) for row in trends],
-    }
-
-    active_users = db.query(models.User).filter(models.User.team_id == team.id, models.User.active.is_(True)).count()
-    participation_base = active_users if active_users else 1
-    last_week = date.today() - timedelta(days=7)
-    participation = (
-        db.query(func.count(models.Checkin.id))
-        .filter(models.Checkin.team_id == team.id, models.Checkin.checkin_date >= last_week)
-        .scalar()
-    ) or 0
-    participation_rate = min(100.0, (participation / participation_base) * 100)
-
-    latest_checkins = (
-        db.query(models.Checkin)
-        .filter(models.Checkin.team_id == team.id)
-        .order_by(models.Checkin.submitted_at.desc())
-        .limit(5)
-        .all()
-    )
-
-    roster_counts = (
-        db.query(models.User.id, models.User.email, func.count(models.Checkin.id))
-        .outerjoin(models.Checkin, models.Checkin.user_id == models.User.id)
-        .filter(models.User.team_id == team.id)
-        .group_by(models.User.id)
-        .all()
-    )
-
-    signals = []
-    avg_stress_value = metrics.get("avg_stress")
-    if isinstance(avg_stress_value, (int, float)) and avg_stress_value >= 3.5:
-        signals.append({"status": "critical", "message": "Stress trending high vs. target"})
-    if participation_rate < 70:
-        signals.append({"status": "watch", "message": "Participation below 70% of active seats"})
-
-    return templates.TemplateResponse(
-        "dashboard.html",
-        {
-            "request": request,
-            "team": team,
-            "average_mood": metrics.get("avg_mood", 0),
-            "average_stress": metrics.get("avg_stress", 0),
-            "participation_rate": participation_rate,
-            "chart_config": chart_config,
-            "signals": signals,
-            "latest_checkins": latest_checkins,
-            "roster": roster_counts,
-            "risk_level": str(metrics.get("risk_level") or "low").capitalize(),
-            "base_url": str(request.base_url).rstrip("/"),
-        },
-    )
+    return dashboard_response(request, dashboard_service.load_dashboard(db, team_id))
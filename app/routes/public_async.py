@@ -0,0 +1,88 @@
+"""Async variants of the public check-in and dashboard routes.
+
+Mounted ahead of :mod:`app.routes.public` when ``ASYNC_ROUTES`` is enabled, so
+database waits no longer hold a threadpool worker. The sync services are reused
+through ``AsyncSession.run_sync``; their queries still go through the async
+driver.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Form, HTTPException, Request, status
+from fastapi.responses import HTMLResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import metrics
+from app.core.config import get_settings
+from app.dependencies import get_async_db, get_async_read_db
+from app.routes.public import (
+    checkin_response,
+    checkin_row,
+    dashboard_response,
+    save_checkin,
+)
+from app.services import analytics, ingest_buffer, tokens
+from app.services import dashboard as dashboard_service
+
+router = APIRouter()
+
+
+async def _resolve(db: AsyncSession, token: str) -> tokens.TokenInfo:
+    user = await db.run_sync(tokens.resolve, tokens.hash_token(token))
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invalid token")
+    return user
+
+
+@router.get("/checkin/{token}", response_class=HTMLResponse)
+async def get_checkin(
+    token: str,
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+) -> HTMLResponse:
+    user = await _resolve(db, token)
+    return checkin_response(request, token, user)
+
+
+@router.post("/checkin/{token}")
+async def submit_checkin(
+    token: str,
+    mood: Annotated[int, Form(...)],
+    stress: Annotated[int, Form(...)],
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    comment: Annotated[str | None, Form()] = "",
+) -> HTMLResponse:
+    user = await _resolve(db, token)
+    row = checkin_row(user, mood, stress, comment)
+    pending = ingest_buffer.submit(row)
+    if pending is not None:
+        await db.close()
+        try:
+            # Shielded so a timeout does not cancel the buffer's own future.
+            await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(pending)), get_settings().checkin_buffer_ack_timeout
+            )
+        except TimeoutError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=ingest_buffer.UNCONFIRMED
+            ) from exc
+    else:
+        await db.run_sync(save_checkin, row)
+        await db.commit()
+        metrics.checkins_ingested.inc("form")
+        analytics.invalidate_team(user.team_id)
+
+    return checkin_response(request, token, user, success=True)
+
+
+@router.get("/dashboard/{team_id}", response_class=HTMLResponse)
+async def dashboard(
+    team_id: int,
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_async_read_db)],
+) -> HTMLResponse:
+    data = await db.run_sync(dashboard_service.load_dashboard, team_id)
+    return dashboard_response(request, data)
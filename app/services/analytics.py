@@ -1,43 +1,262 @@
 """Analytics helpers for dashboards."""
 from __future__ import annotations
 
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
 from datetime import date, timedelta
+from typing import Any, Protocol
 
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from app.db.models import Checkin, RiskSnapshot, Team
+from app.core.config import get_settings
+from app.db.models import RiskSnapshot, Team, TeamDailyStat
 
 MINIMUM_RESPONDENTS = 5
 
+# Every cached window per team; invalidation clears all of them.
+METRICS_WINDOW = "metrics30d"
+DASHBOARD_WINDOW = "dashboard"
+CACHED_WINDOWS = (METRICS_WINDOW, DASHBOARD_WINDOW)
+
+
+class CacheBackend(Protocol):
+    def get_many(self, keys: Sequence[str]) -> dict[str, Any]: ...
+
+    def set_many(self, values: dict[str, Any]) -> None: ...
+
+    def delete_many(self, keys: Sequence[str]) -> None: ...
+
+    def clear(self) -> None: ...
+
+
+class LRUTTLBackend:
+    """Bounded in-process cache; entries expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Sequence[str]) -> dict[str, Any]:
+        now = time.monotonic()
+        found: dict[str, Any] = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                expires_at, value = entry
+                if expires_at <= now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = value
+        return found
+
+    def set_many(self, values: dict[str, Any]) -> None:
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            for key, value in values.items():
+                self._entries[key] = (expires_at, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete_many(self, keys: Sequence[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SharedBackend:
+    """Cache shared across workers through a Redis-compatible client.
+
+    Only ``get``, ``set(key, value, ex=ttl)``, ``delete`` and ``scan_iter`` are
+    used, so any stand-in exposing those calls can replace Redis locally.
+    Values are stored as JSON.
+    """
+
+    def __init__(self, client: Any, ttl: float = 60.0, prefix: str = "rmht:analytics:") -> None:
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get_many(self, keys: Sequence[str]) -> dict[str, Any]:
+        found: dict[str, Any] = {}
+        for key in keys:
+            raw = self.client.get(self.prefix + key)
+            if raw is not None:
+                found[key] = json.loads(raw)
+        return found
+
+    def set_many(self, values: dict[str, Any]) -> None:
+        for key, value in values.items():
+            self.client.set(self.prefix + key, json.dumps(value), ex=max(int(self.ttl), 1))
+
+    def delete_many(self, keys: Sequence[str]) -> None:
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+    def clear(self) -> None:
+        stale = list(self.client.scan_iter(match=self.prefix + "*"))
+        if stale:
+            self.client.delete(*stale)
+
+
+class MetricsCache:
+    """Team/window keyed cache with hit and miss counters."""
+
+    def __init__(self, backend: CacheBackend) -> None:
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(team_id: int, window: str, day: date | None = None) -> str:
+        return f"team:{team_id}:{window}:{(day or date.today()).isoformat()}"
+
+    def get_many(self, team_ids: Iterable[int], window: str) -> dict[int, Any]:
+        keys = {self.key(team_id, window): team_id for team_id in team_ids}
+        found = self.backend.get_many(list(keys))
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return {keys[key]: value for key, value in found.items()}
+
+    def set_many(self, values: dict[int, Any], window: str) -> None:
+        self.backend.set_many({self.key(team_id, window): value for team_id, value in values.items()})
+
+    def invalidate_team(self, team_id: int) -> None:
+        self.backend.delete_many([self.key(team_id, window) for window in CACHED_WINDOWS])
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+def _build_cache() -> MetricsCache:
+    settings = get_settings()
+    if settings.metrics_cache_url:
+        import redis  # imported lazily: only the shared backend needs it
+
+        client = redis.Redis.from_url(settings.metrics_cache_url)
+        return MetricsCache(SharedBackend(client, ttl=settings.metrics_cache_ttl))
+    return MetricsCache(LRUTTLBackend(maxsize=settings.metrics_cache_size, ttl=settings.metrics_cache_ttl))
+
+
+_cache: MetricsCache | None = None
+
+
+def get_cache() -> MetricsCache:
+    """Return the process-wide metrics cache, building it on first use."""
+
+    global _cache
+    if _cache is None:
+        _cache = _build_cache()
+    return _cache
+
+
+def set_cache_backend(backend: CacheBackend) -> MetricsCache:
+    """Swap the cache backend (e.g. for a local shared-cache stand-in)."""
+
+    global _cache
+    _cache = MetricsCache(backend)
+    return _cache
+
+
+def invalidate_team(team_id: int) -> None:
+    """Drop every cached window for a team after its check-ins change."""
+
+    get_cache().invalidate_team(team_id)
+
+
+def invalidate_all() -> None:
+    get_cache().clear()
+
 
 def team_metrics(db: Session, team: Team) -> dict[str, float | int | None | bool]:
     """Compute aggregated team metrics enforcing anonymity thresholds."""
 
+    return team_metrics_batch(db, [team.id])[team.id]
+
+
+def team_metrics_batch(db: Session, team_ids: Sequence[int]) -> dict[int, dict[str, float | int | None | bool]]:
+    """Compute :func:`team_metrics` for many teams with two queries in total.
+
+    One grouped aggregate covers every team's 30-day window and one windowed
+    query picks each team's latest risk snapshot. The anonymity threshold is
+    still applied per team.
+    """
+
+    ids = list(dict.fromkeys(team_ids))
+    if not ids:
+        return {}
+
+    cache = get_cache()
+    metrics = cache.get_many(ids, METRICS_WINDOW)
+    missing = [team_id for team_id in ids if team_id not in metrics]
+    if missing:
+        fresh = _compute_team_metrics(db, missing)
+        cache.set_many(fresh, METRICS_WINDOW)
+        metrics.update(fresh)
+    return {team_id: metrics[team_id] for team_id in ids}
+
+
+def _compute_team_metrics(db: Session, ids: list[int]) -> dict[int, dict[str, float | int | None | bool]]:
     cutoff = date.today() - timedelta(days=30)
-    stmt = (
+    totals = {
+        team_id: (total, sum_mood, sum_stress)
+        for team_id, total, sum_mood, sum_stress in db.execute(
+            select(
+                TeamDailyStat.team_id,
+                func.sum(TeamDailyStat.checkin_count),
+                func.sum(TeamDailyStat.sum_mood),
+                func.sum(TeamDailyStat.sum_stress),
+            )
+            .where(TeamDailyStat.team_id.in_(ids), TeamDailyStat.day >= cutoff)
+            .group_by(TeamDailyStat.team_id)
+        )
+    }
+
+    ranked = (
         select(
-            func.count(Checkin.id),
-            func.avg(Checkin.mood),
-            func.avg(Checkin.stress),
+            RiskSnapshot.team_id,
+            RiskSnapshot.risk_level,
+            func.row_number()
+            .over(partition_by=RiskSnapshot.team_id, order_by=(RiskSnapshot.day.desc(), RiskSnapshot.id.desc()))
+            .label("rank"),
         )
-        .where(Checkin.team_id == team.id, Checkin.checkin_date >= cutoff)
-    )
-    total, avg_mood, avg_stress = db.execute(stmt).one()
-    if total is None or total < MINIMUM_RESPONDENTS:
-        return {"available": False, "respondent_count": total or 0}
-
-    risk = (
-        db.query(RiskSnapshot)
-        .filter(RiskSnapshot.team_id == team.id)
-        .order_by(RiskSnapshot.day.desc())
-        .first()
+        .where(RiskSnapshot.team_id.in_(ids))
+        .subquery()
     )
+    latest_risk = dict(db.execute(select(ranked.c.team_id, ranked.c.risk_level).where(ranked.c.rank == 1)).all())
 
-    return {
-        "available": True,
-        "respondent_count": int(total),
-        "avg_mood": float(avg_mood) if avg_mood is not None else None,
-        "avg_stress": float(avg_stress) if avg_stress is not None else None,
-        "risk_level": risk.risk_level.value if risk else None,
-    }
+    metrics: dict[int, dict[str, float | int | None | bool]] = {}
+    for team_id in ids:
+        total, sum_mood, sum_stress = totals.get(team_id, (None, None, None))
+        if total is None or total < MINIMUM_RESPONDENTS:
+            metrics[team_id] = {"available": False, "respondent_count": total or 0}
+            continue
+
+        risk = latest_risk.get(team_id)
+        metrics[team_id] = {
+            "available": True,
+            "respondent_count": int(total),
+            "avg_mood": sum_mood / total,
+            "avg_stress": sum_stress / total,
+            "risk_level": risk.value if risk else None,
+        }
+    return metrics
@@ -0,0 +1,86 @@
+"""Hot/cold tiering for check-in history.
+
+``checkins`` only keeps the last ``HOT_WINDOW_DAYS`` days, which covers every
+analytics window, so its indexes stay small. :func:`archive_checkins` moves
+older rows to ``checkins_archive`` in chunks. Code that needs full history
+(rollup rebuilds, exports, backfills) reads both tiers through
+:func:`checkin_history`.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import date, timedelta
+
+from sqlalchemy import Select, delete, insert, select, union_all
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.models import Checkin, CheckinArchive, Team
+
+COLUMNS = ("id", "user_id", "team_id", "submitted_at", "checkin_date", "mood", "stress", "comment")
+
+
+def hot_cutoff(today: date | None = None) -> date:
+    """Oldest day still kept in the hot ``checkins`` table."""
+
+    return (today or date.today()) - timedelta(days=get_settings().hot_window_days)
+
+
+def checkin_history(
+    team_ids: Iterable[int] | None = None,
+    start: date | None = None,
+    end: date | None = None,
+) -> Select:
+    """Check-ins from both tiers as one ``UNION ALL`` subquery named ``checkin_history``.
+
+    Filters are applied inside each branch so both tables can use their
+    ``(team_id, checkin_date)`` index.
+    """
+
+    ids = list(team_ids) if team_ids is not None else None
+    branches = []
+    for model in (Checkin, CheckinArchive):
+        branch = select(*(getattr(model, column) for column in COLUMNS))
+        if ids is not None:
+            branch = branch.where(model.team_id.in_(ids))
+        if start is not None:
+            branch = branch.where(model.checkin_date >= start)
+        if end is not None:
+            branch = branch.where(model.checkin_date <= end)
+        branches.append(branch)
+    return union_all(*branches).subquery("checkin_history")
+
+
+def archived_participants(db: Session, user_ids: Iterable[int], days: Iterable[date]) -> set[tuple[int, date]]:
+    """``(user_id, day)`` pairs that already have an archived check-in."""
+
+    return set(
+        db.execute(
+            select(CheckinArchive.user_id, CheckinArchive.checkin_date)
+            .where(CheckinArchive.user_id.in_(list(user_ids)), CheckinArchive.checkin_date.in_(list(days)))
+            .distinct()
+        ).all()
+    )
+
+
+def archive_checkins(db: Session, cutoff: date | None = None, chunk_size: int | None = None) -> int:
+    """Move check-ins dated before ``cutoff`` into the archive; commits per chunk, returns rows moved."""
+
+    cutoff = cutoff or hot_cutoff()
+    chunk_size = chunk_size or get_settings().archive_chunk_size
+    # Driving the scan from teams lets each team range-seek ix_checkins_team_date.
+    expired = select(Checkin.id).join(Team, Team.id == Checkin.team_id).where(Checkin.checkin_date < cutoff)
+    columns = [getattr(Checkin, column) for column in COLUMNS]
+
+    moved = 0
+    while True:
+        ids = db.execute(expired.limit(chunk_size)).scalars().all()
+        if not ids:
+            break
+        db.execute(insert(CheckinArchive).from_select(list(COLUMNS), select(*columns).where(Checkin.id.in_(ids))))
+        db.execute(delete(Checkin).where(Checkin.id.in_(ids)))
+        db.commit()
+        moved += len(ids)
+        if len(ids) < chunk_size:
+            break
+    return moved
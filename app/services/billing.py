@@ -2,22 +2,31 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from typing import Any
 
 import stripe
-from sqlalchemy import func
+from sqlalchemy import func, select, update
 from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
-from app.db.models import Plan, Subscription, SubscriptionStatus, User
+from app.db.models import Plan, Subscription, SubscriptionStatus, Team, User
+from app.db.upsert import upsert
 
 logger = logging.getLogger(__name__)
 
+# Stripe is never billed for fewer seats than this.
+MIN_BILLED_SEATS = 5
+
 
 def _configure_stripe() -> None:
     settings = get_settings()
     if not settings.stripe_secret_key:
         raise RuntimeError("STRIPE_SECRET_KEY not configured")
     stripe.api_key = settings.stripe_secret_key
+    stripe.api_base = settings.stripe_api_base
 
 
 def _price_for_plan(plan: Plan) -> str:
@@ -56,7 +65,9 @@ def create_billing_portal(stripe_customer: str, return_url: str) -> str:
     return portal.url
 
 
-def update_subscription_from_event(db: Session, event: stripe.Event) -> None:
+def update_subscription_from_event(db: Session, event: Mapping[str, Any]) -> None:
+    """Apply a Stripe subscription or checkout event to the org's subscription row; the caller commits."""
+
     event_type = event.get("type", "")
     data = event["data"]["object"]
 
@@ -71,27 +82,19 @@ def update_subscription_from_event(db: Session, event: stripe.Event) -> None:
         logger.warning("Stripe event missing org_id metadata: %s", event_type)
         return
 
-    subscription = (
-        db.query(Subscription).filter(Subscription.org_id == int(org_id)).one_or_none()
-    )
-    if not subscription:
-        subscription = Subscription(org_id=int(org_id))
-
-    subscription.stripe_customer = data.get("customer") or subscription.stripe_customer
-    subscription.stripe_subscription = data.get("id", subscription.stripe_subscription)
-
     plan_id = None
     if "items" in data and data["items"].get("data"):
         plan_id = data["items"]["data"][0]["price"]["id"]
 
     status = data.get("status")
     if status in {"trialing", "active"}:
-        subscription.status = SubscriptionStatus(status)
+        subscription_status = SubscriptionStatus(status)
     elif status in {"past_due", "incomplete"}:
-        subscription.status = SubscriptionStatus.past_due
+        subscription_status = SubscriptionStatus.past_due
     else:
-        subscription.status = SubscriptionStatus.canceled
+        subscription_status = SubscriptionStatus.canceled
 
+    plan = None
     if plan_id:
         settings = get_settings()
         reverse = {
@@ -99,32 +102,120 @@ def update_subscription_from_event(db: Session, event: stripe.Event) -> None:
             settings.stripe_price_pro: Plan.pro,
             settings.stripe_price_enterprise: Plan.enterprise,
         }
-        subscription.plan = reverse.get(plan_id, subscription.plan)
+        plan = reverse.get(plan_id)
+
+    # Missing customer/subscription/plan values keep whatever the row already holds.
+    upsert(
+        db,
+        Subscription,
+        [
+            {
+                "org_id": int(org_id),
+                "stripe_customer": data.get("customer"),
+                "stripe_subscription": data.get("id"),
+                "plan": plan,
+                "status": subscription_status,
+            }
+        ],
+        index_elements=["org_id"],
+        set_=lambda excluded: {
+            "stripe_customer": func.coalesce(excluded.stripe_customer, Subscription.stripe_customer),
+            "stripe_subscription": func.coalesce(excluded.stripe_subscription, Subscription.stripe_subscription),
+            "plan": func.coalesce(excluded.plan, Subscription.plan),
+            "status": excluded.status,
+        },
+    )
 
-    db.add(subscription)
-    db.commit()
+
+@dataclass
+class SeatSyncReport:
+    synced: int = 0
+    skipped: int = 0
+    failed: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
 
 
-def sync_subscription_seats(db: Session) -> None:
+def _billable_subscriptions(db: Session) -> list[tuple[Subscription, int]]:
+    """Trialing/active subscriptions with their org's active seat count, in one grouped query."""
+
+    seats = (
+        select(Team.org_id, func.count(User.id).label("active"))
+        .join(Team, Team.id == User.team_id)
+        .where(User.active.is_(True))
+        .group_by(Team.org_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(Subscription, func.coalesce(seats.c.active, 0))
+        .outerjoin(seats, seats.c.org_id == Subscription.org_id)
+        .where(Subscription.status.in_([SubscriptionStatus.trialing, SubscriptionStatus.active]))
+    ).all()
+    return [(subscription, active) for subscription, active in rows]
+
+
+def _push_seats(stripe_customer: str, plan: Plan, quantity: int) -> bool:
+    """Set the quantity on the customer's subscription; ``False`` when Stripe has none."""
+
+    subs = stripe.Subscription.list(customer=stripe_customer, limit=1)
+    if not subs.data:
+        return False
+    stripe.Subscription.modify(
+        subs.data[0].id,
+        items=[{"price": _price_for_plan(plan), "quantity": quantity}],
+        proration_behavior="always_invoice",
+    )
+    return True
+
+
+def sync_subscription_seats(db: Session) -> SeatSyncReport:
+    """Push active seat counts to Stripe for every org whose count or plan changed since the last sync.
+
+    Stripe calls run on a bounded thread pool; the session is only used from
+    the calling thread, and no transaction is held open while they run.
+    """
+
     _configure_stripe()
-    org_subscriptions = db.query(Subscription).filter(Subscription.status.in_([SubscriptionStatus.trialing, SubscriptionStatus.active])).all()
-    for subscription in org_subscriptions:
-        active_seats = (
-            db.query(func.count(User.id))
-            .filter(User.team.has(org_id=subscription.org_id), User.active.is_(True))
-            .scalar()
-        ) or 0
+    report = SeatSyncReport()
+    pending: list[tuple[int, int, str, Plan, int]] = []
+    for subscription, active_seats in _billable_subscriptions(db):
         subscription.seats = max(active_seats, subscription.seats or 0)
-        db.add(subscription)
-        if subscription.stripe_customer and subscription.plan:
-            try:
-                subs = stripe.Subscription.list(customer=subscription.stripe_customer, limit=1)
-                if subs.data:
-                    stripe.Subscription.modify(
-                        subs.data[0].id,
-                        items=[{"price": _price_for_plan(subscription.plan), "quantity": max(active_seats, 5)}],
-                        proration_behavior="always_invoice",
-                    )
-            except Exception:  # pragma: no cover - network failure
-                logger.exception("Failed to sync seats for org %s", subscription.org_id)
+        quantity = max(active_seats, MIN_BILLED_SEATS)
+        if not (subscription.stripe_customer and subscription.plan) or (
+            subscription.synced_seats == quantity and subscription.synced_plan == subscription.plan
+        ):
+            report.skipped += 1
+            continue
+        pending.append(
+            (subscription.id, subscription.org_id, subscription.stripe_customer, subscription.plan, quantity)
+        )
     db.commit()
+    if not pending:
+        return report
+
+    synced: list[dict[str, Any]] = []
+    workers = min(get_settings().stripe_sync_concurrency, len(pending))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="seat-sync") as pool:
+        futures = {
+            pool.submit(_push_seats, customer, plan, quantity): (subscription_id, org_id, plan, quantity)
+            for subscription_id, org_id, customer, plan, quantity in pending
+        }
+        for future in as_completed(futures):
+            subscription_id, org_id, plan, quantity = futures[future]
+            try:
+                pushed = future.result()
+            except Exception:
+                logger.exception("Failed to sync seats for org %s", org_id)
+                report.failed += 1
+                continue
+            if pushed:
+                synced.append({"id": subscription_id, "synced_seats": quantity, "synced_plan": plan})
+                report.synced += 1
+            else:
+                report.skipped += 1
+
+    if synced:
+        db.execute(update(Subscription), synced)
+        db.commit()
+    return report
@@ -0,0 +1,252 @@
+"""Single round-trip data loading for the team dashboard."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import (
+    Date,
+    DateTime,
+    Integer,
+    Text,
+    and_,
+    cast,
+    func,
+    literal,
+    null,
+    select,
+    union_all,
+)
+from sqlalchemy.orm import Session
+
+from app.db.models import Checkin, RiskSnapshot, Team, TeamDailyStat, User
+from app.services import analytics
+
+METRICS_DAYS = 30
+TREND_DAYS = 14
+PARTICIPATION_DAYS = 7
+ROSTER_DAYS = 30
+LATEST_CHECKINS = 5
+
+
+@dataclass(frozen=True)
+class TrendPoint:
+    day: date
+    count: int
+    avg_mood: float
+    avg_stress: float
+
+
+@dataclass(frozen=True)
+class RecentCheckin:
+    submitted_at: datetime
+    user_id: int
+    mood: int
+    stress: int
+    comment: str | None
+
+
+@dataclass(frozen=True)
+class RosterSeat:
+    user_id: int
+    checkin_count: int
+
+
+@dataclass
+class DashboardData:
+    """Everything the dashboard template renders for one team."""
+
+    team_id: int
+    team_name: str
+    respondent_count: int = 0
+    avg_mood: float = 0.0
+    avg_stress: float = 0.0
+    risk_level: str | None = None
+    active_users: int = 0
+    participation: int = 0
+    trend: list[TrendPoint] = field(default_factory=list)
+    latest_checkins: list[RecentCheckin] = field(default_factory=list)
+    roster: list[RosterSeat] = field(default_factory=list)
+
+    @property
+    def available(self) -> bool:
+        return self.respondent_count >= analytics.MINIMUM_RESPONDENTS
+
+    @property
+    def participation_rate(self) -> float:
+        return min(100.0, (self.participation / (self.active_users or 1)) * 100)
+
+    def to_cache(self) -> dict[str, Any]:
+        return {
+            "team_id": self.team_id,
+            "team_name": self.team_name,
+            "respondent_count": self.respondent_count,
+            "avg_mood": self.avg_mood,
+            "avg_stress": self.avg_stress,
+            "risk_level": self.risk_level,
+            "active_users": self.active_users,
+            "participation": self.participation,
+            "trend": [[p.day.isoformat(), p.count, p.avg_mood, p.avg_stress] for p in self.trend],
+            "latest_checkins": [
+                [c.submitted_at.isoformat(), c.user_id, c.mood, c.stress, c.comment] for c in self.latest_checkins
+            ],
+            "roster": [[s.user_id, s.checkin_count] for s in self.roster],
+        }
+
+    @classmethod
+    def from_cache(cls, value: dict[str, Any]) -> DashboardData:
+        return cls(
+            **{key: value[key] for key in value if key not in {"trend", "latest_checkins", "roster"}},
+            trend=[TrendPoint(date.fromisoformat(day), *rest) for day, *rest in value["trend"]],
+            latest_checkins=[
+                RecentCheckin(datetime.fromisoformat(ts), *rest) for ts, *rest in value["latest_checkins"]
+            ],
+            roster=[RosterSeat(*seat) for seat in value["roster"]],
+        )
+
+
+def _row(
+    kind: str,
+    n1: Any = None,
+    n2: Any = None,
+    n3: Any = None,
+    day: Any = None,
+    ts: Any = None,
+    text: Any = None,
+):
+    """Project one branch of the dashboard UNION onto the shared column shape."""
+
+    def typed(value: Any, type_: Any) -> Any:
+        return cast(null(), type_) if value is None else value
+
+    return (
+        literal(kind, Text).label("kind"),
+        typed(n1, Integer).label("n1"),
+        typed(n2, Integer).label("n2"),
+        typed(n3, Integer).label("n3"),
+        typed(day, Date).label("day"),
+        typed(ts, DateTime).label("ts"),
+        typed(text, Text).label("text"),
+    )
+
+
+def dashboard_query(team_id: int, today: date):
+    """Build the one-statement UNION ALL that feeds :class:`DashboardData`."""
+
+    team = select(*_row("team", n1=Team.id, text=Team.name)).where(Team.id == team_id)
+
+    # One rollup scan serves the 30-day metrics, 14-day trend and 7-day participation.
+    window = select(
+        *_row(
+            "day",
+            n1=TeamDailyStat.checkin_count,
+            n2=TeamDailyStat.sum_mood,
+            n3=TeamDailyStat.sum_stress,
+            day=TeamDailyStat.day,
+        )
+    ).where(
+        TeamDailyStat.team_id == team_id,
+        TeamDailyStat.day >= today - timedelta(days=METRICS_DAYS),
+        TeamDailyStat.checkin_count > 0,
+    )
+
+    latest_risk = (
+        select(RiskSnapshot.risk_level)
+        .where(RiskSnapshot.team_id == team_id)
+        .order_by(RiskSnapshot.day.desc(), RiskSnapshot.id.desc())
+        .limit(1)
+        .subquery()
+    )
+    risk = select(*_row("risk", text=cast(latest_risk.c.risk_level, Text)))
+
+    active = select(*_row("active", n1=func.count(User.id))).where(User.team_id == team_id, User.active.is_(True))
+
+    latest = (
+        select(
+            Checkin.user_id,
+            Checkin.mood,
+            Checkin.stress,
+            Checkin.submitted_at,
+            Checkin.comment,
+        )
+        .where(Checkin.team_id == team_id)
+        .order_by(Checkin.submitted_at.desc())
+        .limit(LATEST_CHECKINS)
+        .subquery()
+    )
+    recent = select(
+        *_row(
+            "checkin",
+            n1=latest.c.user_id,
+            n2=latest.c.mood,
+            n3=latest.c.stress,
+            ts=latest.c.submitted_at,
+            text=latest.c.comment,
+        )
+    )
+
+    roster = (
+        select(*_row("seat", n1=User.id, n2=func.count(Checkin.id)))
+        .select_from(User)
+        .outerjoin(
+            Checkin,
+            and_(
+                Checkin.user_id == User.id,
+                Checkin.checkin_date >= today - timedelta(days=ROSTER_DAYS),
+            ),
+        )
+        .where(User.team_id == team_id)
+        .group_by(User.id)
+    )
+
+    return union_all(team, window, risk, active, recent, roster)
+
+
+def load_dashboard(db: Session, team_id: int) -> DashboardData | None:
+    """Fetch all dashboard data for a team in one round trip (or from cache)."""
+
+    cache = analytics.get_cache()
+    cached = cache.get_many([team_id], analytics.DASHBOARD_WINDOW).get(team_id)
+    if cached is not None:
+        return DashboardData.from_cache(cached)
+
+    today = date.today()
+    rows = db.execute(dashboard_query(team_id, today)).all()
+
+    team_rows = [row for row in rows if row.kind == "team"]
+    if not team_rows:
+        return None
+
+    data = DashboardData(team_id=team_id, team_name=team_rows[0].text)
+    trend_start = today - timedelta(days=TREND_DAYS)
+    participation_start = today - timedelta(days=PARTICIPATION_DAYS)
+    total = sum_mood = sum_stress = 0
+    for row in sorted(rows, key=lambda r: (r.kind, r.day or date.min, r.ts or datetime.min)):
+        if row.kind == "day":
+            day = row.day
+            total += row.n1
+            sum_mood += row.n2
+            sum_stress += row.n3
+            if day >= trend_start:
+                data.trend.append(TrendPoint(day, row.n1, row.n2 / row.n1, row.n3 / row.n1))
+            if day >= participation_start:
+                data.participation += row.n1
+        elif row.kind == "risk":
+            data.risk_level = row.text
+        elif row.kind == "active":
+            data.active_users = row.n1
+        elif row.kind == "checkin":
+            data.latest_checkins.append(RecentCheckin(row.ts, row.n1, row.n2, row.n3, row.text))
+        elif row.kind == "seat":
+            data.roster.append(RosterSeat(row.n1, row.n2))
+
+    data.latest_checkins.reverse()
+    data.roster.sort(key=lambda seat: seat.user_id)
+    data.respondent_count = total
+    if total:
+        data.avg_mood = sum_mood / total
+        data.avg_stress = sum_stress / total
+
+    cache.set_many({team_id: data.to_cache()}, analytics.DASHBOARD_WINDOW)
+    return data
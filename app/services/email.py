@@ -2,35 +2,40 @@
 from __future__ import annotations
 
 import logging
-from typing import Optional
+from typing import Any, Optional
 
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
+import httpx
 
 from app.core.config import get_settings
 
 logger = logging.getLogger(__name__)
+FROM_EMAIL = "no-reply@rmht.app"
 
 
-def send_magic_link(to_email: str, link: str, template_id: Optional[str] = None) -> None:
-    """Send a passwordless login link via SendGrid."""
+def magic_link_message(to_email: str, link: str, template_id: Optional[str] = None) -> dict[str, Any]:
+    """Build a SendGrid v3 ``mail/send`` body carrying a passwordless login link."""
 
-    settings = get_settings()
-    if not settings.sendgrid_api_key:
-        logger.warning("SENDGRID_API_KEY not set; magic link logged instead")
-        logger.info("Magic link for %s: %s", to_email, link)
-        return
-
-    message = Mail(from_email="no-reply@rmht.app", to_emails=to_email)
+    message: dict[str, Any] = {
+        "from": {"email": FROM_EMAIL},
+        "personalizations": [{"to": [{"email": to_email}]}],
+    }
     if template_id:
-        message.template_id = template_id
-        message.dynamic_template_data = {"magic_link": link}
+        message["template_id"] = template_id
+        message["personalizations"][0]["dynamic_template_data"] = {"magic_link": link}
     else:
-        message.subject = "Your RMHT magic link"
-        message.html_content = f"<p>Click to sign in: <a href='{link}'>{link}</a></p>"
-
-    try:
-        client = SendGridAPIClient(settings.sendgrid_api_key)
-        client.send(message)
-    except Exception:  # pragma: no cover
-        logger.exception("Failed to send magic link email")
+        message["subject"] = "Your RMHT magic link"
+        message["content"] = [
+            {"type": "text/html", "value": f"<p>Click to sign in: <a href='{link}'>{link}</a></p>"}
+        ]
+    return message
+
+
+async def send_mail(client: httpx.AsyncClient, message: dict[str, Any]) -> httpx.Response:
+    """POST ``message`` to SendGrid; the caller interprets the response status."""
+
+    settings = get_settings()
+    return await client.post(
+        f"{settings.sendgrid_api_base.rstrip('/')}/mail/send",
+        json=message,
+        headers={"Authorization": f"Bearer {settings.sendgrid_api_key}"},
+    )
@@ -0,0 +1,128 @@
+"""Bulk check-in ingestion for collectors that gather check-ins in batches."""
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import UTC, date, datetime
+from typing import Any
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.db.models import Checkin, User
+from app.services import archive, risk, rollup
+from app.services.tokens import hash_token
+
+
+@dataclass(frozen=True)
+class CheckinRecord:
+    token: str
+    mood: int
+    stress: int
+    comment: str | None = ""
+    checkin_date: date | None = None
+
+
+@dataclass
+class RecordResult:
+    index: int
+    status: str
+    error: str | None = None
+
+
+@dataclass
+class IngestResult:
+    results: list[RecordResult]
+    team_ids: set[int]
+
+    @property
+    def created(self) -> int:
+        return sum(1 for result in self.results if result.status == "created")
+
+    @property
+    def rejected(self) -> int:
+        return len(self.results) - self.created
+
+
+def _validate(record: CheckinRecord, today: date, cutoff: date) -> str | None:
+    if not (1 <= record.mood <= 5 and 1 <= record.stress <= 5):
+        return "Scores must be 1-5"
+    if record.checkin_date is not None and record.checkin_date > today:
+        return "Check-in date is in the future"
+    # Older rows would land in the hot table behind the archiver's back.
+    if record.checkin_date is not None and record.checkin_date < cutoff:
+        return "Check-in date is older than the hot window"
+    return None
+
+
+def ingest_checkins(db: Session, records: Sequence[CheckinRecord]) -> IngestResult:
+    """Validate, resolve and store a batch of check-ins.
+
+    Tokens are resolved with one ``IN`` query, accepted rows are inserted in a
+    single executemany, rollups are updated once per team/day and risk is
+    rescored once per affected team. The caller commits.
+    """
+
+    today = date.today()
+    cutoff = archive.hot_cutoff(today)
+    submitted_at = datetime.now(UTC).replace(tzinfo=None)
+    results = [RecordResult(index=index, status="rejected") for index in range(len(records))]
+
+    hashes: dict[int, str] = {}
+    for index, record in enumerate(records):
+        error = _validate(record, today, cutoff)
+        if error:
+            results[index].error = error
+        else:
+            hashes[index] = hash_token(record.token)
+
+    users: dict[str, tuple[int, int]] = {}
+    if hashes:
+        rows = db.execute(
+            select(User.anon_token_hash, User.id, User.team_id).where(
+                User.anon_token_hash.in_(set(hashes.values())),
+                User.active.is_(True),
+            )
+        )
+        users = {digest: (user_id, team_id) for digest, user_id, team_id in rows}
+
+    accepted: list[int] = []
+    values: list[dict[str, Any]] = []
+    for index, digest in hashes.items():
+        user = users.get(digest)
+        if user is None:
+            results[index].error = "Invalid token"
+            continue
+        record = records[index]
+        accepted.append(index)
+        values.append(
+            {
+                "user_id": user[0],
+                "team_id": user[1],
+                "mood": record.mood,
+                "stress": record.stress,
+                "comment": record.comment or "",
+                "checkin_date": record.checkin_date or today,
+                "submitted_at": submitted_at,
+            }
+        )
+
+    team_ids = store_checkins(db, values)
+    for index in accepted:
+        results[index].status = "created"
+    return IngestResult(results=results, team_ids=team_ids)
+
+
+def store_checkins(db: Session, values: Sequence[dict[str, Any]]) -> set[int]:
+    """Insert validated check-in rows, fold them into rollups and rescore each team once.
+
+    Returns the affected team ids; the caller commits and invalidates caches.
+    """
+
+    team_ids = {row["team_id"] for row in values}
+    if values:
+        rollup.record_checkins(db, values)
+        db.execute(insert(Checkin), values)
+        for team_id in sorted(team_ids):
+            risk.upsert_team_risk(db, team_id)
+    return team_ids
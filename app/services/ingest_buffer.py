@@ -0,0 +1,247 @@
+"""Group-commit write-behind buffer for check-in submissions.
+
+With ``CHECKIN_BUFFER_ENABLED`` set, check-in routes hand validated rows to a
+process-wide :class:`CheckinBuffer` instead of committing them one by one. A
+background thread writes everything queued so far in one transaction every
+``CHECKIN_BUFFER_FLUSH_MS`` milliseconds, or sooner once ``CHECKIN_BUFFER_MAX_ROWS``
+rows are waiting, and then rescores risk once per affected team. If that
+transaction fails, its rows are retried one at a time so only the submission
+at fault gets the error.
+
+``CHECKIN_BUFFER_ACK`` controls durability:
+
+* ``flushed`` (default) - the request waits until its batch has committed, so an
+  acknowledged check-in is as durable as before; only the fsync is shared.
+* ``queued`` - the request returns as soon as the row is buffered. Rows still
+  in memory are lost if the process dies without draining.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import get_settings
+from app.services import analytics
+from app.services.ingest import store_checkins
+
+logger = logging.getLogger(__name__)
+
+ACK_FLUSHED = "flushed"
+ACK_QUEUED = "queued"
+# Reply when a ``flushed`` submission times out; the row is still queued and may yet commit.
+UNCONFIRMED = "Check-in queued but not yet confirmed"
+
+
+class BufferFull(RuntimeError):
+    """Raised when the buffer is at capacity; callers fall back to a direct write."""
+
+
+class CheckinBuffer:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        flush_interval: float = 0.05,
+        max_rows: int = 500,
+        max_queue: int = 10_000,
+        ack: str = ACK_FLUSHED,
+    ) -> None:
+        if ack not in (ACK_FLUSHED, ACK_QUEUED):
+            raise ValueError(f"Unknown ack mode {ack!r}")
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        self.max_queue = max_queue
+        self.ack = ack
+
+        self._pending: list[tuple[dict[str, Any], Future]] = []
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._closing = False
+
+        self.flushed_rows = 0
+        self.flushed_batches = 0
+        self.failed_rows = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    def submit(self, row: dict[str, Any]) -> Future:
+        """Queue one check-in row.
+
+        The returned future resolves once the row is committed, or straight
+        away in ``queued`` ack mode.
+        """
+
+        future: Future = Future()
+        with self._cond:
+            if self._closing:
+                raise BufferFull("Check-in buffer is shutting down")
+            if len(self._pending) >= self.max_queue:
+                raise BufferFull("Check-in buffer is full")
+            self._ensure_started()
+            self._pending.append((row, future))
+            if len(self._pending) in (1, self.max_rows):
+                self._cond.notify()
+
+        if self.ack == ACK_QUEUED:
+            acknowledged: Future = Future()
+            acknowledged.set_result(None)
+            return acknowledged
+        return future
+
+    def _ensure_started(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="checkin-buffer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                # The batch window opens with its first row.
+                deadline = time.monotonic() + self.flush_interval
+                while not self._closing and len(self._pending) < self.max_rows:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._pending = self._pending, []
+                closing = self._closing
+            if batch:
+                self._flush(batch)
+            if closing:
+                with self._cond:
+                    if not self._pending:
+                        return
+
+    def _write(self, rows: list[dict[str, Any]]) -> set[int]:
+        with self.session_factory() as db:
+            team_ids = store_checkins(db, rows)
+            db.commit()
+        return team_ids
+
+    def _flush(self, batch: list[tuple[dict[str, Any], Future]]) -> None:
+        started = time.perf_counter()
+        rows = [row for row, _ in batch]
+        failures: dict[int, Exception] = {}
+        try:
+            team_ids = self._write(rows)
+        except Exception as exc:
+            team_ids = set()
+            if len(rows) == 1:
+                logger.exception("Check-in buffer flush of 1 row failed")
+                failures[0] = exc
+            else:
+                # One bad row must not fail every waiter in the batch: retry the rows one by one.
+                logger.warning("Check-in buffer flush of %s rows failed; retrying row by row", len(rows))
+                for index, row in enumerate(rows):
+                    try:
+                        team_ids |= self._write([row])
+                    except Exception as row_exc:
+                        logger.exception("Buffered check-in for team %s failed", row.get("team_id"))
+                        failures[index] = row_exc
+
+        written = len(rows) - len(failures)
+        if written:
+            metrics.checkins_ingested.inc("buffered", amount=written)
+        for team_id in team_ids:
+            analytics.invalidate_team(team_id)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._cond:
+            self.failed_rows += len(failures)
+            if written:
+                self.flushed_rows += written
+                self.flushed_batches += 1
+                self.last_flush_ms = elapsed_ms
+                self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+                self.total_flush_ms += elapsed_ms
+        for index, (_, future) in enumerate(batch):
+            if index in failures:
+                future.set_exception(failures[index])
+            else:
+                future.set_result(None)
+
+    def drain(self, timeout: float | None = None) -> None:
+        """Stop accepting rows and block until everything queued is committed."""
+
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def stats(self) -> dict[str, float | int]:
+        with self._cond:
+            return {
+                "queue_depth": len(self._pending),
+                "flushed_rows": self.flushed_rows,
+                "flushed_batches": self.flushed_batches,
+                "failed_rows": self.failed_rows,
+                "last_flush_ms": round(self.last_flush_ms, 3),
+                "max_flush_ms": round(self.max_flush_ms, 3),
+                "avg_flush_ms": round(self.total_flush_ms / (self.flushed_batches or 1), 3),
+            }
+
+
+_buffer: CheckinBuffer | None = None
+_buffer_lock = threading.Lock()
+# Set by drain(); later submissions are written directly instead of starting a buffer nobody drains.
+_drained = False
+
+
+def get_buffer() -> CheckinBuffer | None:
+    """Return the process-wide buffer, or ``None`` when buffering is disabled or has been drained."""
+
+    global _buffer
+    settings = get_settings()
+    if not settings.checkin_buffer_enabled:
+        return None
+    with _buffer_lock:
+        if _buffer is None and not _drained:
+            from app.db.session import SessionLocal
+
+            _buffer = CheckinBuffer(
+                SessionLocal,
+                flush_interval=settings.checkin_buffer_flush_ms / 1000,
+                max_rows=settings.checkin_buffer_max_rows,
+                max_queue=settings.checkin_buffer_max_queue,
+                ack=settings.checkin_buffer_ack,
+            )
+        return _buffer
+
+
+def submit(row: dict[str, Any]) -> Future | None:
+    """Buffer ``row`` if buffering is enabled and has room; ``None`` means write it directly."""
+
+    buffer = get_buffer()
+    if buffer is None:
+        return None
+    try:
+        return buffer.submit(row)
+    except BufferFull:
+        logger.warning("Check-in buffer unavailable; writing directly")
+        return None
+
+
+def drain(timeout: float | None = None) -> None:
+    """Flush and stop the process-wide buffer; buffering stays off for the rest of the process."""
+
+    global _buffer, _drained
+    with _buffer_lock:
+        buffer, _buffer = _buffer, None
+        _drained = True
+    if buffer is not None:
+        buffer.drain(timeout)
+
+
+def stats() -> dict[str, float | int]:
+    return _buffer.stats() if _buffer is not None else {"queue_depth": 0}
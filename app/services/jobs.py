@@ -0,0 +1,170 @@
+"""Background jobs, their schedules and run history.
+
+Each job is a plain function of a session that returns JSON-able row counts.
+:func:`run_job` executes one and records it in ``job_runs``; the scheduler
+(``app.services.scheduler``) and the ``/jobs/*`` endpoints both go through it.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import get_settings
+from app.db import models
+from app.services import analytics, archive, outbox, retention, risk_batch, rollup
+from app.services import billing as billing_service
+
+logger = logging.getLogger(__name__)
+
+RUNNING = "running"
+SUCCESS = "success"
+ERROR = "error"
+
+# A Monday; weekly offsets count from Monday 00:00 UTC.
+EPOCH = datetime(1970, 1, 5)
+
+
+def weekly_checkin(db: Session, base_url: str | None = None) -> dict[str, int]:
+    base_url = base_url or get_settings().app_base_url
+    if not base_url:
+        raise RuntimeError("APP_BASE_URL not configured")
+    integrations = (
+        db.query(models.Integration)
+        .filter(models.Integration.kind == models.IntegrationKind.slack, models.Integration.status == "connected")
+        .all()
+    )
+    text = (
+        "\u2705 It's time for your weekly RMHT check-in! Use your personal token at "
+        f"{str(base_url).rstrip('/')}/checkin/<token> to share mood & stress in under 60 seconds."
+    )
+    queued = 0
+    for integration in integrations:
+        if integration.config_json.get("bot_token") and integration.config_json.get("channel"):
+            outbox.enqueue_slack(db, integration.id, text)
+            queued += 1
+    db.commit()
+    return {"orgs_queued": queued, "total_integrations": len(integrations), "skipped": len(integrations) - queued}
+
+
+def daily_retention(db: Session, dry_run: bool = False) -> dict[str, Any]:
+    report = retention.purge_expired(db, dry_run=dry_run)
+    for team_id in report.team_ids:
+        analytics.invalidate_team(team_id)
+    return report.as_dict()
+
+
+def archive_checkins(db: Session) -> dict[str, Any]:
+    cutoff = archive.hot_cutoff()
+    moved = archive.archive_checkins(db, cutoff=cutoff)
+    return {"checkins_archived": moved, "cutoff": cutoff.isoformat()}
+
+
+def sync_seats(db: Session) -> dict[str, int]:
+    return billing_service.sync_subscription_seats(db).as_dict()
+
+
+def recompute_risk(db: Session) -> dict[str, int]:
+    scored = risk_batch.recompute_all(db)
+    db.commit()
+    analytics.invalidate_all()
+    return {"teams_scored": scored}
+
+
+def rebuild_rollups(db: Session) -> dict[str, int]:
+    rows = rollup.rebuild(db)
+    db.commit()
+    analytics.invalidate_all()
+    return {"rollup_rows": rows}
+
+
+@dataclass(frozen=True)
+class Job:
+    name: str
+    run: Callable[..., dict[str, Any]]
+    # Runs once per ``every``, ``offset`` after EPOCH-aligned boundaries; ``None`` means on demand only.
+    every: timedelta | None = None
+    offset: timedelta = timedelta(0)
+    # How long a run may hold the job before another process can take it over.
+    lease: timedelta = timedelta(hours=1)
+
+    def slot(self, now: datetime) -> datetime | None:
+        """Start of the schedule slot ``now`` falls in."""
+
+        if self.every is None:
+            return None
+        periods = (now - EPOCH - self.offset) // self.every
+        return EPOCH + self.offset + periods * self.every
+
+
+DAY = timedelta(days=1)
+
+# Times are UTC.
+JOBS: dict[str, Job] = {
+    job.name: job
+    for job in (
+        Job("weekly_checkin", weekly_checkin, every=7 * DAY, offset=timedelta(hours=9)),
+        Job("daily_retention", daily_retention, every=DAY, offset=timedelta(hours=3), lease=timedelta(hours=2)),
+        Job(
+            "archive_checkins",
+            archive_checkins,
+            every=DAY,
+            offset=timedelta(hours=3, minutes=30),
+            lease=timedelta(hours=2),
+        ),
+        Job("sync_seats", sync_seats, every=DAY, offset=timedelta(hours=4)),
+        Job("recompute_risk", recompute_risk, every=DAY, offset=timedelta(hours=5)),
+        Job("rebuild_rollups", rebuild_rollups),
+    )
+}
+
+
+def run_job(
+    db: Session,
+    name: str,
+    trigger: str,
+    holder: str | None = None,
+    slot: datetime | None = None,
+    **kwargs: Any,
+) -> dict[str, Any]:
+    """Run job ``name`` and record it in ``job_runs``; exceptions are recorded and re-raised."""
+
+    job = JOBS[name]
+    run = models.JobRun(job=name, trigger=trigger, holder=holder, slot_at=slot, status=RUNNING)
+    db.add(run)
+    db.commit()
+    run_id = run.id
+
+    started = time.perf_counter()
+    status, result, error = ERROR, None, None
+    try:
+        with metrics.track_job(name):
+            result = job.run(db, **kwargs)
+        status = SUCCESS
+        return result
+    except Exception as exc:
+        db.rollback()
+        error = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        db.execute(
+            update(models.JobRun)
+            .where(models.JobRun.id == run_id)
+            .values(
+                status=status,
+                result=result,
+                error=error,
+                finished_at=datetime.now(UTC).replace(tzinfo=None),
+                duration_seconds=elapsed,
+            )
+        )
+        db.commit()
+        logger.info("Job %s (%s) finished: %s in %.2fs", name, trigger, status, elapsed)
@@ -0,0 +1,249 @@
+"""Durable outbox for Slack posts and emails.
+
+Request handlers only :func:`enqueue` a row in the same transaction as the
+change that caused it. The worker (``scripts/outbox_worker.py``) repeatedly
+claims a batch with ``FOR UPDATE SKIP LOCKED`` - so several workers never pick
+the same row - delivers it concurrently and records the outcome. A claimed row
+is leased: if its worker dies mid-send it becomes claimable again once the
+lease runs out. Failed deliveries are retried with exponential backoff until
+``OUTBOX_MAX_ATTEMPTS``, except for errors the provider marks as permanent.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import httpx
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.models import Integration, OutboxMessage
+from app.services import email as email_service
+from app.services import slack as slack_service
+
+logger = logging.getLogger(__name__)
+
+SLACK = "slack"
+EMAIL = "email"
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+LEASE = timedelta(minutes=5)
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+
+
+def enqueue(db: Session, kind: str, payload: dict[str, Any]) -> OutboxMessage:
+    """Queue a message for the worker; it is only visible once the caller commits."""
+
+    now = datetime.now(UTC).replace(tzinfo=None)
+    message = OutboxMessage(kind=kind, payload=payload, status=PENDING, next_attempt_at=now)
+    db.add(message)
+    return message
+
+
+def enqueue_slack(db: Session, integration_id: int, text: str) -> OutboxMessage:
+    # Only the integration id is stored; the bot token is read at send time.
+    return enqueue(db, SLACK, {"integration_id": integration_id, "text": text})
+
+
+def enqueue_email(db: Session, message: dict[str, Any]) -> OutboxMessage:
+    return enqueue(db, EMAIL, message)
+
+
+@dataclass
+class Claimed:
+    id: int
+    kind: str
+    payload: dict[str, Any]
+    attempts: int
+    slack_target: tuple[str, str] | None = None
+
+
+@dataclass
+class Outcome:
+    ok: bool
+    error: str | None = None
+    retryable: bool = True
+
+
+def claim(db: Session, batch_size: int) -> list[Claimed]:
+    """Lease up to ``batch_size`` due messages and commit so other workers skip them."""
+
+    now = datetime.now(UTC).replace(tzinfo=None)
+    rows = (
+        db.execute(
+            select(OutboxMessage)
+            .where(OutboxMessage.status.in_((PENDING, SENDING)), OutboxMessage.next_attempt_at <= now)
+            .order_by(OutboxMessage.next_attempt_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        .scalars()
+        .all()
+    )
+    claimed = []
+    for row in rows:
+        row.status = SENDING
+        row.attempts += 1
+        row.next_attempt_at = now + LEASE
+        claimed.append(Claimed(id=row.id, kind=row.kind, payload=dict(row.payload), attempts=row.attempts))
+
+    integration_ids = {message.payload.get("integration_id") for message in claimed if message.kind == SLACK}
+    if integration_ids:
+        targets = {
+            integration.id: integration.config_json
+            for integration in db.query(Integration).filter(
+                Integration.id.in_(integration_ids), Integration.status == "connected"
+            )
+        }
+        for message in claimed:
+            config = targets.get(message.payload.get("integration_id")) if message.kind == SLACK else None
+            if config and config.get("bot_token") and config.get("channel"):
+                message.slack_target = (config["bot_token"], config["channel"])
+    db.commit()
+    return claimed
+
+
+def _backoff(attempts: int) -> timedelta:
+    delay = min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+    return timedelta(seconds=random.uniform(delay / 2, delay))
+
+
+def record(db: Session, results: list[tuple[Claimed, Outcome]], max_attempts: int) -> None:
+    """Store delivery outcomes; rows re-claimed after their lease expired are left alone."""
+
+    now = datetime.now(UTC).replace(tzinfo=None)
+    values = []
+    for message, outcome in results:
+        if outcome.ok:
+            status, next_attempt_at, sent_at = SENT, now, now
+        elif outcome.retryable and message.attempts < max_attempts:
+            status, next_attempt_at, sent_at = PENDING, now + _backoff(message.attempts), None
+        else:
+            status, next_attempt_at, sent_at = FAILED, now, None
+            logger.error("Outbox message %s (%s) failed permanently: %s", message.id, message.kind, outcome.error)
+        values.append(
+            {
+                "b_id": message.id,
+                "b_attempts": message.attempts,
+                "status": status,
+                "next_attempt_at": next_attempt_at,
+                "sent_at": sent_at,
+                "last_error": outcome.error,
+            }
+        )
+    if values:
+        table = OutboxMessage.__table__
+        db.execute(
+            update(table).where(
+                table.c.id == bindparam("b_id"),
+                table.c.attempts == bindparam("b_attempts"),
+                table.c.status == SENDING,
+            ),
+            values,
+        )
+    db.commit()
+
+
+async def _send_slack(client: slack_service.AsyncSlackClient, message: Claimed) -> Outcome:
+    if message.slack_target is None:
+        return Outcome(ok=False, error="integration_unavailable", retryable=False)
+    token, channel = message.slack_target
+    result = await client.post_message(
+        slack_service.SlackMessage(key=message.id, token=token, channel=channel, text=message.payload["text"])
+    )
+    return Outcome(ok=result.ok, error=result.error, retryable=result.retryable)
+
+
+async def _send_email(client: httpx.AsyncClient, message: Claimed) -> Outcome:
+    if not get_settings().sendgrid_api_key:
+        logger.warning("SENDGRID_API_KEY not set; email logged instead: %s", message.payload)
+        return Outcome(ok=True)
+    try:
+        resp = await email_service.send_mail(client, message.payload)
+    except httpx.TransportError as exc:
+        return Outcome(ok=False, error=f"{type(exc).__name__}: {exc}")
+    if resp.status_code < 300:
+        return Outcome(ok=True)
+    retryable = resp.status_code == 429 or resp.status_code >= 500
+    return Outcome(ok=False, error=f"HTTP {resp.status_code}: {resp.text[:200]}", retryable=retryable)
+
+
+async def deliver(
+    messages: list[Claimed],
+    concurrency: int,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> list[tuple[Claimed, Outcome]]:
+    """Send ``messages`` concurrently over shared HTTP clients."""
+
+    settings = get_settings()
+    semaphore = asyncio.Semaphore(concurrency)
+    # Short in-batch retries only; anything slower is rescheduled through the outbox backoff.
+    async with slack_service.AsyncSlackClient(
+        base_url=settings.slack_api_base,
+        concurrency=concurrency,
+        max_attempts=2,
+        max_retry_after=5,
+        transport=transport,
+    ) as slack_client, httpx.AsyncClient(timeout=10, transport=transport) as http:
+
+        async def send(message: Claimed) -> tuple[Claimed, Outcome]:
+            async with semaphore:
+                try:
+                    if message.kind == SLACK:
+                        return message, await _send_slack(slack_client, message)
+                    if message.kind == EMAIL:
+                        return message, await _send_email(http, message)
+                    return message, Outcome(ok=False, error=f"unknown kind {message.kind!r}", retryable=False)
+                except Exception as exc:  # one bad message must not sink the batch
+                    logger.exception("Outbox message %s raised during delivery", message.id)
+                    return message, Outcome(ok=False, error=f"{type(exc).__name__}: {exc}")
+
+        return list(await asyncio.gather(*(send(message) for message in messages)))
+
+
+async def process_batch(
+    session_factory: Callable[[], Session],
+    batch_size: int | None = None,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> int:
+    """Claim, deliver and record one batch; returns the number of messages handled."""
+
+    settings = get_settings()
+    with session_factory() as db:
+        claimed = claim(db, batch_size or settings.outbox_batch_size)
+    if not claimed:
+        return 0
+    results = await deliver(claimed, settings.outbox_concurrency, transport=transport)
+    with session_factory() as db:
+        record(db, results, settings.outbox_max_attempts)
+    sent = sum(outcome.ok for _, outcome in results)
+    logger.info("Outbox batch: %s sent, %s not sent", sent, len(results) - sent)
+    return len(results)
+
+
+async def run_worker(session_factory: Callable[[], Session], stop: asyncio.Event) -> None:
+    """Process batches until ``stop`` is set, sleeping only when the outbox is empty."""
+
+    poll = get_settings().outbox_poll_seconds
+    while not stop.is_set():
+        try:
+            handled = await process_batch(session_factory)
+        except Exception:
+            logger.exception("Outbox batch failed")
+            handled = 0
+        if not handled:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=poll)
+            except TimeoutError:
+                pass
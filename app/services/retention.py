@@ -0,0 +1,146 @@
+"""Retention purge for check-ins (both tiers), rollups, login nonces and audit logs.
+
+Expired rows are found with one set-based query per table, joined to
+``orgs.retention_days`` where the policy is per org, and deleted by primary key
+in chunks of ``RETENTION_CHUNK_SIZE`` with a commit after each chunk, so no
+single transaction holds locks on a large range.
+"""
+from __future__ import annotations
+
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import Date, Select, String, cast, delete, func, literal, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import get_settings
+from app.db.models import (
+    AuditLog,
+    Checkin,
+    CheckinArchive,
+    EmailLoginNonce,
+    Org,
+    Team,
+    TeamDailyStat,
+)
+
+
+@dataclass
+class RetentionReport:
+    dry_run: bool
+    removed: dict[str, Counter] = field(default_factory=dict)
+    team_ids: set[int] = field(default_factory=set)
+    elapsed_seconds: float = 0.0
+
+    @property
+    def total(self) -> int:
+        return sum(sum(counts.values()) for counts in self.removed.values())
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "dry_run": self.dry_run,
+            "checkins_removed": sum(
+                sum(self.removed.get(table, Counter()).values()) for table in ("checkins", "checkins_archive")
+            ),
+            "tables": {
+                table: {"total": sum(counts.values()), "by_org": dict(sorted(counts.items()))}
+                for table, counts in self.removed.items()
+            },
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "rows_per_second": round(self.total / self.elapsed_seconds, 1) if self.elapsed_seconds else 0.0,
+        }
+
+
+def _org_cutoff(db: Session, today: date) -> ColumnElement[date]:
+    """``today - orgs.retention_days`` as a SQL expression."""
+
+    if db.get_bind().dialect.name == "sqlite":
+        return func.date(literal(today.isoformat()), "-" + cast(Org.retention_days, String) + " days")
+    return literal(today, Date) - Org.retention_days
+
+
+def candidates(db: Session, today: date | None = None, now: datetime | None = None) -> dict[str, tuple[Any, Select]]:
+    """Per table, the model and a query yielding ``(id, org_id[, team_id])`` of expired rows."""
+
+    today = today or date.today()
+    now = now or datetime.now(UTC).replace(tzinfo=None)
+    cutoff = _org_cutoff(db, today)
+    audit_cutoff = now - timedelta(days=get_settings().audit_log_retention_days)
+    return {
+        "checkins": (
+            Checkin,
+            select(Checkin.id, Team.org_id, Checkin.team_id)
+            .join(Team, Team.id == Checkin.team_id)
+            .join(Org, Org.id == Team.org_id)
+            .where(Checkin.checkin_date < cutoff),
+        ),
+        "checkins_archive": (
+            CheckinArchive,
+            select(CheckinArchive.id, Team.org_id, CheckinArchive.team_id)
+            .join(Team, Team.id == CheckinArchive.team_id)
+            .join(Org, Org.id == Team.org_id)
+            .where(CheckinArchive.checkin_date < cutoff),
+        ),
+        "team_daily_stats": (
+            TeamDailyStat,
+            select(TeamDailyStat.id, Team.org_id, TeamDailyStat.team_id)
+            .join(Team, Team.id == TeamDailyStat.team_id)
+            .join(Org, Org.id == Team.org_id)
+            .where(TeamDailyStat.day < cutoff),
+        ),
+        "email_login_nonces": (
+            EmailLoginNonce,
+            select(EmailLoginNonce.id, EmailLoginNonce.org_id).where(EmailLoginNonce.expires_at < now),
+        ),
+        "audit_logs": (
+            AuditLog,
+            select(AuditLog.id, AuditLog.org_id).where(AuditLog.ts < audit_cutoff),
+        ),
+    }
+
+
+def _count(db: Session, query: Select) -> Counter:
+    expired = query.subquery()
+    org_id = expired.c.org_id
+    return Counter(dict(db.execute(select(org_id, func.count()).group_by(org_id)).all()))
+
+
+def _delete_in_chunks(db: Session, model: Any, query: Select, chunk_size: int, report: RetentionReport) -> Counter:
+    removed: Counter = Counter()
+    while True:
+        rows = db.execute(query.limit(chunk_size)).all()
+        if not rows:
+            break
+        db.execute(delete(model).where(model.id.in_([row[0] for row in rows])))
+        db.commit()
+        for row in rows:
+            removed[row[1]] += 1
+            if len(row) > 2:
+                report.team_ids.add(row[2])
+        if len(rows) < chunk_size:
+            break
+    return removed
+
+
+def purge_expired(
+    db: Session,
+    dry_run: bool = False,
+    chunk_size: int | None = None,
+    today: date | None = None,
+) -> RetentionReport:
+    """Delete (or with ``dry_run`` only count) expired rows in every covered table."""
+
+    chunk_size = chunk_size or get_settings().retention_chunk_size
+    report = RetentionReport(dry_run=dry_run)
+    started = time.perf_counter()
+    for table, (model, query) in candidates(db, today=today).items():
+        if dry_run:
+            report.removed[table] = _count(db, query)
+        else:
+            report.removed[table] = _delete_in_chunks(db, model, query, chunk_size, report)
+    report.elapsed_seconds = time.perf_counter() - started
+    return report
@@ -1,13 +1,20 @@
 """Risk scoring helpers."""
 from __future__ import annotations
 
-from collections import defaultdict
+from collections.abc import Sequence
 from datetime import date, timedelta
 from math import sqrt
+from typing import Any
 
 from sqlalchemy.orm import Session
 
-from app.db.models import Checkin, RiskLevel, RiskSnapshot, Team
+from app.core import metrics
+from app.db.models import RiskLevel, RiskSnapshot, Team
+from app.db.upsert import upsert
+from app.services import rollup
+from app.services.rollup import DailyBucket
+
+WINDOW_DAYS = 30
 
 
 def ewma(values: list[float], span: int = 30) -> float:
@@ -20,43 +27,27 @@ def ewma(values: list[float], span: int = 30) -> float:
     return result
 
 
-def latest_risk_snapshot(db: Session, team: Team) -> RiskSnapshot:
-    today = date.today()
-    start = today - timedelta(days=30)
-
-    daily: dict[date, list[tuple[int, int]]] = defaultdict(list)
-    rows = (
-        db.query(Checkin.checkin_date, Checkin.mood, Checkin.stress)
-        .filter(Checkin.team_id == team.id, Checkin.checkin_date >= start)
-        .all()
-    )
-    for checkin_date, mood, stress in rows:
-        daily[checkin_date].append((mood, stress))
+def compute_risk(team_id: int, day: date, buckets: Sequence[DailyBucket]) -> RiskSnapshot:
+    """Score a team from its non-empty daily buckets, oldest first."""
 
-    if not rows:
+    if not buckets:
         return RiskSnapshot(
-            team_id=team.id,
-            day=today,
+            team_id=team_id,
+            day=day,
             risk_level=RiskLevel.low,
             avg_mood=0,
             avg_stress=0,
             checkin_count=0,
         )
 
-    ordered_days = sorted(daily.keys())
     stress_averages: list[float] = []
     mood_averages: list[float] = []
     counts: list[int] = []
 
-    for day in ordered_days:
-        entries = daily[day]
-        moods = [m for m, _ in entries]
-        stresses = [s for _, s in entries]
-        stress_avg = sum(stresses) / len(stresses)
-        mood_avg = sum(moods) / len(moods)
-        stress_averages.append(stress_avg)
-        mood_averages.append(mood_avg)
-        counts.append(len(entries))
+    for bucket in buckets:
+        stress_averages.append(bucket.sum_stress / bucket.count)
+        mood_averages.append(bucket.sum_mood / bucket.count)
+        counts.append(bucket.count)
 
     stress_ewma = ewma(stress_averages)
     avg_mood = sum(mood_averages[-7:]) / min(len(mood_averages), 7)
@@ -90,8 +81,8 @@ def latest_risk_snapshot(db: Session, team: Team) -> RiskSnapshot:
         level = RiskLevel.low
 
     snapshot = RiskSnapshot(
-        team_id=team.id,
-        day=today,
+        team_id=team_id,
+        day=day,
         risk_level=level,
         avg_mood=avg_mood,
         avg_stress=avg_stress,
@@ -100,20 +91,37 @@ def latest_risk_snapshot(db: Session, team: Team) -> RiskSnapshot:
     return snapshot
 
 
+def latest_risk_snapshot(db: Session, team: Team) -> RiskSnapshot:
+    """Score today's risk from the team's rollup buckets (at most 31 rows)."""
+
+    return score_team(db, team.id)
+
+
+def score_team(db: Session, team_id: int) -> RiskSnapshot:
+    today = date.today()
+    start = today - timedelta(days=WINDOW_DAYS)
+    return compute_risk(team_id, today, rollup.daily_buckets(db, team_id, start))
+
+
 def upsert_risk_snapshot(db: Session, team: Team) -> RiskSnapshot:
-    snapshot = latest_risk_snapshot(db, team)
-    existing = (
-        db.query(RiskSnapshot)
-        .filter(RiskSnapshot.team_id == team.id, RiskSnapshot.day == snapshot.day)
-        .one_or_none()
-    )
-    if existing:
-        existing.risk_level = snapshot.risk_level
-        existing.avg_mood = snapshot.avg_mood
-        existing.avg_stress = snapshot.avg_stress
-        existing.checkin_count = snapshot.checkin_count
-        db.add(existing)
-        return existing
-
-    db.add(snapshot)
+    return upsert_team_risk(db, team.id)
+
+
+def snapshot_values(snapshot: RiskSnapshot) -> dict[str, Any]:
+    return {
+        "team_id": snapshot.team_id,
+        "day": snapshot.day,
+        "risk_level": snapshot.risk_level,
+        "avg_mood": snapshot.avg_mood,
+        "avg_stress": snapshot.avg_stress,
+        "checkin_count": snapshot.checkin_count,
+    }
+
+
+def upsert_team_risk(db: Session, team_id: int) -> RiskSnapshot:
+    """Score today's risk and write it with a single ``INSERT ... ON CONFLICT``."""
+
+    with metrics.risk_compute_duration.time("team"):
+        snapshot = score_team(db, team_id)
+        upsert(db, RiskSnapshot, [snapshot_values(snapshot)], index_elements=["team_id", "day"])
     return snapshot
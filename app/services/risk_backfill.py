@@ -0,0 +1,131 @@
+"""Historical risk snapshot backfill over a sliding window."""
+from __future__ import annotations
+
+import logging
+from collections import defaultdict, deque
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.db.models import RiskSnapshot, Team, TeamDailyStat
+from app.services.risk import WINDOW_DAYS, compute_risk, snapshot_values
+from app.services.rollup import DailyBucket
+
+logger = logging.getLogger(__name__)
+
+
+def _days(start: date, end: date) -> Iterator[date]:
+    day = start
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
+
+
+def score_range(team_id: int, buckets: Sequence[DailyBucket], start: date, end: date) -> list[RiskSnapshot]:
+    """Score every day in ``[start, end]`` by sliding a 30-day window over ``buckets``.
+
+    Each day only admits the buckets that entered the window and evicts those
+    that left it, so the walk costs O(1) per day regardless of history length.
+    Unlike :func:`app.services.risk.latest_risk_snapshot`, days after the
+    snapshot day are never visible to it.
+    """
+
+    window: deque[DailyBucket] = deque()
+    pending = iter(buckets)
+    upcoming = next(pending, None)
+    snapshots: list[RiskSnapshot] = []
+    for day in _days(start, end):
+        while upcoming is not None and upcoming.day <= day:
+            window.append(upcoming)
+            upcoming = next(pending, None)
+        cutoff = day - timedelta(days=WINDOW_DAYS)
+        while window and window[0].day < cutoff:
+            window.popleft()
+        snapshots.append(compute_risk(team_id, day, window))
+    return snapshots
+
+
+def backfill_teams(db: Session, team_ids: Iterable[int], start: date, end: date) -> int:
+    """Replace snapshots for ``team_ids`` in ``[start, end]``; returns rows written."""
+
+    ids = list(team_ids)
+    if not ids or start > end:
+        return 0
+
+    rows = db.execute(
+        select(
+            TeamDailyStat.team_id,
+            TeamDailyStat.day,
+            TeamDailyStat.checkin_count,
+            TeamDailyStat.sum_mood,
+            TeamDailyStat.sum_stress,
+        )
+        .where(
+            TeamDailyStat.team_id.in_(ids),
+            TeamDailyStat.day >= start - timedelta(days=WINDOW_DAYS),
+            TeamDailyStat.day <= end,
+            TeamDailyStat.checkin_count > 0,
+        )
+        .order_by(TeamDailyStat.team_id, TeamDailyStat.day)
+    )
+    buckets: dict[int, list[DailyBucket]] = defaultdict(list)
+    for team_id, day, count, sum_mood, sum_stress in rows:
+        buckets[team_id].append(DailyBucket(day, count, sum_mood, sum_stress))
+
+    db.execute(
+        delete(RiskSnapshot).where(
+            RiskSnapshot.team_id.in_(ids),
+            RiskSnapshot.day >= start,
+            RiskSnapshot.day <= end,
+        )
+    )
+    written = 0
+    for team_id in ids:
+        snapshots = score_range(team_id, buckets.get(team_id, []), start, end)
+        db.execute(insert(RiskSnapshot), [snapshot_values(snapshot) for snapshot in snapshots])
+        written += len(snapshots)
+    return written
+
+
+def backfill_org(db: Session, org_id: int, start: date, end: date) -> int:
+    """Backfill every team in an org."""
+
+    team_ids = db.execute(select(Team.id).where(Team.org_id == org_id)).scalars().all()
+    return backfill_teams(db, team_ids, start, end)
+
+
+def _init_worker() -> None:
+    # Connections inherited across fork must never be reused by the child.
+    from app.db.session import engine
+
+    engine.dispose(close=False)
+
+
+def _backfill_org_job(org_id: int, start: date, end: date) -> int:
+    from app.db.session import session_scope
+
+    with session_scope() as db:
+        return backfill_org(db, org_id, start, end)
+
+
+def backfill_orgs(org_ids: Iterable[int], start: date, end: date, workers: int = 4) -> dict[int, int]:
+    """Backfill many orgs in a process pool, one transaction per org."""
+
+    ids = list(org_ids)
+    results: dict[int, int] = {}
+    if workers <= 1:
+        for org_id in ids:
+            results[org_id] = _backfill_org_job(org_id, start, end)
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {org_id: pool.submit(_backfill_org_job, org_id, start, end) for org_id in ids}
+        for org_id, future in futures.items():
+            try:
+                results[org_id] = future.result()
+            except Exception:
+                logger.exception("Risk backfill failed for org %s", org_id)
+    return results
@@ -0,0 +1,169 @@
+"""Vectorized risk scoring across all teams."""
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Mapping, Sequence
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.db.models import RiskLevel, RiskSnapshot, Team, TeamDailyStat
+from app.db.upsert import upsert
+from app.services.risk import WINDOW_DAYS, snapshot_values
+from app.services.rollup import DailyBucket
+
+ALPHA = 2 / (30 + 1)
+
+
+def load_window(db: Session, day: date) -> dict[int, list[DailyBucket]]:
+    """Fetch every team's window buckets in a single query, keyed by team id."""
+
+    start = day - timedelta(days=WINDOW_DAYS)
+    stmt = (
+        select(
+            Team.id,
+            TeamDailyStat.day,
+            TeamDailyStat.checkin_count,
+            TeamDailyStat.sum_mood,
+            TeamDailyStat.sum_stress,
+        )
+        .outerjoin(
+            TeamDailyStat,
+            and_(
+                TeamDailyStat.team_id == Team.id,
+                TeamDailyStat.day >= start,
+                TeamDailyStat.checkin_count > 0,
+            ),
+        )
+        .order_by(Team.id, TeamDailyStat.day)
+    )
+    buckets: dict[int, list[DailyBucket]] = defaultdict(list)
+    for team_id, bucket_day, count, sum_mood, sum_stress in db.execute(stmt):
+        series = buckets[team_id]
+        if bucket_day is not None:
+            series.append(DailyBucket(bucket_day, count, sum_mood, sum_stress))
+    return dict(buckets)
+
+
+def score_teams(day: date, buckets: Mapping[int, Sequence[DailyBucket]]) -> list[RiskSnapshot]:
+    """Score many teams at once over a right-aligned teams x days matrix.
+
+    Every reduction walks the day axis in the same order as
+    :func:`app.services.risk.compute_risk`, so results are bit-for-bit identical.
+    """
+
+    team_ids = list(buckets)
+    if not team_ids:
+        return []
+
+    lengths = np.array([len(buckets[team_id]) for team_id in team_ids], dtype=np.int64)
+    width = max(int(lengths.max()), 1)
+    counts = np.zeros((len(team_ids), width), dtype=np.int64)
+    stress = np.zeros((len(team_ids), width), dtype=np.float64)
+    mood = np.zeros((len(team_ids), width), dtype=np.float64)
+    for row, team_id in enumerate(team_ids):
+        series = buckets[team_id]
+        offset = width - len(series)
+        for col, bucket in enumerate(series, start=offset):
+            counts[row, col] = bucket.count
+            stress[row, col] = bucket.sum_stress / bucket.count
+            mood[row, col] = bucket.sum_mood / bucket.count
+
+    valid = counts > 0
+    first_col = width - lengths
+    has_data = lengths > 0
+    recent_cols = range(max(width - 7, 0), width)
+    prior_cols = range(max(width - 14, 0), max(width - 7, 0))
+    n_recent = np.minimum(lengths, 7)
+    safe_recent = np.maximum(n_recent, 1)
+    safe_len = np.maximum(lengths, 1)
+
+    stress_ewma = np.zeros(len(team_ids))
+    for col in range(width):
+        blended = ALPHA * stress[:, col] + (1 - ALPHA) * stress_ewma
+        stress_ewma = np.where(first_col == col, stress[:, col], np.where(valid[:, col], blended, stress_ewma))
+
+    recent_mood = np.zeros(len(team_ids))
+    recent_stress = np.zeros(len(team_ids))
+    recent_count = np.zeros(len(team_ids), dtype=np.int64)
+    for col in recent_cols:
+        recent_mood = recent_mood + np.where(valid[:, col], mood[:, col], 0.0)
+        recent_stress = recent_stress + np.where(valid[:, col], stress[:, col], 0.0)
+        recent_count = recent_count + counts[:, col]
+
+    prior_stress = np.zeros(len(team_ids))
+    prior_count = np.zeros(len(team_ids), dtype=np.int64)
+    for col in prior_cols:
+        prior_stress = prior_stress + np.where(valid[:, col], stress[:, col], 0.0)
+        prior_count = prior_count + counts[:, col]
+
+    avg_mood = recent_mood / safe_recent
+    avg_stress = recent_stress / safe_recent
+    prev_avg = np.where(lengths >= 14, prior_stress / 7, avg_stress)
+    delta = avg_stress - prev_avg
+    participation_drop = (recent_count < 5) | ((prior_count > 0) & (recent_count < prior_count * 0.6))
+
+    total_stress = np.zeros(len(team_ids))
+    for col in range(width):
+        total_stress = total_stress + np.where(valid[:, col], stress[:, col], 0.0)
+    mean_stress = total_stress / safe_len
+
+    squared = np.zeros(len(team_ids))
+    for col in range(width):
+        squared = squared + np.where(valid[:, col], (stress[:, col] - mean_stress) ** 2, 0.0)
+    stdev = np.sqrt(squared / safe_len)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z_score = np.where(stdev != 0, (stress_ewma - mean_stress) / stdev, 0.0)
+
+    signals = (
+        (stress_ewma > mean_stress + 0.5).astype(np.int64)
+        + (delta > 0.3).astype(np.int64)
+        + participation_drop.astype(np.int64)
+    )
+    high = (z_score > 1.7) | (signals >= 3)
+    moderate = ~high & (signals >= 2)
+
+    snapshots: list[RiskSnapshot] = []
+    for row, team_id in enumerate(team_ids):
+        if not has_data[row]:
+            level, mood_value, stress_value, count_value = RiskLevel.low, 0.0, 0.0, 0
+        else:
+            if high[row]:
+                level = RiskLevel.high
+            elif moderate[row]:
+                level = RiskLevel.moderate
+            else:
+                level = RiskLevel.low
+            mood_value = float(avg_mood[row])
+            stress_value = float(avg_stress[row])
+            count_value = int(recent_count[row])
+        snapshots.append(
+            RiskSnapshot(
+                team_id=team_id,
+                day=day,
+                risk_level=level,
+                avg_mood=mood_value,
+                avg_stress=stress_value,
+                checkin_count=count_value,
+            )
+        )
+    return snapshots
+
+
+def upsert_snapshots(db: Session, snapshots: Sequence[RiskSnapshot]) -> None:
+    """Write snapshots with multi-row ``INSERT ... ON CONFLICT`` statements."""
+
+    upsert(db, RiskSnapshot, [snapshot_values(snapshot) for snapshot in snapshots], index_elements=["team_id", "day"])
+
+
+def recompute_all(db: Session, day: date | None = None) -> int:
+    """Refresh today's snapshot for every team in one pass; returns teams scored."""
+
+    day = day or date.today()
+    with metrics.risk_compute_duration.time("batch"):
+        snapshots = score_teams(day, load_window(db, day))
+        upsert_snapshots(db, snapshots)
+    return len(snapshots)
@@ -0,0 +1,189 @@
+"""Per-team daily check-in rollups.
+
+``team_daily_stats`` holds one row per team and day with the check-in count,
+mood/stress sums and distinct participants. It is updated on every ingest and
+can be rebuilt from raw check-ins, so dashboard reads scale with the number of
+days in a window rather than the number of check-ins. Rebuilds and
+participant checks read through both check-in tiers (see ``archive``).
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from datetime import date
+from typing import Any
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.db.models import Checkin, TeamDailyStat
+from app.db.upsert import upsert
+from app.services import archive
+
+
+@dataclass(frozen=True)
+class DailyBucket:
+    """Check-in totals for a single team/day."""
+
+    day: date
+    count: int
+    sum_mood: int
+    sum_stress: int
+    participants: int = 0
+
+
+def record_checkin(db: Session, checkin: Checkin) -> None:
+    """Fold one check-in (already added to ``db``) into its team/day bucket in O(1)."""
+
+    if checkin.id is None:
+        db.flush()
+
+    seen_today = db.execute(
+        select(Checkin.id)
+        .where(
+            Checkin.user_id == checkin.user_id,
+            Checkin.checkin_date == checkin.checkin_date,
+            Checkin.id != checkin.id,
+        )
+        .limit(1)
+    ).first()
+    if not seen_today and checkin.checkin_date < archive.hot_cutoff():
+        seen_today = archive.archived_participants(db, [checkin.user_id], [checkin.checkin_date])
+    new_participant = 0 if seen_today else 1
+    _add_to_buckets(
+        db,
+        [
+            {
+                "team_id": checkin.team_id,
+                "day": checkin.checkin_date,
+                "checkin_count": 1,
+                "sum_mood": checkin.mood,
+                "sum_stress": checkin.stress,
+                "participants": new_participant,
+            }
+        ],
+    )
+
+
+def record_checkins(db: Session, rows: Sequence[Mapping[str, Any]]) -> int:
+    """Fold a batch of check-in rows into their buckets with one upsert statement.
+
+    Call this before inserting ``rows`` so participant counts can tell the
+    batch apart from check-ins that were already stored. Returns the number of
+    buckets touched.
+    """
+
+    if not rows:
+        return 0
+
+    user_ids = {row["user_id"] for row in rows}
+    days = {row["checkin_date"] for row in rows}
+    seen = set(
+        db.execute(
+            select(Checkin.user_id, Checkin.checkin_date)
+            .where(Checkin.user_id.in_(user_ids), Checkin.checkin_date.in_(days))
+            .distinct()
+        ).all()
+    )
+    cold_days = {day for day in days if day < archive.hot_cutoff()}
+    if cold_days:
+        seen |= archive.archived_participants(db, user_ids, cold_days)
+
+    totals: dict[tuple[int, date], list[int]] = defaultdict(lambda: [0, 0, 0, 0])
+    for row in rows:
+        bucket = totals[(row["team_id"], row["checkin_date"])]
+        bucket[0] += 1
+        bucket[1] += row["mood"]
+        bucket[2] += row["stress"]
+        participant = (row["user_id"], row["checkin_date"])
+        if participant not in seen:
+            seen.add(participant)
+            bucket[3] += 1
+
+    _add_to_buckets(
+        db,
+        [
+            {
+                "team_id": team_id,
+                "day": day,
+                "checkin_count": count,
+                "sum_mood": sum_mood,
+                "sum_stress": sum_stress,
+                "participants": participants,
+            }
+            for (team_id, day), (count, sum_mood, sum_stress, participants) in totals.items()
+        ],
+    )
+    return len(totals)
+
+
+def _add_to_buckets(db: Session, rows: list[dict[str, Any]]) -> None:
+    # INSERT ... ON CONFLICT: concurrent writers add onto the same bucket.
+    upsert(
+        db,
+        TeamDailyStat,
+        rows,
+        index_elements=["team_id", "day"],
+        set_=lambda excluded: {
+            "checkin_count": TeamDailyStat.checkin_count + excluded.checkin_count,
+            "sum_mood": TeamDailyStat.sum_mood + excluded.sum_mood,
+            "sum_stress": TeamDailyStat.sum_stress + excluded.sum_stress,
+            "participants": TeamDailyStat.participants + excluded.participants,
+        },
+    )
+
+
+def daily_buckets(db: Session, team_id: int, start: date, end: date | None = None) -> list[DailyBucket]:
+    """Return non-empty buckets for a team from ``start`` (and up to ``end``), oldest first."""
+
+    stmt = select(
+        TeamDailyStat.day,
+        TeamDailyStat.checkin_count,
+        TeamDailyStat.sum_mood,
+        TeamDailyStat.sum_stress,
+        TeamDailyStat.participants,
+    ).where(
+        TeamDailyStat.team_id == team_id,
+        TeamDailyStat.day >= start,
+        TeamDailyStat.checkin_count > 0,
+    )
+    if end is not None:
+        stmt = stmt.where(TeamDailyStat.day <= end)
+    rows = db.execute(stmt.order_by(TeamDailyStat.day)).all()
+    return [DailyBucket(*row) for row in rows]
+
+
+def rebuild(db: Session, team_ids: Iterable[int] | None = None) -> int:
+    """Recompute rollups from raw check-ins in both tiers, optionally for a subset of teams."""
+
+    ids = list(team_ids) if team_ids is not None else None
+
+    purge = delete(TeamDailyStat)
+    history = archive.checkin_history(team_ids=ids)
+    source = select(
+        history.c.team_id,
+        history.c.checkin_date,
+        func.count(history.c.id),
+        func.sum(history.c.mood),
+        func.sum(history.c.stress),
+        func.count(func.distinct(history.c.user_id)),
+    ).group_by(history.c.team_id, history.c.checkin_date)
+    if ids is not None:
+        purge = purge.where(TeamDailyStat.team_id.in_(ids))
+
+    db.execute(purge)
+    result = db.execute(
+        insert(TeamDailyStat).from_select(
+            ["team_id", "day", "checkin_count", "sum_mood", "sum_stress", "participants"],
+            source,
+        )
+    )
+    return result.rowcount or 0
+
+
+def purge_before(db: Session, team_id: int, cutoff: date) -> int:
+    """Drop a team's buckets older than ``cutoff`` alongside their raw check-ins."""
+
+    result = db.execute(delete(TeamDailyStat).where(TeamDailyStat.team_id == team_id, TeamDailyStat.day < cutoff))
+    return result.rowcount or 0
@@ -0,0 +1,178 @@
+"""In-process job scheduler with a database lease per job.
+
+With ``SCHEDULER_ENABLED`` set, every web worker runs a :class:`Scheduler`
+thread that wakes each ``SCHEDULER_POLL_SECONDS`` and, for every scheduled job
+whose current slot has not run yet, tries to take the job's row in
+``job_leases``. Taking it is a single conditional upsert that only succeeds
+when the previous lease has expired and the row was last claimed for an
+earlier slot, so exactly one process runs each slot, even with many workers
+across many machines. A job the scheduler has never seen is only registered
+at its current slot, so enabling the scheduler (or deploying a new job) does
+not fire e.g. Monday's check-in prompt on a Saturday; it first runs at its
+next slot. After that, a slot missed while nothing was running is caught up
+once at the next poll. A run that dies mid-way is not retried until the next
+slot; its ``job_runs`` row stays ``running``.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+from collections.abc import Callable
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.models import JobLease
+from app.db.upsert import upsert
+from app.services import jobs
+
+logger = logging.getLogger(__name__)
+
+
+def default_holder() -> str:
+    # Computed per call: workers forked from a preloading master share module state.
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def acquire_lease(db: Session, job: str, holder: str, slot: datetime, now: datetime | None = None) -> bool:
+    """Claim ``job`` for ``slot``; ``False`` if it is running elsewhere or already ran for that slot."""
+
+    now = now or datetime.now(UTC).replace(tzinfo=None)
+    claimed = upsert(
+        db,
+        JobLease,
+        [{"job": job, "holder": holder, "expires_at": now + jobs.JOBS[job].lease, "last_slot": slot}],
+        index_elements=["job"],
+        where=(JobLease.expires_at <= now) & (JobLease.last_slot < slot),
+    )
+    db.commit()
+    return claimed > 0
+
+
+def seed_lease(db: Session, job: str, slot: datetime) -> bool:
+    """Register ``job`` as already run for ``slot`` if it has no lease row yet; ``True`` if it was seeded."""
+
+    seeded = upsert(
+        db,
+        JobLease,
+        [{"job": job, "holder": "", "expires_at": slot, "last_slot": slot}],
+        index_elements=["job"],
+        set_=[],
+    )
+    db.commit()
+    return seeded > 0
+
+
+def release_lease(db: Session, job: str, holder: str) -> None:
+    now = datetime.now(UTC).replace(tzinfo=None)
+    db.execute(update(JobLease).where(JobLease.job == job, JobLease.holder == holder).values(expires_at=now))
+    db.commit()
+
+
+def run_exclusive(
+    db: Session,
+    job: str,
+    trigger: str,
+    slot: datetime | None = None,
+    holder: str | None = None,
+    **kwargs: Any,
+) -> dict[str, Any] | None:
+    """Run ``job`` under its lease; returns ``None`` without running if the lease is taken.
+
+    On-demand runs pass no ``slot`` and claim the current instant, so they
+    wait for a scheduled run in progress and make the scheduler skip the slot
+    they ran in.
+    """
+
+    slot = slot or datetime.now(UTC).replace(tzinfo=None)
+    holder = holder or default_holder()
+    if not acquire_lease(db, job, holder, slot):
+        return None
+    try:
+        return jobs.run_job(db, job, trigger, holder=holder, slot=slot, **kwargs)
+    finally:
+        release_lease(db, job, holder)
+
+
+class Scheduler:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        poll_seconds: float = 30.0,
+        holder: str | None = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.poll_seconds = poll_seconds
+        self.holder = holder or default_holder()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def tick(self, now: datetime | None = None) -> list[str]:
+        """Run every job whose current slot is unclaimed; returns the jobs that completed here.
+
+        Jobs without a lease row are seeded at their current slot instead of run.
+        """
+
+        now = now or datetime.now(UTC).replace(tzinfo=None)
+        ran = []
+        for job in jobs.JOBS.values():
+            slot = job.slot(now)
+            if slot is None or self._stop.is_set():
+                continue
+            try:
+                with self.session_factory() as db:
+                    if seed_lease(db, job.name, slot):
+                        continue
+                    if run_exclusive(db, job.name, "schedule", slot=slot, holder=self.holder) is not None:
+                        ran.append(job.name)
+            except Exception:
+                logger.exception("Scheduled job %s failed", job.name)
+        return ran
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="job-scheduler", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.tick()
+            self._stop.wait(self.poll_seconds)
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stop polling; a job already running is allowed ``timeout`` seconds to finish."""
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+_scheduler: Scheduler | None = None
+
+
+def start() -> Scheduler | None:
+    """Start this process's scheduler when ``SCHEDULER_ENABLED`` is set."""
+
+    global _scheduler
+    settings = get_settings()
+    if not settings.scheduler_enabled:
+        return None
+    if _scheduler is None:
+        from app.db.session import SessionLocal
+
+        _scheduler = Scheduler(SessionLocal, poll_seconds=settings.scheduler_poll_seconds)
+    _scheduler.start()
+    return _scheduler
+
+
+def stop(timeout: float | None = None) -> None:
+    global _scheduler
+    scheduler, _scheduler = _scheduler, None
+    if scheduler is not None:
+        scheduler.stop(timeout)
@@ -1,8 +1,12 @@
 """Slack integration helpers."""
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Any, Dict
+import random
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any, Dict, Self
 
 import httpx
 
@@ -24,7 +28,7 @@ def oauth_access(code: str, redirect_uri: str) -> Dict[str, Any]:
         "redirect_uri": redirect_uri,
     }
     with httpx.Client(timeout=10) as client:
-        resp = client.post(f"{SLACK_API_BASE}/oauth.v2.access", data=payload)
+        resp = client.post(f"{settings.slack_api_base}/oauth.v2.access", data=payload)
         resp.raise_for_status()
         data = resp.json()
         if not data.get("ok"):
@@ -33,16 +37,121 @@ def oauth_access(code: str, redirect_uri: str) -> Dict[str, Any]:
         return data
 
 
-def post_message(token: str, channel: str, text: str) -> bool:
-    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json; charset=utf-8"}
-    payload = {"channel": channel, "text": text}
-    with httpx.Client(timeout=10) as client:
-        resp = client.post(f"{SLACK_API_BASE}/chat.postMessage", json=payload, headers=headers)
-        if resp.status_code >= 400:
-            logger.error("Slack postMessage HTTP %s: %s", resp.status_code, resp.text)
-            return False
-        body = resp.json()
-        if not body.get("ok"):
-            logger.error("Slack postMessage response: %s", body)
-            return False
-    return True
+@dataclass(frozen=True)
+class SlackMessage:
+    key: int
+    token: str
+    channel: str
+    text: str
+
+
+@dataclass
+class PostResult:
+    key: int
+    ok: bool
+    error: str | None = None
+    attempts: int = 0
+    # False once Slack has rejected the message outright (bad token, unknown channel...).
+    retryable: bool = True
+
+
+class AsyncSlackClient:
+    """``chat.postMessage`` over one pooled ``httpx.AsyncClient``.
+
+    At most ``concurrency`` requests are in flight. Rate-limited calls wait for
+    ``Retry-After``; network errors and 5xx responses back off exponentially with
+    full jitter. Slack ``ok: false`` errors other than ``ratelimited`` are final.
+    """
+
+    def __init__(
+        self,
+        base_url: str = SLACK_API_BASE,
+        concurrency: int = 20,
+        max_attempts: int = 4,
+        timeout: float = 10.0,
+        backoff: float = 0.5,
+        max_retry_after: float = 60.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_retry_after = max_retry_after
+        self.transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def __aenter__(self) -> Self:
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+            transport=self.transport,
+        )
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _jitter(self, attempt: int) -> float:
+        return random.uniform(0, self.backoff * 2 ** (attempt - 1))
+
+    def _retry_after(self, resp: httpx.Response, attempt: int) -> float:
+        try:
+            delay = float(resp.headers.get("Retry-After", ""))
+        except ValueError:
+            return self._jitter(attempt)
+        # Small jitter so rate-limited callers don't all come back at the same instant.
+        return min(delay, self.max_retry_after) + random.uniform(0, self.backoff)
+
+    async def post_message(self, message: SlackMessage) -> PostResult:
+        if self._client is None:
+            raise RuntimeError("AsyncSlackClient must be used as an async context manager")
+
+        result = PostResult(key=message.key, ok=False)
+        headers = {"Authorization": f"Bearer {message.token}", "Content-Type": "application/json; charset=utf-8"}
+        payload = {"channel": message.channel, "text": message.text}
+        while result.attempts < self.max_attempts:
+            result.attempts += 1
+            delay: float | None = None
+            async with self._semaphore:
+                try:
+                    resp = await self._client.post(f"{self.base_url}/chat.postMessage", json=payload, headers=headers)
+                except httpx.TransportError as exc:
+                    result.error = f"{type(exc).__name__}: {exc}"
+                    delay = self._jitter(result.attempts)
+                else:
+                    if resp.status_code == 429:
+                        result.error = "ratelimited"
+                        delay = self._retry_after(resp, result.attempts)
+                    elif resp.status_code >= 500:
+                        result.error = f"HTTP {resp.status_code}"
+                        delay = self._jitter(result.attempts)
+                    elif resp.status_code >= 400:
+                        result.error = f"HTTP {resp.status_code}"
+                        result.retryable = False
+                    else:
+                        body = resp.json()
+                        if body.get("ok"):
+                            result.ok, result.error = True, None
+                            return result
+                        result.error = body.get("error", "unknown_error")
+                        if result.error == "ratelimited":
+                            delay = self._retry_after(resp, result.attempts)
+                        else:
+                            result.retryable = False
+            if delay is None:
+                break
+            # Sleep outside the semaphore so waiting retries don't block other messages.
+            if result.attempts < self.max_attempts:
+                await asyncio.sleep(delay)
+
+        logger.error("Slack postMessage for %s failed after %s attempts: %s", message.key, result.attempts, result.error)
+        return result
+
+    async def post_messages(self, messages: Sequence[SlackMessage]) -> list[PostResult]:
+        return list(await asyncio.gather(*(self.post_message(message) for message in messages)))
+
@@ -0,0 +1,237 @@
+"""Asynchronous, idempotent processing of Stripe webhook events.
+
+The webhook only verifies the signature and calls :func:`record_event`, which
+inserts the event keyed by its Stripe id (redeliveries are ignored), so Stripe
+gets its 200 without waiting on our database work or on further Stripe API
+calls. The worker (``scripts/stripe_event_worker.py``) then handles one org at
+a time under a row lock on ``orgs``, so several workers never reorder an
+org's events:
+
+* pending events are taken in the order Stripe created them;
+* for each subscription only the newest pending event is applied - older
+  ones, and any older than an event already applied, are marked superseded;
+* if applying fails, the org's pending events are retried with backoff and
+  marked failed after ``MAX_ATTEMPTS``.
+"""
+from __future__ import annotations
+
+import logging
+import random
+import threading
+from collections.abc import Callable, Mapping
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.models import Org, StripeEvent
+from app.db.upsert import upsert
+from app.services import billing
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+PROCESSED = "processed"
+SUPERSEDED = "superseded"
+IGNORED = "ignored"
+FAILED = "failed"
+
+MAX_ATTEMPTS = 8
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+
+
+@dataclass
+class EventBatchReport:
+    processed: int = 0
+    superseded: int = 0
+    ignored: int = 0
+    retried: int = 0
+
+    @property
+    def handled(self) -> int:
+        return self.processed + self.superseded + self.ignored + self.retried
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+def _org_id(data: Mapping[str, Any]) -> int | None:
+    metadata = data.get("metadata") or {}
+    value = metadata.get("org_id") or metadata.get("orgId")
+    try:
+        return int(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def record_event(db: Session, event: Mapping[str, Any]) -> bool:
+    """Store a verified event for the worker; returns ``False`` if this event id was already stored."""
+
+    data = event["data"]["object"]
+    org_id = _org_id(data)
+    # Checkout sessions point at the subscription they created.
+    object_id = data.get("subscription") if data.get("object") == "checkout.session" else data.get("id")
+    now = datetime.now(UTC).replace(tzinfo=None)
+    created = datetime.fromtimestamp(event["created"], UTC).replace(tzinfo=None) if event.get("created") else now
+    inserted = upsert(
+        db,
+        StripeEvent,
+        [
+            {
+                "id": event["id"],
+                "type": event.get("type", ""),
+                "org_id": org_id,
+                "object_id": object_id,
+                "created": created,
+                "payload": dict(event),
+                "status": PENDING if org_id is not None else IGNORED,
+                "next_attempt_at": now,
+            }
+        ],
+        index_elements=["id"],
+        set_=[],
+    )
+    db.commit()
+    if org_id is None:
+        logger.warning("Stripe event %s (%s) has no org_id metadata; ignored", event["id"], event.get("type"))
+    return inserted > 0
+
+
+def _backoff(attempts: int) -> timedelta:
+    delay = min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+    return timedelta(seconds=random.uniform(delay / 2, delay))
+
+
+def _due(org_id: int, now: datetime):
+    return (
+        StripeEvent.status == PENDING,
+        StripeEvent.org_id == org_id,
+        StripeEvent.next_attempt_at <= now,
+    )
+
+
+def process_org(db: Session, org_id: int, report: EventBatchReport) -> None:
+    """Apply one org's due events in a single transaction; skips the org if another worker holds it."""
+
+    now = datetime.now(UTC).replace(tzinfo=None)
+    locked = db.execute(select(Org.id).where(Org.id == org_id).with_for_update(skip_locked=True)).scalar()
+    if locked is None:
+        if db.get(Org, org_id) is None:
+            result = db.execute(
+                update(StripeEvent)
+                .where(*_due(org_id, now))
+                .values(status=IGNORED, processed_at=now, last_error="unknown org")
+            )
+            report.ignored += result.rowcount or 0
+        db.commit()
+        return
+
+    events = (
+        db.execute(select(StripeEvent).where(*_due(org_id, now)).order_by(StripeEvent.created, StripeEvent.received_at))
+        .scalars()
+        .all()
+    )
+    if not events:
+        db.commit()
+        return
+
+    applied = dict(
+        db.execute(
+            select(StripeEvent.object_id, func.max(StripeEvent.created))
+            .where(StripeEvent.org_id == org_id, StripeEvent.status == PROCESSED)
+            .group_by(StripeEvent.object_id)
+        ).all()
+    )
+    newest: dict[str, StripeEvent] = {}
+    for event in events:
+        newest[event.object_id or event.id] = event
+
+    to_apply = []
+    superseded = 0
+    for event in events:
+        key = event.object_id or event.id
+        last_applied = applied.get(event.object_id) if event.object_id else None
+        if newest[key] is not event or (last_applied is not None and event.created < last_applied):
+            event.status = SUPERSEDED
+            event.processed_at = now
+            superseded += 1
+        else:
+            to_apply.append(event)
+
+    attempts = max(event.attempts for event in events) + 1
+    try:
+        for event in to_apply:
+            billing.update_subscription_from_event(db, event.payload)
+            event.status = PROCESSED
+            event.processed_at = now
+            event.attempts += 1
+        db.commit()
+    except Exception as exc:
+        db.rollback()
+        logger.exception("Applying Stripe events for org %s failed (attempt %s)", org_id, attempts)
+        _defer(db, org_id, now, attempts, f"{type(exc).__name__}: {exc}", report)
+        return
+    # Counted only once committed: a rollback undoes the superseded marks and they are retried instead.
+    report.superseded += superseded
+    report.processed += len(to_apply)
+
+
+def _defer(db: Session, org_id: int, now: datetime, attempts: int, error: str, report: EventBatchReport) -> None:
+    # Every due event of the org waits, so nothing newer is applied ahead of it.
+    status = FAILED if attempts >= MAX_ATTEMPTS else PENDING
+    result = db.execute(
+        update(StripeEvent)
+        .where(*_due(org_id, now))
+        .values(
+            status=status,
+            attempts=StripeEvent.attempts + 1,
+            last_error=error,
+            next_attempt_at=now + _backoff(attempts),
+        )
+    )
+    db.commit()
+    report.retried += result.rowcount or 0
+
+
+def process_batch(session_factory: Callable[[], Session], batch_orgs: int | None = None) -> EventBatchReport:
+    """Process due events for up to ``batch_orgs`` orgs, oldest first."""
+
+    batch_orgs = batch_orgs or get_settings().stripe_event_batch_orgs
+    report = EventBatchReport()
+    now = datetime.now(UTC).replace(tzinfo=None)
+    with session_factory() as db:
+        org_ids = (
+            db.execute(
+                select(StripeEvent.org_id)
+                .where(StripeEvent.status == PENDING, StripeEvent.next_attempt_at <= now)
+                .group_by(StripeEvent.org_id)
+                .order_by(func.min(StripeEvent.created))
+                .limit(batch_orgs)
+            )
+            .scalars()
+            .all()
+        )
+    for org_id in org_ids:
+        with session_factory() as db:
+            process_org(db, org_id, report)
+    if report.handled:
+        logger.info("Stripe events: %s", report.as_dict())
+    return report
+
+
+def run_worker(session_factory: Callable[[], Session], stop: threading.Event) -> None:
+    """Process batches until ``stop`` is set, sleeping only when nothing was due."""
+
+    poll = get_settings().stripe_event_poll_seconds
+    while not stop.is_set():
+        try:
+            handled = process_batch(session_factory).handled
+        except Exception:
+            logger.exception("Stripe event batch failed")
+            handled = 0
+        if not handled:
+            stop.wait(poll)
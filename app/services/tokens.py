@@ -0,0 +1,218 @@
+"""Check-in token resolution with a positive cache and a negative filter.
+
+``/checkin/{token}`` is public, so every request used to hash the token,
+query ``users`` and lazy-load the team. ``TokenResolver`` keeps a bounded
+cache of hash -> (user, team, active) and a Bloom filter of every known token
+hash. The filter is built per process and only topped up every few seconds,
+so a miss may just mean the user was created by another worker: misses are
+confirmed with one lookup on the unique token index and only confirmed
+negatives are cached, so repeated probes of an unknown token stay off the
+database. The filter is fully rebuilt periodically so deleted users age out.
+
+Deactivating a user through the ORM evicts its token once the transaction
+commits. Eviction only reaches this process's cache: other workers keep
+resolving the token as active for up to ``TOKEN_CACHE_TTL`` seconds.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.models import Team, User
+from app.services.analytics import LRUTTLBackend
+
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.strip().encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class TokenInfo:
+    user_id: int
+    team_id: int
+    team_name: str
+    active: bool
+
+
+class TokenBloomFilter:
+    """Bloom filter over SHA-256 hex digests.
+
+    The digests are already uniformly distributed, so bit positions come
+    straight from two 64-bit slices of the digest via double hashing.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001) -> None:
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.size = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 64)
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, digest: str) -> list[int]:
+        first = int(digest[:16], 16)
+        step = int(digest[16:32], 16) | 1
+        return [(first + i * step) % self.size for i in range(self.hashes)]
+
+    def add(self, digest: str) -> None:
+        for position in self._positions(digest):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, digest: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(digest))
+
+
+class TokenResolver:
+    """Resolve token hashes to users, rejecting unknown hashes without a query."""
+
+    def __init__(
+        self,
+        cache_size: int = 10_000,
+        cache_ttl: float = 60.0,
+        refresh_interval: float = 10.0,
+        rebuild_interval: float = 900.0,
+    ) -> None:
+        self.cache = LRUTTLBackend(maxsize=cache_size, ttl=cache_ttl)
+        # Kept apart from ``cache`` so a flood of bogus tokens cannot evict real users.
+        self.unknown = LRUTTLBackend(maxsize=cache_size, ttl=cache_ttl)
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self.filtered = 0
+        self._filter: TokenBloomFilter | None = None
+        self._max_user_id = 0
+        self._refreshed_at = 0.0
+        self._rebuilt_at = 0.0
+        self._lock = threading.Lock()
+
+    def rebuild(self, db: Session) -> None:
+        """Rebuild the negative filter from the users table."""
+
+        total, max_id = db.execute(select(func.count(User.id), func.max(User.id))).one()
+        bloom = TokenBloomFilter(capacity=max(2 * (total or 0), 1024))
+        for digest in db.execute(select(User.anon_token_hash)).scalars():
+            bloom.add(digest)
+        now = time.monotonic()
+        with self._lock:
+            self._filter = bloom
+            self._max_user_id = max_id or 0
+            self._refreshed_at = self._rebuilt_at = now
+
+    def _refresh(self, db: Session) -> None:
+        now = time.monotonic()
+        bloom = self._filter
+        if bloom is None or now - self._rebuilt_at >= self.rebuild_interval or bloom.count > bloom.capacity:
+            self.rebuild(db)
+            return
+        if now - self._refreshed_at < self.refresh_interval:
+            return
+
+        rows = db.execute(
+            select(User.id, User.anon_token_hash).where(User.id > self._max_user_id).order_by(User.id)
+        ).all()
+        with self._lock:
+            for user_id, digest in rows:
+                bloom.add(digest)
+                self._max_user_id = max(self._max_user_id, user_id)
+            self._refreshed_at = now
+
+    def register(self, digest: str) -> None:
+        """Make a newly created token resolvable in this process immediately."""
+
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(digest)
+        self.cache.delete_many([digest])
+        self.unknown.delete_many([digest])
+
+    def invalidate(self, digest: str) -> None:
+        self.cache.delete_many([digest])
+
+    def resolve(self, db: Session, digest: str) -> TokenInfo | None:
+        """Return the active user behind ``digest``, or ``None``."""
+
+        self._refresh(db)
+        bloom = self._filter
+        if bloom is not None and digest not in bloom:
+            # Possibly created by another worker since our last refresh.
+            if self.unknown.get_many([digest]):
+                self.filtered += 1
+                return None
+            info = self._lookup(db, digest)
+            if info is None:
+                self.filtered += 1
+                self.unknown.set_many({digest: True})
+                return None
+            with self._lock:
+                bloom.add(digest)
+        else:
+            info = self.cache.get_many([digest]).get(digest) or self._lookup(db, digest)
+            if info is None:
+                return None
+        return info if info.active else None
+
+    def _lookup(self, db: Session, digest: str) -> TokenInfo | None:
+        row = db.execute(
+            select(User.id, User.team_id, Team.name, User.active)
+            .join(Team, Team.id == User.team_id)
+            .where(User.anon_token_hash == digest)
+        ).first()
+        if row is None:
+            return None
+        info = TokenInfo(*row)
+        self.cache.set_many({digest: info})
+        return info
+
+
+_resolver: TokenResolver | None = None
+
+
+def get_resolver() -> TokenResolver:
+    global _resolver
+    if _resolver is None:
+        settings = get_settings()
+        _resolver = TokenResolver(
+            cache_size=settings.token_cache_size,
+            cache_ttl=settings.token_cache_ttl,
+            refresh_interval=settings.token_filter_refresh_seconds,
+            rebuild_interval=settings.token_filter_rebuild_seconds,
+        )
+    return _resolver
+
+
+def resolve(db: Session, digest: str) -> TokenInfo | None:
+    return get_resolver().resolve(db, digest)
+
+
+def register(digest: str) -> None:
+    get_resolver().register(digest)
+
+
+_PENDING_KEY = "token_invalidations"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_active_changes(session: Session, flush_context: object) -> None:
+    for obj in session.dirty:
+        if isinstance(obj, User) and obj.anon_token_hash and inspect(obj).attrs.active.history.has_changes():
+            session.info.setdefault(_PENDING_KEY, set()).add(obj.anon_token_hash)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    # Evicting before commit would let a concurrent lookup re-cache the old row.
+    digests = session.info.pop(_PENDING_KEY, None)
+    if digests and _resolver is not None:
+        _resolver.cache.delete_many(list(digests))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
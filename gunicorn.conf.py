@@ -0,0 +1,17 @@
+"""Gunicorn settings for multi-process serving: ``gunicorn -c gunicorn.conf.py app.main:app``.
+
+Each worker holds its own connection pool, so the database sees up to
+``WEB_CONCURRENCY * (DB_POOL_SIZE + DB_MAX_OVERFLOW)`` connections. Engines are
+reset in every forked worker (see ``app.db.session``), which makes
+``WEB_PRELOAD`` safe to enable.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY") or multiprocessing.cpu_count())
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = os.environ.get("WEB_PRELOAD", "false").lower() in ("1", "true", "yes")
+timeout = int(os.environ.get("WEB_TIMEOUT", "60"))
+graceful_timeout = 30
+accesslog = None
@@ -0,0 +1,43 @@
+"""Backfill historical risk snapshots for a date range."""
+from __future__ import annotations
+
+import argparse
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from app.db import models
+from app.db.session import session_scope
+from app.services import risk_backfill
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--start", type=date.fromisoformat, default=date.today() - timedelta(days=90))
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--org", type=int, action="append", help="Org id (repeatable); defaults to all orgs")
+    parser.add_argument("--team", type=int, action="append", help="Team id (repeatable); runs in-process")
+    parser.add_argument("--workers", type=int, default=4, help="Process pool size for org fan-out")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+
+    if args.team:
+        with session_scope() as db:
+            written = risk_backfill.backfill_teams(db, args.team, args.start, args.end)
+        print(f"Wrote {written} snapshots for {len(args.team)} teams")
+        return
+
+    org_ids = args.org
+    if not org_ids:
+        with session_scope() as db:
+            org_ids = db.execute(select(models.Org.id)).scalars().all()
+
+    results = risk_backfill.backfill_orgs(org_ids, args.start, args.end, workers=args.workers)
+    print(f"Wrote {sum(results.values())} snapshots across {len(results)}/{len(org_ids)} orgs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Compare per-request overhead of the ASGI RequestIDMiddleware with the old BaseHTTPMiddleware.
+
+Both variants wrap the same trivial Starlette app and are driven directly
+through the ASGI interface, so the numbers isolate middleware cost::
+
+    python scripts/bench_middleware.py --requests 20000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+import uuid
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.middleware import RequestIDMiddleware
+
+
+class LegacyRequestIDMiddleware(BaseHTTPMiddleware):
+    """The previous implementation, kept here as the baseline."""
+
+    async def dispatch(self, request: Request, call_next: Callable):
+        request_id = request.headers.get("x-request-id", str(uuid.uuid4()))
+        request.state.request_id = request_id
+        response = await call_next(request)
+        response.headers["x-request-id"] = request_id
+        return response
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--warmup", type=int, default=1000)
+    return parser.parse_args()
+
+
+def build_app(middleware: type) -> Starlette:
+    async def ping(request: Request) -> PlainTextResponse:
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/ping", ping)])
+    app.add_middleware(middleware)
+    return app
+
+
+async def call(app: Starlette) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        pass
+
+    await app(scope, receive, send)
+
+
+async def measure(app: Starlette, requests: int, warmup: int) -> list[float]:
+    for _ in range(warmup):
+        await call(app)
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        await call(app)
+        latencies.append((time.perf_counter() - started) * 1_000_000)
+    return latencies
+
+
+async def main() -> None:
+    args = parse_args()
+    # Keep per-request log lines out of the measurement.
+    logging.getLogger("app.requests").setLevel(logging.WARNING)
+
+    for name, middleware in (("BaseHTTPMiddleware", LegacyRequestIDMiddleware), ("ASGI", RequestIDMiddleware)):
+        latencies = sorted(await measure(build_app(middleware), args.requests, args.warmup))
+        p50 = statistics.median(latencies)
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(f"{name:<20} mean {statistics.fmean(latencies):7.1f} us  p50 {p50:7.1f} us  p99 {p99:7.1f} us")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""Measure requests per second on the public check-in and dashboard routes.
+
+Start the app twice with the same worker count, once with ``ASYNC_ROUTES=0``
+and once with ``ASYNC_ROUTES=1``, and run this script against each::
+
+    uvicorn app.main:app --workers 2 &
+    python scripts/bench_public.py --base-url http://127.0.0.1:8000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--token", default="demo-token", help="Check-in token (seed token by default)")
+    parser.add_argument("--team", type=int, default=1, help="Dashboard team id")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--scenario", choices=["checkin", "dashboard", "submit", "all"], default="all")
+    return parser.parse_args()
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    method: str,
+    path: str,
+    total: int,
+    concurrency: int,
+    data: dict | None = None,
+) -> None:
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker() -> None:
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, data=data)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"{name:<10} {total / elapsed:>8.1f} req/s  p50 {p50:6.1f} ms  p99 {p99:6.1f} ms  errors {errors}")
+
+
+async def main() -> None:
+    args = parse_args()
+    scenarios = {
+        "checkin": ("GET", f"/checkin/{args.token}", None),
+        "dashboard": ("GET", f"/dashboard/{args.team}", None),
+        "submit": ("POST", f"/checkin/{args.token}", {"mood": "3", "stress": "3", "comment": "bench"}),
+    }
+    selected = scenarios if args.scenario == "all" else {args.scenario: scenarios[args.scenario]}
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30.0) as client:
+        for name, (method, path, data) in selected.items():
+            await run_scenario(client, name, method, path, args.requests, args.concurrency, data)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
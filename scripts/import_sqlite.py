@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import sqlite3
 from contextlib import closing
-from datetime import datetime
+from datetime import date, datetime
 
 from sqlalchemy.orm import Session
 
@@ -11,6 +11,7 @@ from app.core.config import get_settings
 from app.db import models
 from app.db.base import Base
 from app.db.session import engine
+from app.services import risk_backfill, rollup
 
 
 LEGACY_DB_PATH = "rmht_app/rmht.db"
@@ -59,6 +60,7 @@ def import_data() -> None:
             session.flush()
             user_id_map[member_row["id"]] = user
 
+        first_day: date | None = None
         for checkin_row in legacy_conn.execute(
             "SELECT id, team_id, member_id, mood, stress, comment, created_at FROM checkins"
         ):
@@ -71,6 +73,7 @@ def import_data() -> None:
                 if checkin_row["created_at"]
                 else datetime.utcnow()
             )
+            first_day = min(first_day, created_at.date()) if first_day else created_at.date()
             session.add(
                 models.Checkin(
                     user_id=user.id,
@@ -83,6 +86,11 @@ def import_data() -> None:
                 )
             )
 
+        session.flush()
+        team_ids = [team.id for team in team_id_map.values()]
+        rollup.rebuild(session, team_ids)
+        if first_day:
+            risk_backfill.backfill_teams(session, team_ids, first_day, date.today())
         session.commit()
 
         print("Imported legacy data into Postgres database", settings.database_url)
@@ -0,0 +1,47 @@
+"""Deliver queued Slack posts and emails from the outbox.
+
+Run one or more alongside the web process::
+
+    python scripts/outbox_worker.py          # until SIGTERM/SIGINT
+    python scripts/outbox_worker.py --once   # drain what is due, then exit
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import signal
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.db.session import SessionLocal
+from app.services import outbox
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--once", action="store_true", help="Process due messages, then exit")
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = parse_args()
+    if args.once:
+        total = 0
+        while handled := await outbox.process_batch(SessionLocal):
+            total += handled
+        print(f"Handled {total} outbox messages")
+        return
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+    await outbox.run_worker(SessionLocal, stop)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
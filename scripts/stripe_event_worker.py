@@ -0,0 +1,46 @@
+"""Apply stored Stripe webhook events to subscriptions.
+
+Run one or more alongside the web process::
+
+    python scripts/stripe_event_worker.py          # until SIGTERM/SIGINT
+    python scripts/stripe_event_worker.py --once   # drain what is due, then exit
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import signal
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.db.session import SessionLocal
+from app.services import stripe_events
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--once", action="store_true", help="Process due events, then exit")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.once:
+        total = 0
+        while handled := stripe_events.process_batch(SessionLocal).handled:
+            total += handled
+        print(f"Handled {total} Stripe events")
+        return
+
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+    stripe_events.run_worker(SessionLocal, stop)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
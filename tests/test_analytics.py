@@ -0,0 +1,170 @@
+import fnmatch
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.base import Base
+from app.services import analytics, risk
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class FakeRedis:
+    """The subset of the redis-py client that SharedBackend uses; keeps the ``ex`` it was given."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, str] = {}
+        self.expiry: dict[str, int] = {}
+
+    def get(self, key: str) -> str | None:
+        return self.data.get(key)
+
+    def set(self, key: str, value: str, ex: int | None = None) -> None:
+        self.data[key] = value
+        self.expiry[key] = ex
+
+    def delete(self, *keys: str) -> int:
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def scan_iter(self, match: str = "*"):
+        return iter([key for key in self.data if fnmatch.fnmatchcase(key, match)])
+
+
+@pytest.fixture()
+def clock(monkeypatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(analytics, "time", fake)
+    return fake
+
+
+def test_lru_evicts_least_recently_used(clock) -> None:
+    backend = analytics.LRUTTLBackend(maxsize=2, ttl=60)
+    backend.set_many({"a": 1, "b": 2})
+    assert backend.get_many(["a"]) == {"a": 1}
+
+    backend.set_many({"c": 3})
+    assert backend.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+
+
+def test_lru_entries_expire_after_ttl(clock) -> None:
+    backend = analytics.LRUTTLBackend(maxsize=10, ttl=60)
+    backend.set_many({"a": 1})
+    clock.now += 59
+    assert backend.get_many(["a"]) == {"a": 1}
+    backend.set_many({"b": 2})
+
+    clock.now += 1
+    assert backend.get_many(["a", "b"]) == {"b": 2}
+    assert "a" not in backend._entries
+
+
+def test_metrics_cache_counts_hits_and_invalidates(clock) -> None:
+    cache = analytics.MetricsCache(analytics.LRUTTLBackend())
+    cache.set_many({1: {"available": False}, 2: {"available": True}}, analytics.METRICS_WINDOW)
+    cache.set_many({1: "dashboard"}, analytics.DASHBOARD_WINDOW)
+
+    assert cache.get_many([1, 2, 3], analytics.METRICS_WINDOW) == {1: {"available": False}, 2: {"available": True}}
+    assert cache.stats() == {"hits": 2, "misses": 1}
+
+    cache.invalidate_team(1)
+    assert cache.get_many([1], analytics.METRICS_WINDOW) == {}
+    assert cache.get_many([1], analytics.DASHBOARD_WINDOW) == {}
+    assert cache.get_many([2], analytics.METRICS_WINDOW) == {2: {"available": True}}
+    assert cache.stats() == {"hits": 3, "misses": 3}
+
+    cache.clear()
+    assert cache.get_many([2], analytics.METRICS_WINDOW) == {}
+
+
+def test_module_level_invalidation_uses_the_installed_backend() -> None:
+    cache = analytics.set_cache_backend(analytics.LRUTTLBackend())
+    cache.set_many({1: "one", 2: "two"}, analytics.METRICS_WINDOW)
+
+    analytics.invalidate_team(1)
+    assert cache.get_many([1, 2], analytics.METRICS_WINDOW) == {2: "two"}
+    analytics.invalidate_all()
+    assert cache.get_many([2], analytics.METRICS_WINDOW) == {}
+
+
+def test_shared_backend_round_trips_json_under_its_prefix() -> None:
+    client = FakeRedis()
+    client.set("other:key", "kept")
+    backend = analytics.SharedBackend(client, ttl=0.5, prefix="test:")
+    cache = analytics.MetricsCache(backend)
+
+    cache.set_many({1: {"avg_mood": 3.5}, 2: {"available": False}}, analytics.METRICS_WINDOW)
+    key = cache.key(1, analytics.METRICS_WINDOW)
+    assert client.expiry["test:" + key] == 1
+    assert cache.get_many([1, 2, 3], analytics.METRICS_WINDOW) == {1: {"avg_mood": 3.5}, 2: {"available": False}}
+
+    cache.invalidate_team(1)
+    assert cache.get_many([1], analytics.METRICS_WINDOW) == {}
+    cache.clear()
+    assert client.data == {"other:key": "kept"}
+
+
+def test_batch_metrics_match_single_team_metrics() -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    today = date.today()
+
+    with Session(engine) as db:
+        org = models.Org(name="Org", allowed_domains=[])
+        db.add(org)
+        db.flush()
+        # Respondents over the last 30 days: at, just under and far under the threshold.
+        sizes = {"Platform": analytics.MINIMUM_RESPONDENTS, "Design": analytics.MINIMUM_RESPONDENTS - 1, "Ops": 0}
+        teams = {name: models.Team(org_id=org.id, name=name) for name in sizes}
+        db.add_all(teams.values())
+        db.flush()
+        for name, size in sizes.items():
+            for idx in range(size):
+                db.add(
+                    models.TeamDailyStat(
+                        team_id=teams[name].id,
+                        day=today - timedelta(days=idx),
+                        checkin_count=1,
+                        sum_mood=1 + idx,
+                        sum_stress=5 - idx % 5,
+                        participants=1,
+                    )
+                )
+            # Outside the window; must not lift a team over the threshold.
+            db.add(models.TeamDailyStat(team_id=teams[name].id, day=today - timedelta(days=40), checkin_count=9))
+        db.flush()
+        risk.upsert_risk_snapshot(db, teams["Platform"])
+        db.commit()
+        ids = [team.id for team in teams.values()]
+
+        statements: list[str] = []
+        event.listen(engine, "before_cursor_execute", lambda conn, cursor, stmt, *args: statements.append(stmt))
+        analytics.set_cache_backend(analytics.LRUTTLBackend())
+        batch = analytics.team_metrics_batch(db, ids)
+        assert len(statements) == 2
+
+        assert batch[teams["Platform"].id]["available"] is True
+        assert batch[teams["Platform"].id]["respondent_count"] == analytics.MINIMUM_RESPONDENTS
+        assert batch[teams["Platform"].id]["avg_mood"] == 3
+        assert batch[teams["Design"].id] == {"available": False, "respondent_count": 4}
+        assert batch[teams["Ops"].id] == {"available": False, "respondent_count": 0}
+
+        single = {}
+        for team in teams.values():
+            analytics.set_cache_backend(analytics.LRUTTLBackend())
+            single[team.id] = analytics.team_metrics(db, team)
+        assert single == batch
@@ -0,0 +1,92 @@
+import os
+import sys
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{ROOT / 'test_app.db'}")
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.base import Base
+from app.services import archive, rollup
+
+DAYS = 120
+
+
+def _stats(db: Session) -> list[tuple]:
+    stat = models.TeamDailyStat
+    return db.execute(
+        select(stat.team_id, stat.day, stat.checkin_count, stat.sum_mood, stat.sum_stress, stat.participants).order_by(
+            stat.team_id, stat.day
+        )
+    ).all()
+
+
+def test_archive_moves_cold_checkins_and_history_reads_both_tiers() -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    today = date.today()
+    now = datetime.now(UTC).replace(tzinfo=None)
+
+    with Session(engine) as db:
+        org = models.Org(name="Acme", allowed_domains=[], retention_days=365)
+        db.add(org)
+        db.flush()
+        team = models.Team(org_id=org.id, name="Core")
+        db.add(team)
+        db.flush()
+        user = models.User(team_id=team.id, anon_token_hash="hash", email="a@example.com")
+        db.add(user)
+        db.flush()
+        db.execute(
+            insert(models.Checkin),
+            [
+                {
+                    "user_id": user.id,
+                    "team_id": team.id,
+                    "checkin_date": today - timedelta(days=offset),
+                    "submitted_at": now - timedelta(days=offset),
+                    "mood": offset % 5 + 1,
+                    "stress": 3,
+                    "comment": "",
+                }
+                for offset in range(DAYS)
+            ],
+        )
+        rollup.rebuild(db)
+        db.commit()
+        before = _stats(db)
+
+        cutoff = archive.hot_cutoff(today)
+        moved = archive.archive_checkins(db, cutoff=cutoff, chunk_size=7)
+        cold = sum(1 for offset in range(DAYS) if today - timedelta(days=offset) < cutoff)
+        assert moved == cold
+        assert db.scalar(select(func.count()).select_from(models.Checkin)) == DAYS - cold
+        assert db.scalar(select(func.min(models.Checkin.checkin_date))) == cutoff
+        assert db.scalar(select(func.count()).select_from(models.CheckinArchive)) == cold
+        assert archive.archive_checkins(db, cutoff=cutoff) == 0
+
+        history = archive.checkin_history(team_ids=[team.id])
+        assert db.scalar(select(func.count()).select_from(history)) == DAYS
+        window = archive.checkin_history(start=cutoff - timedelta(days=5), end=cutoff + timedelta(days=4))
+        assert db.scalar(select(func.count()).select_from(window)) == 10
+
+        rollup.rebuild(db, [team.id])
+        db.commit()
+        assert _stats(db) == before
+
+        # A late check-in for an archived day is not a new participant.
+        cold_day = today - timedelta(days=DAYS - 1)
+        rollup.record_checkins(
+            db, [{"user_id": user.id, "team_id": team.id, "checkin_date": cold_day, "mood": 5, "stress": 1}]
+        )
+        stat = db.execute(
+            select(models.TeamDailyStat).where(models.TeamDailyStat.day == cold_day)
+        ).scalar_one()
+        assert (stat.checkin_count, stat.participants) == (2, 1)
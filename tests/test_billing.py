@@ -0,0 +1,126 @@
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import ClassVar
+from urllib.parse import parse_qs, urlparse
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+import stripe
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db import models
+from app.db.base import Base
+from app.services import billing
+
+
+class StripeMock(BaseHTTPRequestHandler):
+    """Just enough of the Stripe subscriptions API for the seat sync."""
+
+    modified: ClassVar[dict[str, int]] = {}
+
+    def _reply(self, status: int, body: dict) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self) -> None:
+        customer = parse_qs(urlparse(self.path).query)["customer"][0]
+        if customer == "cus_broken":
+            self._reply(500, {"error": {"type": "api_error", "message": "boom"}})
+            return
+        data = [] if customer == "cus_gone" else [{"id": f"sub_{customer}", "object": "subscription"}]
+        self._reply(200, {"object": "list", "data": data, "has_more": False, "url": "/v1/subscriptions"})
+
+    def do_POST(self) -> None:
+        form = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+        sub_id = self.path.rsplit("/", 1)[-1]
+        type(self).modified[sub_id] = int(form["items[0][quantity]"][0])
+        self._reply(200, {"id": sub_id, "object": "subscription"})
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture()
+def stripe_mock(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StripeMock)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(stripe, "api_key", stripe.api_key)
+    monkeypatch.setattr(stripe, "api_base", stripe.api_base)
+    monkeypatch.setattr(stripe, "max_network_retries", 0)
+    monkeypatch.setenv("DATABASE_URL", "sqlite://")
+    monkeypatch.setenv("STRIPE_SECRET_KEY", "sk_test_123")
+    monkeypatch.setenv("STRIPE_PRICE_STARTER", "price_starter")
+    monkeypatch.setenv("STRIPE_PRICE_PRO", "price_pro")
+    monkeypatch.setenv("STRIPE_API_BASE", f"http://127.0.0.1:{server.server_port}")
+    get_settings.cache_clear()
+    StripeMock.modified = {}
+    yield StripeMock.modified
+    server.shutdown()
+    get_settings.cache_clear()
+
+
+def test_seat_sync_groups_counts_and_skips_unchanged_orgs(stripe_mock) -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        customers = {}
+        for name, users in (("big", 12), ("small", 2), ("broken", 7), ("gone", 6), ("free", 3)):
+            org = models.Org(name=name, allowed_domains=[])
+            db.add(org)
+            db.flush()
+            teams = [models.Team(org_id=org.id, name=f"{name} {idx}") for idx in range(2)]
+            db.add_all(teams)
+            db.flush()
+            db.add_all(
+                models.User(team_id=teams[idx % 2].id, anon_token_hash=f"{name}-{idx}", active=idx != 0)
+                for idx in range(users + 1)
+            )
+            customers[name] = None if name == "free" else f"cus_{name}"
+            db.add(
+                models.Subscription(
+                    org_id=org.id,
+                    stripe_customer=customers[name],
+                    plan=models.Plan.pro,
+                    status=models.SubscriptionStatus.active,
+                )
+            )
+        db.commit()
+
+        statements: list[str] = []
+        event.listen(engine, "before_cursor_execute", lambda conn, cursor, stmt, *args: statements.append(stmt))
+        report = billing.sync_subscription_seats(db)
+        assert report.as_dict() == {"synced": 2, "skipped": 2, "failed": 1}
+        assert stripe_mock == {"sub_cus_big": 12, "sub_cus_small": billing.MIN_BILLED_SEATS}
+        assert sum(stmt.lstrip().startswith("SELECT") for stmt in statements) == 1
+
+        synced = dict(
+            db.execute(select(models.Subscription.stripe_customer, models.Subscription.synced_seats)).all()
+        )
+        assert synced == {"cus_big": 12, "cus_small": 5, "cus_broken": None, "cus_gone": None, None: None}
+
+        stripe_mock.clear()
+        report = billing.sync_subscription_seats(db)
+        assert report.as_dict() == {"synced": 0, "skipped": 4, "failed": 1}
+        assert stripe_mock == {}
+
+        # Same seat count on a new plan still has to reach Stripe.
+        big = db.execute(select(models.Subscription).where(models.Subscription.stripe_customer == "cus_big")).scalar_one()
+        big.plan = models.Plan.starter
+        db.commit()
+        report = billing.sync_subscription_seats(db)
+        assert report.as_dict() == {"synced": 1, "skipped": 3, "failed": 1}
+        assert stripe_mock == {"sub_cus_big": 12}
+        assert big.synced_plan == models.Plan.starter
@@ -0,0 +1,80 @@
+import sys
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.base import Base
+from app.services import analytics, risk, rollup
+from app.services import dashboard as dashboard_service
+
+
+def test_dashboard_loads_in_one_round_trip() -> None:
+    """The dashboard must stay within its query budget and match the raw data."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    statements: list[str] = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, stmt, *args: statements.append(stmt))
+    analytics.set_cache_backend(analytics.LRUTTLBackend())
+    today = date.today()
+
+    with Session(engine) as db:
+        org = models.Org(name="Org", allowed_domains=[])
+        db.add(org)
+        db.flush()
+        team = models.Team(org_id=org.id, name="Platform")
+        db.add(team)
+        db.flush()
+        users = [models.User(team_id=team.id, anon_token_hash=f"{idx:064d}") for idx in range(4)]
+        users.append(models.User(team_id=team.id, anon_token_hash="f" * 64, active=False))
+        db.add_all(users)
+        db.flush()
+
+        for offset in range(40):
+            for user in users[: 1 + offset % 4]:
+                checkin = models.Checkin(
+                    user_id=user.id,
+                    team_id=team.id,
+                    checkin_date=today - timedelta(days=offset),
+                    submitted_at=datetime.now(UTC).replace(tzinfo=None) - timedelta(days=offset, minutes=user.id),
+                    mood=1 + (offset + user.id) % 5,
+                    stress=1 + offset % 5,
+                    comment=f"note {offset}-{user.id}",
+                )
+                db.add(checkin)
+                rollup.record_checkin(db, checkin)
+        risk.upsert_risk_snapshot(db, team)
+        db.commit()
+        team_id = team.id
+
+        statements.clear()
+        data = dashboard_service.load_dashboard(db, team_id)
+        assert len(statements) == 1
+
+        statements.clear()
+        assert dashboard_service.load_dashboard(db, team_id) == data
+        assert statements == []
+
+        checkins = db.query(models.Checkin).all()
+        window = [c for c in checkins if c.checkin_date >= today - timedelta(days=30)]
+        assert data is not None and data.available
+        assert data.team_name == "Platform"
+        assert data.respondent_count == len(window)
+        assert data.avg_mood == sum(c.mood for c in window) / len(window)
+        assert data.participation == len([c for c in checkins if c.checkin_date >= today - timedelta(days=7)])
+        assert data.active_users == 4
+        assert [point.day for point in data.trend] == [today - timedelta(days=offset) for offset in range(14, -1, -1)]
+        latest = sorted(checkins, key=lambda c: c.submitted_at, reverse=True)[:5]
+        assert [c.comment for c in data.latest_checkins] == [c.comment for c in latest]
+        assert {seat.user_id: seat.checkin_count for seat in data.roster} == {
+            user.id: len([c for c in window if c.user_id == user.id]) for user in users
+        }
+        assert data.risk_level == risk.latest_risk_snapshot(db, team).risk_level.value
+
+        assert dashboard_service.load_dashboard(db, team_id + 1) is None
@@ -31,3 +31,19 @@ def test_healthcheck_returns_ok() -> None:
 
     if DB_PATH.exists():
         DB_PATH.unlink()
+
+
+def test_metrics_label_requests_by_route_template() -> None:
+    with TestClient(app) as client:
+        client.get("/checkin/not-a-real-token")
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/checkin/{token}",status="404"}' in body
+    assert "not-a-real-token" not in body
+    assert 'db_pool_checked_out{engine="sync"}' in body
+
+    if DB_PATH.exists():
+        DB_PATH.unlink()
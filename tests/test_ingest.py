@@ -0,0 +1,247 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{ROOT / 'test_app.db'}")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import main
+from app.core.config import get_settings
+from app.db import models
+from app.db.base import Base
+from app.dependencies import get_db
+from app.services import archive, ingest_buffer, rollup, tokens
+from app.services.ingest import CheckinRecord, ingest_checkins
+from app.services.ingest_buffer import BufferFull, CheckinBuffer
+from app.services.tokens import hash_token
+
+
+def test_bulk_ingest_matches_rebuilt_rollups() -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    statements: list[str] = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, stmt, *args: statements.append(stmt))
+    today = date.today()
+
+    with Session(engine) as db:
+        org = models.Org(name="Org", allowed_domains=[])
+        db.add(org)
+        db.flush()
+        teams = [models.Team(org_id=org.id, name=name) for name in ("Platform", "Growth")]
+        db.add_all(teams)
+        db.flush()
+        for idx in range(6):
+            db.add(models.User(team_id=teams[idx % 2].id, anon_token_hash=hash_token(f"user-{idx}")))
+        db.add(models.User(team_id=teams[0].id, anon_token_hash=hash_token("retired"), active=False))
+        db.commit()
+
+        records = [
+            CheckinRecord(f"user-{idx % 6}", 1 + idx % 5, 1 + (idx * 3) % 5, f"note {idx}", today - timedelta(days=idx % 3))
+            for idx in range(300)
+        ]
+        records += [
+            CheckinRecord("unknown", 3, 3),
+            CheckinRecord("retired", 3, 3),
+            CheckinRecord("user-0", 6, 3),
+            CheckinRecord("user-0", 3, 3, checkin_date=today + timedelta(days=1)),
+            CheckinRecord("user-0", 3, 3, checkin_date=archive.hot_cutoff(today) - timedelta(days=1)),
+        ]
+
+        statements.clear()
+        outcome = ingest_checkins(db, records)
+        db.commit()
+
+        assert len(statements) < 40
+        assert outcome.created == 300
+        assert [result.error for result in outcome.results[300:]] == [
+            "Invalid token",
+            "Invalid token",
+            "Scores must be 1-5",
+            "Check-in date is in the future",
+            "Check-in date is older than the hot window",
+        ]
+        stored = db.execute(select(models.Checkin.comment).order_by(models.Checkin.id)).scalars().all()
+        assert stored == [record.comment for record in records[:300]]
+        assert len(db.execute(select(models.RiskSnapshot)).all()) == 2
+
+        incremental = {team.id: rollup.daily_buckets(db, team.id, today - timedelta(days=5)) for team in teams}
+        rollup.rebuild(db)
+        assert incremental == {team.id: rollup.daily_buckets(db, team.id, today - timedelta(days=5)) for team in teams}
+
+
+def test_checkin_buffer_group_commits_and_drains() -> None:
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    commits: list[object] = []
+    event.listen(engine, "commit", lambda conn: commits.append(conn))
+    factory = sessionmaker(bind=engine)
+
+    with factory() as db:
+        org = models.Org(name="Org", allowed_domains=[])
+        db.add(org)
+        db.flush()
+        team = models.Team(org_id=org.id, name="Platform")
+        db.add(team)
+        db.flush()
+        users = [models.User(team_id=team.id, anon_token_hash=hash_token(f"user-{idx}")) for idx in range(5)]
+        db.add_all(users)
+        db.commit()
+        team_id, user_ids = team.id, [user.id for user in users]
+
+    commits.clear()
+    buffer = CheckinBuffer(factory, flush_interval=0.2, max_rows=1000)
+    rows = [
+        {
+            "user_id": user_ids[idx % 5],
+            "team_id": team_id,
+            "mood": 1 + idx % 5,
+            "stress": 1 + idx % 3,
+            "comment": "",
+            "checkin_date": date.today(),
+            "submitted_at": datetime.now(UTC).replace(tzinfo=None),
+        }
+        for idx in range(100)
+    ]
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        futures = list(pool.map(buffer.submit, rows))
+    for future in futures:
+        future.result(timeout=10)
+    buffer.drain(timeout=10)
+
+    stats = buffer.stats()
+    assert stats["flushed_rows"] == 100 and stats["queue_depth"] == 0
+    assert stats["flushed_batches"] == len(commits) < 10
+    with pytest.raises(BufferFull):
+        buffer.submit(rows[0])
+
+    with factory() as db:
+        incremental = rollup.daily_buckets(db, team_id, date.today())
+        assert incremental[0].count == 100 and incremental[0].participants == 5
+        rollup.rebuild(db)
+        assert rollup.daily_buckets(db, team_id, date.today()) == incremental
+        assert db.execute(select(models.RiskSnapshot.checkin_count)).scalar_one() == 100
+
+
+@pytest.fixture()
+def single_connection(tmp_path, monkeypatch):
+    """App wired to a one-connection pool shared by requests and the check-in buffer."""
+
+    monkeypatch.setenv("CHECKIN_BUFFER_ENABLED", "true")
+    get_settings.cache_clear()
+    engine = create_engine(f"sqlite:///{tmp_path / 'buffer.db'}", pool_size=1, max_overflow=0, pool_timeout=1)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        org = models.Org(name="Org", allowed_domains=[])
+        db.add(org)
+        db.flush()
+        team = models.Team(org_id=org.id, name="Platform")
+        db.add(team)
+        db.flush()
+        db.add(models.User(team_id=team.id, anon_token_hash=hash_token("buffered")))
+        db.commit()
+
+    def override_get_db():
+        with factory() as db:
+            yield db
+
+    main.app.dependency_overrides[get_db] = override_get_db
+    monkeypatch.setattr(tokens, "_resolver", None)
+    yield factory
+    main.app.dependency_overrides.pop(get_db, None)
+    get_settings.cache_clear()
+    engine.dispose()
+
+
+def test_buffered_checkin_releases_its_connection(single_connection, monkeypatch) -> None:
+    buffer = CheckinBuffer(single_connection, flush_interval=0.01)
+    monkeypatch.setattr(ingest_buffer, "_buffer", buffer)
+
+    response = TestClient(main.app).post("/checkin/buffered", data={"mood": 4, "stress": 2})
+    buffer.drain(timeout=10)
+
+    assert response.status_code == 200
+    with single_connection() as db:
+        assert db.query(models.Checkin).count() == 1
+
+
+def test_buffered_checkin_wait_is_bounded(single_connection, monkeypatch) -> None:
+    monkeypatch.setenv("CHECKIN_BUFFER_ACK_TIMEOUT", "0.05")
+    get_settings.cache_clear()
+    buffer = CheckinBuffer(single_connection, flush_interval=1.0)
+    monkeypatch.setattr(ingest_buffer, "_buffer", buffer)
+
+    response = TestClient(main.app).post("/checkin/buffered", data={"mood": 4, "stress": 2})
+    assert response.status_code == 503
+    assert response.json()["detail"] == ingest_buffer.UNCONFIRMED
+
+    # The row stays queued and still commits with its batch.
+    buffer.drain(timeout=10)
+    with single_connection() as db:
+        assert db.query(models.Checkin).count() == 1
+
+
+def test_submit_after_drain_writes_directly(single_connection, monkeypatch) -> None:
+    monkeypatch.setattr(ingest_buffer, "_buffer", CheckinBuffer(single_connection))
+    monkeypatch.setattr(ingest_buffer, "_drained", False)
+    ingest_buffer.drain(timeout=10)
+
+    # A late request must not start a buffer that nothing will drain.
+    assert ingest_buffer.submit({"team_id": 1}) is None
+    assert ingest_buffer._buffer is None
+
+    response = TestClient(main.app).post("/checkin/buffered", data={"mood": 4, "stress": 2})
+    assert response.status_code == 200
+    with single_connection() as db:
+        assert db.query(models.Checkin).count() == 1
+
+
+def test_failed_batch_is_retried_row_by_row() -> None:
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        org = models.Org(name="Org", allowed_domains=[])
+        db.add(org)
+        db.flush()
+        team = models.Team(org_id=org.id, name="Platform")
+        db.add(team)
+        db.flush()
+        users = [models.User(team_id=team.id, anon_token_hash=hash_token(f"user-{idx}")) for idx in range(3)]
+        db.add_all(users)
+        db.commit()
+        rows = [
+            {
+                "user_id": user.id,
+                "team_id": team.id,
+                "mood": 3,
+                "stress": 2,
+                "comment": "",
+                "checkin_date": date.today(),
+                "submitted_at": datetime.now(UTC).replace(tzinfo=None),
+            }
+            for user in users
+        ]
+    rows[1]["mood"] = None
+
+    buffer = CheckinBuffer(factory, flush_interval=5.0)
+    futures = [buffer.submit(row) for row in rows]
+    buffer.drain(timeout=10)
+
+    assert futures[0].result(timeout=1) is None and futures[2].result(timeout=1) is None
+    with pytest.raises(TypeError):
+        futures[1].result(timeout=1)
+    assert buffer.stats()["flushed_rows"] == 2 and buffer.stats()["failed_rows"] == 1
+    with factory() as db:
+        assert sorted(c.user_id for c in db.query(models.Checkin)) == [rows[0]["user_id"], rows[2]["user_id"]]
+        assert rollup.daily_buckets(db, rows[0]["team_id"], date.today())[0].count == 2
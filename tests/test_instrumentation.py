@@ -0,0 +1,31 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import create_engine, text
+
+from app.db import instrumentation
+
+
+def test_track_counts_statements_only_inside_the_block() -> None:
+    engine = create_engine("sqlite://")
+    instrumentation.instrument(engine)
+    instrumentation.instrument(engine)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        with instrumentation.track("req-1") as stats:
+            for _ in range(3):
+                conn.execute(text("SELECT 1"))
+            conn.execute(text('SELECT "x"'))
+        conn.execute(text("SELECT 1"))
+
+    assert stats.request_id == "req-1"
+    assert stats.count == 4
+    assert stats.total_ms >= stats.slowest_ms > 0
+    assert '"' not in stats.slowest_statement
+    assert instrumentation.current() is None
+    assert stats.server_timing().startswith('db;dur=') and 'desc="4 queries"' in stats.server_timing()
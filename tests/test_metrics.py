@@ -0,0 +1,55 @@
+import sys
+import threading
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+
+from app.core import metrics
+
+
+def test_counter_sums_per_thread_shards() -> None:
+    counter = metrics.Counter("demo_total", "Demo.", ("kind",))
+
+    def work() -> None:
+        for _ in range(1000):
+            counter.inc("a")
+        counter.inc("b", amount=2)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.values() == {("a",): 8000, ("b",): 16}
+    assert counter.render() == ['demo_total{kind="a"} 8000', 'demo_total{kind="b"} 16']
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    histogram = metrics.Histogram("demo_seconds", "Demo.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, '/a"b')
+
+    assert histogram.render() == [
+        'demo_seconds_bucket{route="/a\\"b",le="0.1"} 2',
+        'demo_seconds_bucket{route="/a\\"b",le="1"} 3',
+        'demo_seconds_bucket{route="/a\\"b",le="+Inf"} 4',
+        'demo_seconds_sum{route="/a\\"b"} 3.65',
+        'demo_seconds_count{route="/a\\"b"} 4',
+    ]
+
+
+def test_track_job_records_outcome() -> None:
+    with metrics.track_job("demo"):
+        pass
+    with pytest.raises(ValueError), metrics.track_job("demo"):
+        raise ValueError("boom")
+
+    runs = metrics.job_runs.values()
+    assert runs[("demo", "success")] >= 1
+    assert runs[("demo", "error")] >= 1
+    assert "# TYPE job_duration_seconds histogram" in metrics.render()
@@ -0,0 +1,102 @@
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{ROOT / 'test_app.db'}")
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.db import instrumentation
+from app.middleware import JSONLogFormatter, RequestIDLogFilter, RequestIDMiddleware
+
+logger = logging.getLogger("tests.middleware")
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+        self.addFilter(RequestIDLogFilter())
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+@pytest.fixture()
+def client():
+    engine = create_engine("sqlite://")
+    instrumentation.instrument(engine)
+    app = FastAPI()
+    app.add_middleware(RequestIDMiddleware)
+
+    @app.get("/ping")
+    def ping() -> dict[str, int]:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            value = conn.execute(text("SELECT 2")).scalar_one()
+        logger.info("pinged")
+        return {"value": value}
+
+    yield TestClient(app)
+    engine.dispose()
+
+
+@pytest.fixture()
+def records():
+    handler = RecordingHandler()
+    loggers = [logger, logging.getLogger("app.requests")]
+    previous = [(target, target.level) for target in loggers]
+    for target in loggers:
+        target.addHandler(handler)
+        target.setLevel(logging.INFO)
+    yield handler.records
+    for target, level in previous:
+        target.removeHandler(handler)
+        target.setLevel(level)
+
+
+def test_incoming_request_id_is_echoed_and_stamped_on_logs(client, records) -> None:
+    response = client.get("/ping", headers={"X-Request-ID": "req-abc"})
+
+    assert response.status_code == 200
+    assert response.headers["x-request-id"] == "req-abc"
+    timing = response.headers["server-timing"]
+    assert 'db;dur=' in timing and 'desc="2 queries"' in timing
+    assert "db-slowest;dur=" in timing and "app;dur=" in timing
+
+    assert [record.getMessage() for record in records if record.name == logger.name] == ["pinged"]
+    assert {record.request_id for record in records} == {"req-abc"}
+    # Logged once the request has finished, still under its id.
+    assert any(record.name == "app.requests" and "db_queries=2" in record.getMessage() for record in records)
+
+
+def test_request_id_is_generated_when_missing(client, records) -> None:
+    first = client.get("/ping").headers["x-request-id"]
+    second = client.get("/ping").headers["x-request-id"]
+
+    assert first and second and first != second
+    assert [record.request_id for record in records if record.name == logger.name] == [first, second]
+
+    # Outside a request the filter still stamps a placeholder.
+    outside = logging.makeLogRecord({})
+    assert RequestIDLogFilter().filter(outside) and outside.request_id == "-"
+
+
+def test_access_log_is_valid_json_for_awkward_paths(client, records) -> None:
+    client.get('/ping/"quoted"\\slash', headers={"X-Request-ID": 'req-"1"'})
+
+    access = next(record for record in records if record.name == "app.requests")
+    entry = json.loads(JSONLogFormatter().format(access))
+    assert entry["path"] == '/ping/"quoted"\\slash'
+    assert entry["request_id"] == 'req-"1"'
+    assert entry["status"] == 404 and entry["db_queries"] == 0
+    assert entry["message"].startswith('GET /ping/"quoted"\\slash 404')
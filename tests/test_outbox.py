@@ -0,0 +1,98 @@
+import asyncio
+import sys
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import get_settings
+from app.db import models
+from app.db.base import Base
+from app.services import outbox
+from app.services.email import magic_link_message
+
+
+@pytest.fixture()
+def session_factory(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", "sqlite://")
+    monkeypatch.setenv("SENDGRID_API_KEY", "SG.test")
+    monkeypatch.setenv("SLACK_API_BASE", "http://slack.test/api")
+    monkeypatch.setenv("SENDGRID_API_BASE", "http://sendgrid.test/v3")
+    get_settings.cache_clear()
+    engine = create_engine(f"sqlite:///{tmp_path / 'outbox.db'}")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    get_settings.cache_clear()
+
+
+def _fake_providers(request: httpx.Request) -> httpx.Response:
+    if request.url.host == "sendgrid.test":
+        to = request.read().decode()
+        return httpx.Response(503 if "flaky@" in to else 202)
+    if request.headers["authorization"] == "Bearer xoxb-bad":
+        return httpx.Response(200, json={"ok": False, "error": "channel_not_found"})
+    return httpx.Response(200, json={"ok": True})
+
+
+def test_worker_delivers_retries_and_fails(session_factory) -> None:
+    with session_factory() as db:
+        for idx, token in enumerate(("xoxb-good", "xoxb-bad")):
+            org = models.Org(name=f"Org {idx}", allowed_domains=[])
+            db.add(org)
+            db.flush()
+            integration = models.Integration(
+                org_id=org.id,
+                kind=models.IntegrationKind.slack,
+                status="connected",
+                config_json={"bot_token": token, "channel": "C1"},
+            )
+            db.add(integration)
+            db.flush()
+            outbox.enqueue_slack(db, integration.id, "hello")
+        outbox.enqueue_email(db, magic_link_message("ok@example.com", "https://app/link"))
+        outbox.enqueue_email(db, magic_link_message("flaky@example.com", "https://app/link"))
+        db.commit()
+
+    handled = asyncio.run(outbox.process_batch(session_factory, transport=httpx.MockTransport(_fake_providers)))
+    assert handled == 4
+    # Nothing else is due until the failed email's backoff expires.
+    assert asyncio.run(outbox.process_batch(session_factory)) == 0
+
+    with session_factory() as db:
+        rows = db.query(models.OutboxMessage).order_by(models.OutboxMessage.id).all()
+        assert [(row.kind, row.status, row.attempts) for row in rows] == [
+            ("slack", "sent", 1),
+            ("slack", "failed", 1),
+            ("email", "sent", 1),
+            ("email", "pending", 1),
+        ]
+        assert rows[1].last_error == "channel_not_found"
+        assert rows[3].last_error.startswith("HTTP 503")
+        assert rows[3].next_attempt_at > datetime.now(UTC).replace(tzinfo=None) + timedelta(seconds=10)
+        assert rows[0].sent_at is not None
+
+
+def test_expired_lease_is_reclaimed(session_factory) -> None:
+    with session_factory() as db:
+        outbox.enqueue_email(db, magic_link_message("ok@example.com", "https://app/link"))
+        db.commit()
+        first = outbox.claim(db, 10)
+        assert outbox.claim(db, 10) == []
+
+        past = datetime.now(UTC).replace(tzinfo=None) - timedelta(seconds=1)
+        db.query(models.OutboxMessage).update({"next_attempt_at": past})
+        db.commit()
+        second = outbox.claim(db, 10)
+
+    assert [message.attempts for message in first + second] == [1, 2]
+    with session_factory() as db:
+        # The first worker's late result must not overwrite the newer claim.
+        outbox.record(db, [(first[0], outbox.Outcome(ok=True))], max_attempts=8)
+        assert db.query(models.OutboxMessage).one().status == "sending"
@@ -0,0 +1,113 @@
+import json
+import os
+import sys
+from base64 import b64encode
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{ROOT / 'test_app.db'}")
+
+import itsdangerous
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app import main
+from app.core.config import get_settings
+from app.db import models
+from app.db.base import Base
+from app.dependencies import get_db
+
+
+def _signed_in(client: TestClient, **session: object) -> None:
+    """Set a session cookie the way SessionMiddleware would."""
+
+    signer = itsdangerous.TimestampSigner(str(main.settings.secret_key))
+    client.cookies.set("session", signer.sign(b64encode(json.dumps(session).encode())).decode())
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv("CRON_SECRET", "cron")
+    monkeypatch.setenv("APP_BASE_URL", "https://rmht.example.com")
+    get_settings.cache_clear()
+    engine = create_engine(f"sqlite:///{tmp_path / 'routes.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+
+    def override_get_db():
+        with factory() as db:
+            yield db
+
+    main.app.dependency_overrides[get_db] = override_get_db
+    with factory() as db:
+        org = models.Org(name="Acme", allowed_domains=["acme.com"])
+        db.add(org)
+        db.flush()
+        team = models.Team(org_id=org.id, name="Core")
+        db.add(team)
+        db.flush()
+        db.add(models.User(team_id=team.id, anon_token_hash="hash", email="ada@acme.com"))
+        db.add(
+            models.Integration(
+                org_id=org.id,
+                kind=models.IntegrationKind.slack,
+                status="connected",
+                config_json={"bot_token": "xoxb-1", "channel": "C1"},
+            )
+        )
+        db.commit()
+        org_id = org.id
+    yield TestClient(main.app), factory, org_id
+    main.app.dependency_overrides.pop(get_db, None)
+    get_settings.cache_clear()
+
+
+def _outbox(factory) -> list[models.OutboxMessage]:
+    with factory() as db:
+        return db.execute(select(models.OutboxMessage)).scalars().all()
+
+
+def test_slack_test_message_is_queued(client) -> None:
+    http, factory, org_id = client
+    _signed_in(http, user_id=1, org_id=org_id, role="org_admin", csrf_token="csrf")
+
+    response = http.post("/integrations/slack/test", headers={"X-CSRF-Token": "csrf"})
+
+    assert response.status_code == 202
+    assert response.json() == {"detail": "Test message queued"}
+    [message] = _outbox(factory)
+    assert (message.kind, message.status, message.payload["text"]) == ("slack", "pending", "Test message from RMHT")
+
+
+def test_weekly_checkin_queues_one_message_per_integration(client) -> None:
+    http, factory, _ = client
+
+    response = http.post("/jobs/weekly-checkin", params={"secret": "cron"})
+
+    assert response.status_code == 200
+    assert response.json() == {"orgs_queued": 1, "total_integrations": 1, "skipped": 0}
+    [message] = _outbox(factory)
+    assert "https://rmht.example.com/checkin/<token>" in message.payload["text"]
+
+
+def test_magic_link_nonce_and_email_are_committed_together(client) -> None:
+    http, factory, _ = client
+
+    response = http.post("/auth/request-link", json={"email": "Ada@acme.com"})
+
+    assert response.status_code == 202
+    [message] = _outbox(factory)
+    with factory() as db:
+        nonce = db.execute(select(models.EmailLoginNonce)).scalar_one()
+    assert message.kind == "email"
+    assert message.payload["personalizations"][0]["to"] == [{"email": "ada@acme.com"}]
+    assert f"token={nonce.token}" in json.dumps(message.payload)
+
+    # An unknown user gets neither a nonce nor an email.
+    assert http.post("/auth/request-link", json={"email": "bob@acme.com"}).status_code == 404
+    assert len(_outbox(factory)) == 1
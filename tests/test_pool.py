@@ -0,0 +1,71 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import SingletonThreadPool
+
+from app.core import metrics
+from app.core.config import Settings
+from app.db.pool import TimedAsyncAdaptedQueuePool, TimedQueuePool, pool_options
+
+
+def _settings() -> Settings:
+    return Settings(DATABASE_URL="sqlite://", DB_POOL_SIZE=3, DB_MAX_OVERFLOW=1, DB_POOL_TIMEOUT=2, DB_POOL_RECYCLE=60)
+
+
+def test_pool_options_size_only_queue_pools() -> None:
+    settings = _settings()
+    assert pool_options("sqlite://", settings) == {"pool_pre_ping": True}
+
+    options = pool_options("postgresql://u:p@db/app", settings)
+    assert options["poolclass"] is TimedQueuePool
+    assert (options["pool_size"], options["max_overflow"], options["pool_timeout"], options["pool_recycle"]) == (
+        3,
+        1,
+        2,
+        60,
+    )
+    assert pool_options("postgresql+asyncpg://u:p@db/app", settings)["poolclass"] is TimedAsyncAdaptedQueuePool
+
+
+def _checkouts(name: str = "sync") -> int:
+    state = metrics.db_pool_checkout_wait.values().get((name,))
+    return int(sum(state[:-1])) if state else 0
+
+
+def test_checkout_wait_is_recorded(tmp_path) -> None:
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+    engine = create_engine(url, **pool_options(url, _settings()))
+    before = _checkouts()
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    assert engine.pool.size() == 3
+    assert _checkouts() == before + 1
+
+    memory = create_engine("sqlite://", **pool_options("sqlite://", _settings()))
+    assert isinstance(memory.pool, SingletonThreadPool)
+
+
+def test_checkout_waits_are_labelled_per_engine(tmp_path) -> None:
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+    primary = create_engine(url, **pool_options(url, _settings(), "sync"))
+    replica = create_engine(url, **pool_options(url, _settings(), "replica"))
+    assert issubclass(replica.pool.__class__, TimedQueuePool)
+    before = _checkouts("sync"), _checkouts("replica")
+
+    with replica.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert (_checkouts("sync"), _checkouts("replica")) == (before[0], before[1] + 1)
+
+    # dispose() recreates the pool; the label must survive it.
+    replica.dispose()
+    with replica.connect() as conn, primary.connect() as other:
+        conn.execute(text("SELECT 1"))
+        other.execute(text("SELECT 1"))
+    assert (_checkouts("sync"), _checkouts("replica")) == (before[0] + 1, before[1] + 2)
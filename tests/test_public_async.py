@@ -0,0 +1,86 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{ROOT / 'test_app.db'}")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from app import dependencies, main
+from app.db import models
+from app.db.base import Base
+from app.routes import public_async
+from app.services import analytics, tokens
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    path = tmp_path / "async.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        org = models.Org(name="Acme", allowed_domains=[])
+        db.add(org)
+        db.flush()
+        team = models.Team(org_id=org.id, name="Platform")
+        db.add(team)
+        db.flush()
+        db.add_all(models.User(team_id=team.id, anon_token_hash=tokens.hash_token(f"token-{idx}")) for idx in range(5))
+        db.commit()
+        team_id = team.id
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    factory = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+    async def override():
+        async with factory() as db:
+            yield db
+
+    # Mount the async routes ahead of the sync ones, as ASYNC_ROUTES does at import time.
+    routes = list(main.app.router.routes)
+    monkeypatch.setattr(main.app.router, "routes", routes)
+    main.app.include_router(public_async.router)
+    added = len(public_async.router.routes)
+    routes[:] = routes[-added:] + routes[:-added]
+    monkeypatch.setitem(main.app.dependency_overrides, dependencies.get_async_db, override)
+    monkeypatch.setitem(main.app.dependency_overrides, dependencies.get_async_read_db, override)
+    monkeypatch.setattr(tokens, "_resolver", None)
+    analytics.set_cache_backend(analytics.LRUTTLBackend())
+    yield TestClient(main.app), engine, team_id
+    asyncio.run(async_engine.dispose())
+    engine.dispose()
+
+
+def test_async_checkin_and_dashboard(client) -> None:
+    http, engine, team_id = client
+
+    page = http.get("/checkin/token-0")
+    assert page.status_code == 200
+    assert "Platform" in page.text
+    assert http.get("/checkin/unknown-token").status_code == 404
+
+    for idx in range(5):
+        submitted = http.post(f"/checkin/token-{idx}", data={"mood": 4, "stress": 2, "comment": "fine"})
+        assert submitted.status_code == 200
+        if idx == 0:
+            # Below the anonymity threshold the dashboard stays closed.
+            assert http.get(f"/dashboard/{team_id}").status_code == 403
+    with Session(engine) as db:
+        checkins = db.query(models.Checkin).all()
+        assert {(c.team_id, c.mood, c.stress) for c in checkins} == {(team_id, 4, 2)}
+        assert len(checkins) == 5
+        assert db.query(models.TeamDailyStat).count() == 1
+
+    dashboard = http.get(f"/dashboard/{team_id}")
+    assert dashboard.status_code == 200
+    assert "Platform" in dashboard.text
+    assert http.get(f"/dashboard/{team_id + 1}").status_code == 404
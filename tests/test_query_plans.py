@@ -0,0 +1,163 @@
+import os
+import random
+import re
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{ROOT / 'test_app.db'}")
+
+import pytest
+from sqlalchemy import create_engine, delete, event, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.base import Base
+from app.services import analytics, archive, retention, risk, risk_backfill, rollup
+from app.services import dashboard as dashboard_service
+from app.services.tokens import TokenResolver, hash_token
+
+TEAMS = 40
+USERS_PER_TEAM = 25
+DAYS = 90
+
+# Tables that grow with usage; a full scan of any of them is a regression.
+LARGE_TABLES = ("checkins", "team_daily_stats", "risk_snapshots", "users", "audit_logs", "email_login_nonces", "checkins_archive")
+FULL_SCAN = re.compile(rf"^SCAN ({'|'.join(LARGE_TABLES)})\b(?!.*USING (COVERING )?INDEX)")
+
+
+@pytest.fixture(scope="module")
+def seeded():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    rng = random.Random(13)
+    today = date.today()
+
+    with Session(engine) as db:
+        org = models.Org(name="Org", allowed_domains=["example.com"])
+        db.add(org)
+        db.flush()
+        db.execute(insert(models.Team), [{"org_id": org.id, "name": f"Team {idx}"} for idx in range(TEAMS)])
+        team_ids = db.execute(select(models.Team.id)).scalars().all()
+        db.execute(
+            insert(models.User),
+            [
+                {
+                    "team_id": team_id,
+                    "anon_token_hash": hash_token(f"token-{team_id}-{seat}"),
+                    "email": f"user{team_id}-{seat}@example.com",
+                }
+                for team_id in team_ids
+                for seat in range(USERS_PER_TEAM)
+            ],
+        )
+        users = db.execute(select(models.User.id, models.User.team_id)).all()
+        db.execute(
+            insert(models.Checkin),
+            [
+                {
+                    "user_id": user_id,
+                    "team_id": team_id,
+                    "checkin_date": today - timedelta(days=offset),
+                    "submitted_at": datetime.combine(today - timedelta(days=offset), datetime.min.time()),
+                    "mood": rng.randint(1, 5),
+                    "stress": rng.randint(1, 5),
+                    "comment": "",
+                }
+                for user_id, team_id in users
+                for offset in range(DAYS)
+                if rng.random() < 0.4
+            ],
+        )
+        rollup.rebuild(db)
+        risk_backfill.backfill_teams(db, team_ids, today - timedelta(days=DAYS), today)
+        db.commit()
+        db.connection().exec_driver_sql("ANALYZE")
+        db.commit()
+    return engine, team_ids
+
+
+def _plans(engine, run) -> list[tuple[str, list[str]]]:
+    """Run ``run(db)`` and return the EXPLAIN QUERY PLAN of every statement it issued."""
+
+    captured: list[tuple[str, object]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and not statement.startswith(("SAVEPOINT", "RELEASE", "ROLLBACK", "EXPLAIN")):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        with Session(engine) as db:
+            run(db)
+            db.rollback()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    plans = []
+    with engine.connect() as conn:
+        for statement, parameters in captured:
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            plans.append((statement, [row[-1] for row in rows]))
+    return plans
+
+
+def _assert_indexed(plans: list[tuple[str, list[str]]]) -> None:
+    assert plans
+    for statement, plan in plans:
+        scans = [step for step in plan if FULL_SCAN.search(step)]
+        assert not scans, f"Full scan {scans} for:\n{statement}\nplan: {plan}"
+
+
+def test_dashboard_queries_use_indexes(seeded) -> None:
+    engine, team_ids = seeded
+    analytics.set_cache_backend(analytics.LRUTTLBackend())
+    plans = _plans(engine, lambda db: dashboard_service.load_dashboard(db, team_ids[3]))
+    _assert_indexed(plans)
+    steps = [step for _, plan in plans for step in plan]
+    assert any("ix_checkins_team_submitted" in step for step in steps)
+    assert any("ix_checkins_user_date" in step for step in steps)
+
+
+def test_analytics_and_risk_queries_use_indexes(seeded) -> None:
+    engine, team_ids = seeded
+    analytics.set_cache_backend(analytics.LRUTTLBackend())
+
+    def run(db: Session) -> None:
+        analytics.team_metrics_batch(db, team_ids[:10])
+        risk.upsert_team_risk(db, team_ids[0])
+        rollup.daily_buckets(db, team_ids[1], date.today() - timedelta(days=30))
+
+    _assert_indexed(_plans(engine, run))
+
+
+def test_write_path_queries_use_indexes(seeded) -> None:
+    engine, team_ids = seeded
+    resolver = TokenResolver(refresh_interval=3600, rebuild_interval=3600)
+    with Session(engine) as db:
+        resolver.rebuild(db)
+
+    def run(db: Session) -> None:
+        user = resolver.resolve(db, hash_token(f"token-{team_ids[2]}-4"))
+        checkin = models.Checkin(user_id=user.user_id, team_id=user.team_id, mood=3, stress=3)
+        db.add(checkin)
+        rollup.record_checkin(db, checkin)
+        cutoff = date.today() - timedelta(days=60)
+        db.execute(
+            delete(models.Checkin).where(models.Checkin.team_id == user.team_id, models.Checkin.checkin_date < cutoff)
+        )
+        rollup.purge_before(db, user.team_id, cutoff)
+        db.execute(select(models.User).where(func.lower(models.User.email) == "user1-1@example.com"))
+        retention.purge_expired(db, dry_run=True)
+        for _, query in retention.candidates(db).values():
+            db.execute(query.limit(500))
+        # Nothing is that old, so only the chunk lookup runs (and nothing is committed).
+        archive.archive_checkins(db, cutoff=date.today() - timedelta(days=3650))
+        archive.archived_participants(db, [user.user_id], [cutoff - timedelta(days=1)])
+        rollup.rebuild(db, team_ids[:2])
+
+    _assert_indexed(_plans(engine, run))
@@ -0,0 +1,75 @@
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{ROOT / 'test_app.db'}")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+
+from app import dependencies
+from app.db import models
+from app.db.base import Base
+
+
+@pytest.fixture()
+def databases(tmp_path, monkeypatch):
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine in (primary, replica):
+        Base.metadata.create_all(engine)
+    monkeypatch.setattr(dependencies, "SessionLocal", sessionmaker(bind=primary))
+    monkeypatch.setattr(dependencies, "ReadSessionLocal", sessionmaker(bind=replica))
+    return primary, replica
+
+
+def _request(session: dict | None) -> Request:
+    scope = {"type": "http", "headers": []}
+    if session is not None:
+        scope["session"] = session
+    return Request(scope)
+
+
+def _bound_engine(dependency, request: Request):
+    generator = dependency(request)
+    db = next(generator)
+    try:
+        return db.get_bind()
+    finally:
+        generator.close()
+
+
+def test_reads_use_replica_until_signed_in_user_writes(databases) -> None:
+    primary, replica = databases
+    session: dict = {"user_id": 1}
+    request = _request(session)
+
+    assert _bound_engine(dependencies.get_read_db, request) is replica
+
+    generator = dependencies.get_db(request)
+    db = next(generator)
+    db.add(models.Org(name="Org", allowed_domains=[]))
+    db.commit()
+    generator.close()
+
+    assert dependencies.PRIMARY_PIN_KEY in session
+    assert _bound_engine(dependencies.get_read_db, request) is primary
+
+
+def test_anonymous_writes_do_not_pin(databases) -> None:
+    _, replica = databases
+    request = _request(None)
+
+    generator = dependencies.get_db(request)
+    db = next(generator)
+    db.add(models.Org(name="Org", allowed_domains=[]))
+    db.commit()
+    generator.close()
+
+    assert _bound_engine(dependencies.get_read_db, request) is replica
@@ -0,0 +1,108 @@
+import os
+import sys
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{ROOT / 'test_app.db'}")
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.base import Base
+from app.services import retention, rollup
+
+DAYS = 120
+
+
+def _seed(db: Session) -> dict[int, int]:
+    """Two orgs with 30 and 90 day retention; returns org id -> team id."""
+
+    today = date.today()
+    now = datetime.now(UTC).replace(tzinfo=None)
+    teams = {}
+    for name, days in (("Short", 30), ("Long", 90)):
+        org = models.Org(name=name, allowed_domains=[], retention_days=days)
+        db.add(org)
+        db.flush()
+        team = models.Team(org_id=org.id, name=f"{name} team")
+        db.add(team)
+        db.flush()
+        user = models.User(team_id=team.id, anon_token_hash=f"hash-{name}", email=f"{name}@example.com")
+        db.add(user)
+        db.flush()
+        teams[org.id] = team.id
+        db.execute(
+            insert(models.Checkin),
+            [
+                {
+                    "user_id": user.id,
+                    "team_id": team.id,
+                    "checkin_date": today - timedelta(days=offset),
+                    "submitted_at": now - timedelta(days=offset),
+                    "mood": 3,
+                    "stress": 3,
+                    "comment": "",
+                }
+                for offset in range(DAYS)
+            ],
+        )
+        db.add_all(
+            [
+                models.EmailLoginNonce(
+                    org_id=org.id, email="a@example.com", token=f"{name}-old", expires_at=now - timedelta(minutes=1)
+                ),
+                models.EmailLoginNonce(
+                    org_id=org.id, email="a@example.com", token=f"{name}-new", expires_at=now + timedelta(minutes=5)
+                ),
+                models.AuditLog(org_id=org.id, actor="1", action="old", ts=now - timedelta(days=400)),
+                models.AuditLog(org_id=org.id, actor="1", action="new", ts=now),
+            ]
+        )
+    rollup.rebuild(db)
+    db.commit()
+    return teams
+
+
+def test_dry_run_matches_chunked_purge() -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+
+    with Session(engine) as db:
+        teams = _seed(db)
+        short_org, long_org = teams
+
+        preview = retention.purge_expired(db, dry_run=True)
+        assert db.scalar(select(func.count()).select_from(models.Checkin)) == 2 * DAYS
+
+        report = retention.purge_expired(db, chunk_size=7)
+
+    # Rows exactly retention_days old are kept.
+    expected_checkins = {short_org: DAYS - 31, long_org: DAYS - 91}
+    for result in (preview, report):
+        summary = result.as_dict()
+        assert summary["checkins_removed"] == sum(expected_checkins.values())
+        assert summary["tables"]["checkins"]["by_org"] == expected_checkins
+        assert summary["tables"]["team_daily_stats"]["by_org"] == expected_checkins
+        assert summary["tables"]["email_login_nonces"]["by_org"] == {short_org: 1, long_org: 1}
+        assert summary["tables"]["audit_logs"]["by_org"] == {short_org: 1, long_org: 1}
+    assert preview.team_ids == set()
+    assert report.team_ids == set(teams.values())
+
+    with Session(engine) as db:
+        oldest = dict(
+            db.execute(
+                select(models.Checkin.team_id, func.min(models.Checkin.checkin_date)).group_by(models.Checkin.team_id)
+            ).all()
+        )
+        assert oldest == {
+            teams[short_org]: date.today() - timedelta(days=30),
+            teams[long_org]: date.today() - timedelta(days=90),
+        }
+        assert db.scalar(select(func.count()).select_from(models.EmailLoginNonce)) == 2
+        assert db.scalar(select(func.count()).select_from(models.AuditLog)) == 2
+        assert retention.purge_expired(db, dry_run=True).total == 0
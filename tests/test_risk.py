@@ -0,0 +1,162 @@
+import random
+import sys
+from collections import defaultdict
+from datetime import date, timedelta
+from math import sqrt
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.base import Base
+from app.services import risk, risk_backfill, risk_batch, rollup
+
+
+def _reference_snapshot(rows: list[tuple[date, int, int]]) -> tuple[models.RiskLevel, float, float, int]:
+    """The original raw-row scoring, kept verbatim as an oracle."""
+    daily: dict[date, list[tuple[int, int]]] = defaultdict(list)
+    for checkin_date, mood, stress in rows:
+        daily[checkin_date].append((mood, stress))
+    if not rows:
+        return models.RiskLevel.low, 0, 0, 0
+
+    stress_averages: list[float] = []
+    mood_averages: list[float] = []
+    counts: list[int] = []
+    for day in sorted(daily):
+        entries = daily[day]
+        stress_averages.append(sum(s for _, s in entries) / len(entries))
+        mood_averages.append(sum(m for m, _ in entries) / len(entries))
+        counts.append(len(entries))
+
+    stress_ewma = risk.ewma(stress_averages)
+    avg_mood = sum(mood_averages[-7:]) / min(len(mood_averages), 7)
+    avg_stress = sum(stress_averages[-7:]) / min(len(stress_averages), 7)
+    recent_count = sum(counts[-7:])
+    prior_count = sum(counts[-14:-7]) if len(counts) >= 14 else sum(counts[:-7])
+    participation_drop = recent_count < 5 or (prior_count and recent_count < prior_count * 0.6)
+    recent_avg = avg_stress
+    prev_avg = sum(stress_averages[-14:-7]) / 7 if len(stress_averages) >= 14 else recent_avg
+    delta = recent_avg - prev_avg
+    mean_stress = sum(stress_averages) / len(stress_averages)
+    variance = sum((s - mean_stress) ** 2 for s in stress_averages) / max(len(stress_averages), 1)
+    stdev = sqrt(variance)
+    z_score = (stress_ewma - mean_stress) / stdev if stdev else 0
+
+    signals = int(stress_ewma > mean_stress + 0.5) + int(delta > 0.3) + int(bool(participation_drop))
+    if z_score > 1.7 or signals >= 3:
+        level = models.RiskLevel.high
+    elif signals >= 2:
+        level = models.RiskLevel.moderate
+    else:
+        level = models.RiskLevel.low
+    return level, avg_mood, avg_stress, sum(counts[-7:])
+
+
+def test_incremental_snapshot_matches_full_rescan() -> None:
+    """Rollup-driven scoring must agree exactly with the raw 30-day rescan."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    rng = random.Random(7)
+    today = date.today()
+
+    with Session(engine) as db:
+        org = models.Org(name="Org", allowed_domains=[])
+        db.add(org)
+        db.flush()
+        for team_idx in range(12):
+            team = models.Team(org_id=org.id, name=f"Team {team_idx}")
+            db.add(team)
+            db.flush()
+            user = models.User(team_id=team.id, anon_token_hash=f"{team_idx:064d}")
+            db.add(user)
+            db.flush()
+
+            rows: list[tuple[date, int, int]] = []
+            for _ in range(rng.randint(0, 120)):
+                day = today - timedelta(days=rng.randint(0, 45))
+                mood, stress = rng.randint(1, 5), rng.randint(1, 5)
+                checkin = models.Checkin(
+                    user_id=user.id, team_id=team.id, checkin_date=day, mood=mood, stress=stress
+                )
+                db.add(checkin)
+                rollup.record_checkin(db, checkin)
+                if day >= today - timedelta(days=risk.WINDOW_DAYS):
+                    rows.append((day, mood, stress))
+
+                snapshot = risk.latest_risk_snapshot(db, team)
+                expected = _reference_snapshot(rows)
+                assert (snapshot.risk_level, snapshot.avg_mood, snapshot.avg_stress, snapshot.checkin_count) == expected
+
+        db.flush()
+        before = {(s.team_id, s.day, s.checkin_count, s.sum_mood, s.sum_stress, s.participants) for s in db.query(models.TeamDailyStat)}
+        rollup.rebuild(db)
+        after = {(s.team_id, s.day, s.checkin_count, s.sum_mood, s.sum_stress, s.participants) for s in db.query(models.TeamDailyStat)}
+        assert before == after
+
+
+def test_vectorized_recompute_matches_per_team_scoring() -> None:
+    """The NumPy batch path must score every team exactly like compute_risk."""
+    rng = random.Random(11)
+    today = date.today()
+    buckets: dict[int, list[rollup.DailyBucket]] = {}
+    for team_id in range(1, 200):
+        days = sorted(rng.sample(range(risk.WINDOW_DAYS + 1), rng.randint(0, risk.WINDOW_DAYS + 1)))
+        series = []
+        for offset in reversed(days):
+            count = rng.randint(1, 9)
+            series.append(
+                rollup.DailyBucket(
+                    today - timedelta(days=offset),
+                    count,
+                    sum(rng.randint(1, 5) for _ in range(count)),
+                    sum(rng.randint(1, 5) for _ in range(count)),
+                )
+            )
+        buckets[team_id] = series
+
+    batch = {snapshot.team_id: snapshot for snapshot in risk_batch.score_teams(today, buckets)}
+    for team_id, series in buckets.items():
+        expected = risk.compute_risk(team_id, today, series)
+        got = batch[team_id]
+        assert (got.risk_level, got.avg_mood, got.avg_stress, got.checkin_count) == (
+            expected.risk_level,
+            expected.avg_mood,
+            expected.avg_stress,
+            expected.checkin_count,
+        )
+
+
+def test_sliding_backfill_matches_point_in_time_scoring() -> None:
+    """Each backfilled day must equal scoring that day's 30-day window directly."""
+    rng = random.Random(3)
+    end = date.today()
+    start = end - timedelta(days=60)
+    series = [
+        rollup.DailyBucket(start - timedelta(days=offset), count, count * rng.randint(1, 5), count * rng.randint(1, 5))
+        for offset in range(-60, 40)
+        if rng.random() < 0.6
+        for count in [rng.randint(1, 6)]
+    ]
+    series.sort(key=lambda bucket: bucket.day)
+
+    snapshots = risk_backfill.score_range(1, series, start, end)
+    assert len(snapshots) == 61
+    for snapshot in snapshots:
+        window = [
+            bucket
+            for bucket in series
+            if snapshot.day - timedelta(days=risk.WINDOW_DAYS) <= bucket.day <= snapshot.day
+        ]
+        expected = risk.compute_risk(1, snapshot.day, window)
+        assert (snapshot.risk_level, snapshot.avg_mood, snapshot.avg_stress, snapshot.checkin_count) == (
+            expected.risk_level,
+            expected.avg_mood,
+            expected.avg_stress,
+            expected.checkin_count,
+        )
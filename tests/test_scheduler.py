@@ -0,0 +1,77 @@
+import sys
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import get_settings
+from app.db import models
+from app.db.base import Base
+from app.services import jobs, scheduler
+
+SCHEDULED = sorted(name for name, job in jobs.JOBS.items() if job.every is not None)
+DAILY = sorted(name for name, job in jobs.JOBS.items() if job.every == jobs.DAY)
+
+
+@pytest.fixture()
+def session_factory(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", "sqlite://")
+    monkeypatch.setenv("APP_BASE_URL", "https://rmht.example.com")
+    monkeypatch.delenv("STRIPE_SECRET_KEY", raising=False)
+    get_settings.cache_clear()
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    get_settings.cache_clear()
+
+
+def test_slots_follow_the_schedule() -> None:
+    saturday = datetime(2026, 10, 17, 12, 0)
+    assert jobs.JOBS["weekly_checkin"].slot(saturday) == datetime(2026, 10, 12, 9, 0)
+    assert jobs.JOBS["daily_retention"].slot(saturday) == datetime(2026, 10, 17, 3, 0)
+    assert jobs.JOBS["daily_retention"].slot(datetime(2026, 10, 17, 2, 59)) == datetime(2026, 10, 16, 3, 0)
+    assert jobs.JOBS["rebuild_rollups"].slot(saturday) is None
+
+
+def test_each_slot_runs_once_across_schedulers(session_factory) -> None:
+    first = scheduler.Scheduler(session_factory, holder="web-1")
+    second = scheduler.Scheduler(session_factory, holder="web-2")
+    now = datetime(2026, 10, 17, 12, 0)
+
+    # The first tick only registers each job at its current slot: no Monday prompt on a Saturday.
+    assert first.tick(now) == []
+    assert second.tick(now) == []
+    assert sorted(first.tick(now + timedelta(days=1))) == [name for name in DAILY if name != "sync_seats"]
+    assert second.tick(now + timedelta(days=1, minutes=1)) == []
+    # A slot missed while nothing was running is caught up once.
+    assert sorted(second.tick(now + timedelta(days=3))) == [name for name in SCHEDULED if name != "sync_seats"]
+    assert first.tick(now + timedelta(days=3, minutes=1)) == []
+
+    with session_factory() as db:
+        runs = db.execute(select(models.JobRun).order_by(models.JobRun.id)).scalars().all()
+        assert len(runs) == len(DAILY) + len(SCHEDULED)
+        assert all(run.finished_at is not None and run.duration_seconds is not None for run in runs)
+        assert {run.holder for run in runs} == {"web-1", "web-2"}
+        by_job = {run.job: run for run in runs if run.holder == "web-2"}
+        assert by_job["weekly_checkin"].result == {"orgs_queued": 0, "total_integrations": 0, "skipped": 0}
+        assert by_job["weekly_checkin"].slot_at == datetime(2026, 10, 19, 9, 0)
+        assert by_job["sync_seats"].status == "error"
+        assert "STRIPE_SECRET_KEY" in by_job["sync_seats"].error
+        assert {run.status for run in runs if run.job != "sync_seats"} == {"success"}
+
+
+def test_running_job_blocks_other_holders(session_factory) -> None:
+    with session_factory() as db:
+        assert scheduler.acquire_lease(db, "rebuild_rollups", "web-1", datetime.now(UTC).replace(tzinfo=None))
+        assert scheduler.run_exclusive(db, "rebuild_rollups", "http", holder="web-2") is None
+
+        scheduler.release_lease(db, "rebuild_rollups", "web-1")
+        assert scheduler.run_exclusive(db, "rebuild_rollups", "http", holder="web-2") == {"rollup_rows": 0}
+        run = db.execute(select(models.JobRun)).scalar_one()
+        assert (run.job, run.trigger, run.status) == ("rebuild_rollups", "http", "success")
@@ -0,0 +1,78 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import httpx
+
+from app.services.slack import AsyncSlackClient, SlackMessage
+
+
+def _messages(count: int) -> list[SlackMessage]:
+    return [SlackMessage(key=idx, token=f"xoxb-{idx}", channel="C1", text="hi") for idx in range(count)]
+
+
+def _run(handler, messages, **options):
+    async def main():
+        options.setdefault("backoff", 0.01)
+        async with AsyncSlackClient(transport=httpx.MockTransport(handler), **options) as client:
+            return await client.post_messages(messages)
+
+    return asyncio.run(main())
+
+
+def test_fan_out_runs_concurrently_within_the_limit() -> None:
+    in_flight = peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.1)
+        in_flight -= 1
+        return httpx.Response(200, json={"ok": True})
+
+    started = time.perf_counter()
+    results = _run(handler, _messages(40), concurrency=20)
+    elapsed = time.perf_counter() - started
+
+    assert [result.key for result in results] == list(range(40))
+    assert all(result.ok for result in results)
+    assert peak == 20
+    assert elapsed < 1.0
+
+
+def test_rate_limits_and_server_errors_are_retried() -> None:
+    calls: dict[str, int] = {}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        token = request.headers["authorization"]
+        calls[token] = calls.get(token, 0) + 1
+        if token == "Bearer xoxb-0" and calls[token] == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        if token == "Bearer xoxb-1" and calls[token] < 3:
+            return httpx.Response(503)
+        if token == "Bearer xoxb-2":
+            return httpx.Response(200, json={"ok": False, "error": "channel_not_found"})
+        return httpx.Response(200, json={"ok": True})
+
+    results = _run(handler, _messages(3))
+
+    assert [(result.ok, result.attempts) for result in results] == [(True, 2), (True, 3), (False, 1)]
+    assert results[2].error == "channel_not_found"
+    assert results[0].retryable and not results[2].retryable
+
+
+def test_gives_up_after_max_attempts() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("refused", request=request)
+
+    [result] = _run(handler, _messages(1), max_attempts=3)
+
+    assert not result.ok
+    assert result.attempts == 3
+    assert result.error.startswith("ConnectError")
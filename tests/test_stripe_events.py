@@ -0,0 +1,150 @@
+import hashlib
+import hmac
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{ROOT / 'test_app.db'}")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app import main
+from app.core.config import get_settings
+from app.db import models
+from app.db.base import Base
+from app.dependencies import get_db
+from app.services import stripe_events
+
+T0 = 1_760_000_000
+
+
+@pytest.fixture()
+def session_factory(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", "sqlite://")
+    monkeypatch.setenv("STRIPE_PRICE_PRO", "price_pro")
+    monkeypatch.delenv("STRIPE_SECRET_KEY", raising=False)
+    get_settings.cache_clear()
+    engine = create_engine(f"sqlite:///{tmp_path / 'stripe.db'}")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    get_settings.cache_clear()
+
+
+def _event(event_id: str, org_id: object, created: int, status: str, kind: str = "customer.subscription.updated"):
+    return {
+        "id": event_id,
+        "type": kind,
+        "created": created,
+        "data": {
+            "object": {
+                "id": "sub_1",
+                "object": "subscription",
+                "customer": "cus_1",
+                "status": status,
+                "metadata": {"org_id": str(org_id)} if org_id is not None else {},
+                "items": {"data": [{"price": {"id": "price_pro"}}]},
+            }
+        },
+    }
+
+
+def test_events_are_deduplicated_ordered_and_collapsed(session_factory) -> None:
+    with session_factory() as db:
+        org = models.Org(name="Acme", allowed_domains=[])
+        db.add(org)
+        db.commit()
+        org_id = org.id
+
+        # Delivered out of order, with a redelivery.
+        assert stripe_events.record_event(db, _event("evt_3", org_id, T0 + 3, "canceled"))
+        assert stripe_events.record_event(db, _event("evt_1", org_id, T0 + 1, "trialing"))
+        assert stripe_events.record_event(db, _event("evt_2", org_id, T0 + 2, "active"))
+        assert not stripe_events.record_event(db, _event("evt_2", org_id, T0 + 2, "active"))
+        assert stripe_events.record_event(db, _event("evt_orphan", None, T0, "active"))
+        assert stripe_events.record_event(db, _event("evt_gone", 9999, T0, "active"))
+
+    report = stripe_events.process_batch(session_factory)
+    assert report.as_dict() == {"processed": 1, "superseded": 2, "ignored": 1, "retried": 0}
+
+    with session_factory() as db:
+        subscription = db.execute(select(models.Subscription)).scalar_one()
+        assert (subscription.status, subscription.plan, subscription.stripe_subscription) == (
+            models.SubscriptionStatus.canceled,
+            models.Plan.pro,
+            "sub_1",
+        )
+        statuses = dict(db.execute(select(models.StripeEvent.id, models.StripeEvent.status)).all())
+        assert statuses == {
+            "evt_1": "superseded",
+            "evt_2": "superseded",
+            "evt_3": "processed",
+            "evt_orphan": "ignored",
+            "evt_gone": "ignored",
+        }
+
+        # A straggler older than what was already applied must not roll the state back.
+        assert stripe_events.record_event(db, _event("evt_late", org_id, T0 + 2, "active"))
+    assert stripe_events.process_batch(session_factory).as_dict() == {
+        "processed": 0,
+        "superseded": 1,
+        "ignored": 0,
+        "retried": 0,
+    }
+    with session_factory() as db:
+        assert db.execute(select(models.Subscription.status)).scalar_one() == models.SubscriptionStatus.canceled
+
+
+def test_failed_events_are_retried_later(session_factory) -> None:
+    with session_factory() as db:
+        org = models.Org(name="Acme", allowed_domains=[])
+        db.add(org)
+        db.commit()
+        checkout = _event("evt_checkout", org.id, T0, "complete", kind="checkout.session.completed")
+        checkout["data"]["object"].update(object="checkout.session", id="cs_1", subscription="sub_1")
+        stripe_events.record_event(db, checkout)
+        stripe_events.record_event(db, _event("evt_older", org.id, T0 - 1, "trialing"))
+
+    # Without STRIPE_SECRET_KEY the subscription cannot be retrieved. The rollback also undoes
+    # marking the older event superseded, so both are retried and neither counts as superseded.
+    report = stripe_events.process_batch(session_factory)
+    assert (report.superseded, report.retried) == (0, 2)
+    assert stripe_events.process_batch(session_factory).handled == 0
+    with session_factory() as db:
+        event = db.get(models.StripeEvent, "evt_checkout")
+        assert (event.status, event.attempts, event.object_id) == ("pending", 1, "sub_1")
+        assert "STRIPE_SECRET_KEY" in event.last_error
+        assert db.execute(select(models.Subscription)).first() is None
+
+
+def test_webhook_stores_the_verified_event(session_factory, monkeypatch) -> None:
+    monkeypatch.setenv("STRIPE_WEBHOOK_SECRET", "whsec_test")
+    get_settings.cache_clear()
+
+    def override_get_db():
+        with session_factory() as db:
+            yield db
+
+    monkeypatch.setitem(main.app.dependency_overrides, get_db, override_get_db)
+    client = TestClient(main.app)
+    payload = json.dumps({"object": "event", **_event("evt_1", 7, T0, "active")})
+    timestamp = int(time.time())
+    signature = hmac.new(b"whsec_test", f"{timestamp}.{payload}".encode(), hashlib.sha256).hexdigest()
+    headers = {"Stripe-Signature": f"t={timestamp},v1={signature}", "Content-Type": "application/json"}
+
+    assert client.post("/billing/webhooks/stripe", content=payload, headers=headers).json() == {"status": "queued"}
+    assert client.post("/billing/webhooks/stripe", content=payload, headers=headers).json() == {"status": "duplicate"}
+    tampered = payload.replace("active", "canceled")
+    assert client.post("/billing/webhooks/stripe", content=tampered, headers=headers).status_code == 400
+
+    with session_factory() as db:
+        event = db.get(models.StripeEvent, "evt_1")
+        assert (event.org_id, event.object_id, event.status) == (7, "sub_1", "pending")
+        assert event.payload == json.loads(payload)
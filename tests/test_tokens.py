@@ -0,0 +1,120 @@
+import hashlib
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.base import Base
+from app.services import tokens
+from app.services.tokens import TokenInfo, TokenResolver
+
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def test_resolver_skips_database_for_cached_and_known_unknown_tokens() -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    statements: list[str] = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, stmt, *args: statements.append(stmt))
+    resolver = TokenResolver(refresh_interval=3600, rebuild_interval=3600)
+
+    with Session(engine) as db:
+        org = models.Org(name="Org", allowed_domains=[])
+        db.add(org)
+        db.flush()
+        team = models.Team(org_id=org.id, name="Platform")
+        db.add(team)
+        db.flush()
+        user = models.User(team_id=team.id, anon_token_hash=hash_token("alpha"))
+        db.add(user)
+        db.commit()
+        user_id, team_id = user.id, team.id
+
+        assert resolver.resolve(db, hash_token("alpha")) == TokenInfo(user_id, team_id, "Platform", True)
+        statements.clear()
+        assert resolver.resolve(db, hash_token("alpha")) is not None
+        assert statements == []
+        # Each unknown token is confirmed once, then answered from the negative cache.
+        assert all(resolver.resolve(db, hash_token(f"probe-{idx}")) is None for idx in range(200))
+        assert len(statements) == 200
+        statements.clear()
+        assert all(resolver.resolve(db, hash_token(f"probe-{idx}")) is None for idx in range(200))
+        assert statements == []
+        assert resolver.filtered == 400
+
+        late = models.User(team_id=team_id, anon_token_hash=hash_token("beta"))
+        db.add(late)
+        db.commit()
+        assert resolver.resolve(db, hash_token("beta")).user_id == late.id
+
+        db.get(models.User, user_id).active = False
+        db.commit()
+        resolver.invalidate(hash_token("alpha"))
+        assert resolver.resolve(db, hash_token("alpha")) is None
+
+
+def test_deactivation_evicts_the_token_once_committed(monkeypatch) -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    resolver = TokenResolver(refresh_interval=3600, rebuild_interval=3600)
+    monkeypatch.setattr(tokens, "_resolver", resolver)
+    digest = hash_token("alpha")
+
+    with Session(engine) as db:
+        org = models.Org(name="Org", allowed_domains=[])
+        db.add(org)
+        db.flush()
+        team = models.Team(org_id=org.id, name="Platform")
+        db.add(team)
+        db.flush()
+        user = models.User(team_id=team.id, anon_token_hash=digest)
+        db.add(user)
+        db.commit()
+        assert resolver.resolve(db, digest) is not None
+
+        user.active = False
+        db.flush()
+        # Not committed yet: the cached entry still reflects the committed row.
+        assert resolver.cache.get_many([digest])
+        db.rollback()
+        assert resolver.cache.get_many([digest])
+
+        user.active = False
+        db.commit()
+        assert resolver.cache.get_many([digest]) == {}
+        assert resolver.resolve(db, digest) is None
+
+
+def test_token_created_by_another_worker_resolves_before_the_refresh(tmp_path) -> None:
+    url = f"sqlite:///{tmp_path / 'tokens.db'}"
+    here, elsewhere = create_engine(url), create_engine(url)
+    Base.metadata.create_all(here)
+    resolver = TokenResolver(refresh_interval=3600, rebuild_interval=3600)
+
+    with Session(here) as db:
+        org = models.Org(name="Org", allowed_domains=[])
+        db.add(org)
+        db.flush()
+        team = models.Team(org_id=org.id, name="Platform")
+        db.add(team)
+        db.commit()
+        team_id = team.id
+        resolver.rebuild(db)
+
+    # Another process creates the user; this resolver's filter has never seen it.
+    with Session(elsewhere) as other:
+        user = models.User(team_id=team_id, anon_token_hash=hash_token("gamma"))
+        other.add(user)
+        other.commit()
+        user_id = user.id
+    with Session(here) as db:
+        assert resolver.resolve(db, hash_token("gamma")) == TokenInfo(user_id, team_id, "Platform", True)
+        assert hash_token("gamma") in resolver._filter
@@ -0,0 +1,56 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.base import Base
+from app.db.upsert import upsert
+from app.services import risk, risk_batch
+
+
+def test_upserts_keep_one_row_per_key_without_reads() -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    statements: list[str] = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, stmt, *args: statements.append(stmt))
+
+    with Session(engine) as db:
+        org = models.Org(name="Org", allowed_domains=[])
+        db.add(org)
+        db.flush()
+        teams = [models.Team(org_id=org.id, name=f"Team {idx}") for idx in range(3)]
+        db.add_all(teams)
+        db.commit()
+        org_id, team_ids = org.id, [team.id for team in teams]
+
+        statements.clear()
+        risk.upsert_team_risk(db, team_ids[0])
+        risk.upsert_team_risk(db, team_ids[0])
+        risk_batch.recompute_all(db)
+        assert [stmt.split()[0] for stmt in statements if "risk_snapshots" in stmt.split("(")[0]] == ["INSERT"] * 3
+        assert sorted(db.execute(select(models.RiskSnapshot.team_id)).scalars()) == team_ids
+
+        def subscription(**values: object) -> None:
+            upsert(
+                db,
+                models.Subscription,
+                [{"org_id": org_id, **values}],
+                index_elements=["org_id"],
+            )
+
+        subscription(stripe_customer="cus_1", plan=models.Plan.pro, status=models.SubscriptionStatus.trialing)
+        subscription(status=models.SubscriptionStatus.active)
+        row = db.execute(select(models.Subscription)).scalar_one()
+        assert (row.stripe_customer, row.plan, row.status, row.seats) == (
+            "cus_1",
+            models.Plan.pro,
+            models.SubscriptionStatus.active,
+            0,
+        )
+